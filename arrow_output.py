@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Arrow output of the 10 minute data (optional dependency pyarrow): get_10_min_data(..., output='arrow')
+
+The produkt files of the archives are parsed by the multithreaded CSV reader of pyarrow directly into record
+batches (MESS_DATUM as timestamp, -999 as null), the folders are stitched like concat_folders(...) with Arrow
+compute and take, without any pandas frame of the data. The chosen station of every folder (row of
+station_list(...)) is stored as JSON in the schema metadata (b'dwd.stations').
+
+The columns stay in Arrow buffers, Polars, DuckDB or pandas read them without a copy:
+
+**Example**
+import dwdopendata as dwd
+import arrow_output
+location = dwd.Location(48.37, 10.94)
+table = location.wind('2019-01-01T00:00', '2019-02-01T00:00', output='arrow')['data']  # pyarrow.Table
+arrow_output.stations(table)  # {'historical': {'Stations_id': '03379', ...}, ...}
+polars_frame = polars.from_arrow(table)  # zero copy
+duckdb.sql('SELECT avg(FF_10) FROM table')
+"""
+from importlib.util import find_spec
+from io import BytesIO
+import json
+import zipfile
+
+import instrument
+import lazy
+
+pa = lazy.module('pyarrow')
+csv = lazy.module('pyarrow.csv')
+compute = lazy.module('pyarrow.compute')
+np = lazy.module('numpy')
+
+TIME_COLUMN = 'MESS_DATUM'
+TIME_FORMAT = '%Y%m%d%H%M'
+MISSING = -999
+METADATA_KEY = b'dwd.stations'
+STATION_COLUMNS = ('Stations_id', 'von_datum', 'bis_datum', 'Stationshoehe', 'geoBreite', 'geoLaenge',
+                   'Stationsname', 'Bundesland', 'distanz')
+
+
+def available() -> bool:
+    return find_spec('pyarrow') is not None
+
+
+def _text(path: str, buffer=None) -> bytes:
+    """Returns the produkt text of an archive (path of a local file or its content)"""
+    if buffer is None:
+        with open(path, 'rb') as file:
+            buffer = file.read()
+    if isinstance(buffer, (bytes, bytearray, memoryview)):
+        buffer = BytesIO(buffer)
+    if not path.endswith('.zip'):
+        return buffer.read()
+    with zipfile.ZipFile(buffer) as archive:
+        names = archive.namelist()
+        return archive.read(next((name for name in names if name.startswith('produkt')), names[0]))
+
+
+def read_table(path: str, buffer=None):
+    """Arrow version of Location.read_data(...): parses an archive into a pyarrow.Table
+
+    :param path: url or local path of the archive (.zip) or of the text file
+    :param buffer: file-like object or bytes with the already downloaded content of the path
+    :return: pyarrow.Table with MESS_DATUM as timestamp[s] and null instead of -999, without 'eor'
+    """
+    table = csv.read_csv(pa.py_buffer(_text(path, buffer)),
+                         parse_options=csv.ParseOptions(delimiter=';'),
+                         convert_options=csv.ConvertOptions(column_types={TIME_COLUMN: pa.timestamp('s')},
+                                                            timestamp_parsers=[TIME_FORMAT]))
+    if 'eor' in table.column_names:
+        table = table.drop_columns(['eor'])
+    for i, field in enumerate(table.schema):
+        if field.name != TIME_COLUMN and (pa.types.is_floating(field.type) or pa.types.is_integer(field.type)):
+            column = table.column(i)
+            missing = compute.equal(column, MISSING)
+            if compute.any(missing).as_py():
+                table = table.set_column(i, field, compute.if_else(missing, None, column))
+    return table
+
+
+def station_table(location, path: str, station_id: str, start, end):
+    """Arrow version of Location.station_data(...): the archives of one station and folder in one table
+
+    :return: pyarrow.Table or None without any file
+    """
+    tables = location.ftp_get_data(path, station_id, start, end, reader=read_table)
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options='default')
+
+
+def _times(table):
+    """int64 seconds of the time column (a view of the Arrow buffer)"""
+    return table.column(TIME_COLUMN).combine_chunks().cast(pa.int64()).to_numpy()
+
+
+def concat_folders(data: dict, start, end, reso='10_minutes'):
+    """Arrow version of Location.concat_folders(...), same order and rules: 1.) historical 2.) recent 3.) now
+
+    :param data: dict with the folder name as key and the pyarrow.Table from station_table(...) as value
+    :return: pyarrow.Table of the time frame without duplicates, sorted and for 10 minutes on a regular grid
+        (only the column MESS_DATUM without any table)
+    """
+    with instrument.stage('stitch') as stage:
+        table = _concat_folders(data, start, end, reso)
+        stage.add(rows=table.num_rows)
+    return table
+
+
+def _concat_folders(data: dict, start, end, reso='10_minutes'):
+    data = {key: value for key, value in data.items() if value is not None}
+    if not data:
+        # no archive of the station in the time frame
+        return pa.table({TIME_COLUMN: pa.array([], type=pa.timestamp('s'))})
+    order = [key for key in ('historical', 'recent', 'now') if key in data] or list(data)
+    table = data[order[0]]
+    for key in order[1:]:
+        # like concat_folders: only the rows before the last row of the tables so far
+        tmp_table = data[key]
+        if table.num_rows:
+            tmp_table = tmp_table.filter(compute.less(tmp_table.column(TIME_COLUMN), table.column(TIME_COLUMN)[-1]))
+        table = pa.concat_tables([table, tmp_table], promote_options='default')
+
+    times = _times(table)
+    start, end = [int(np.datetime64(value, 's').astype(np.int64)) for value in (start, end)]
+    inside = np.flatnonzero((times >= start) & (times < end))
+    # sorted, the first row of every time is kept
+    unique, first = np.unique(times[inside], return_index=True)
+    table = table.take(pa.array(inside[first]))
+    if reso != '10_minutes' or not len(unique):
+        return table
+
+    # regular 10 minute grid from the first row on, missing rows are null (asfreq)
+    step = 600
+    on_grid = (unique - unique[0]) % step == 0
+    grid = np.arange(unique[0], unique[-1] + 1, step)
+    rows = np.full(len(grid), -1, dtype=np.int64)
+    rows[(unique[on_grid] - unique[0]) // step] = np.flatnonzero(on_grid)
+    table = table.take(pa.array(rows, mask=rows < 0))
+    return table.set_column(table.schema.get_field_index(TIME_COLUMN), TIME_COLUMN,
+                            pa.array(grid, type=pa.int64()).cast(pa.timestamp('s')))
+
+
+def with_stations(table, stations: dict):
+    """Stores the station of every folder in the schema metadata (the columns are not copied)
+
+    :param stations: dict with the folder name as key and the row of the station list as pd.Series (or None)
+    """
+    meta = dict()
+    for key, row in stations.items():
+        if row is None:
+            continue
+        meta[key] = {column: (str(row[column]) if column in ('von_datum', 'bis_datum') else
+                              row[column].item() if hasattr(row[column], 'item') else row[column])
+                     for column in STATION_COLUMNS if column in row}
+    metadata = dict(table.schema.metadata or {})
+    metadata[METADATA_KEY] = json.dumps(meta).encode()
+    return table.replace_schema_metadata(metadata)
+
+
+def stations(table) -> dict:
+    """Returns the stations of the schema metadata: {folder: {'Stations_id': ..., ...}}"""
+    metadata = table.schema.metadata or {}
+    return json.loads(metadata[METADATA_KEY]) if METADATA_KEY in metadata else dict()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Availability index of the DWD stations: station -> parameter -> folder -> date ranges
+
+The index is built once from the listings (one per folder) and the station descriptions. Afterwards the
+choice of a station which covers a time frame and the station lists of the folders are pure in-memory queries
+without any download. The recent and now archives are stored with the date range of the station, they are cut
+to the (moving) window of their folder at the query time, see windows(...).
+
+**Example**
+import dwdopendata as dwd
+location = dwd.Location(48.37, 10.94)
+index = location.availability_index(['wind', 'solar'])  # loads dwd_availability.csv or builds it
+index.nearest(*location.coordinate, 'wind', start, end)  # '03379'
+location.wind(start, end)  # uses the nearest station with data for the whole time frame
+"""
+from __future__ import annotations
+
+from datetime import datetime as dt
+from datetime import timedelta
+import os
+
+import lazy
+
+from interpolation import great_circle_distance
+
+np = lazy.module('numpy')
+pd = lazy.module('pandas')
+
+FILE_NAME = 'dwd_availability.csv'
+COLUMNS = ['Stations_id', 'typ', 'folder', 'von', 'bis', 'geoBreite', 'geoLaenge', 'Stationshoehe']
+TYPS = ('wind', 'air_temperature', 'solar')
+MAX_AGE = timedelta(1)  # the now folder only covers about one day, new archives appear after it
+
+
+def archive_range(file_name: str, sep: str = '_'):
+    """Returns (station_id, von, bis) of an archive name, von / bis are None for recent and now archives
+
+    **Example**
+    archive_range('10minutenwerte_wind_00003_19930428_19991231_hist.zip')
+    ('00003', datetime(1993, 4, 28), datetime(2000, 1, 1))
+
+    :param file_name: name of the zip file
+    :param sep: separator between the words
+    :return: (str, datetime or None, datetime or None) or None if the name is not an archive of a station
+    """
+    parts = file_name.split(sep)
+    if not file_name.endswith('.zip') or len(parts) < 4:
+        return None
+    if len(parts) >= 6 and parts[3].isdigit() and parts[4].isdigit():
+        # the end date is the last day with data
+        return parts[2], dt.strptime(parts[3], '%Y%m%d'), dt.strptime(parts[4], '%Y%m%d') + timedelta(1)
+    return parts[2], None, None
+
+
+class AvailabilityIndex:
+    """Table of the date ranges of every station, parameter (typ) and folder (historical, recent, now)"""
+
+    def __init__(self, table: pd.DataFrame = None, built: dt = None):
+        """
+        :param table: pd.DataFrame with the columns of COLUMNS
+        :param built: time of the listings, default now
+        """
+        if table is None:
+            table = pd.DataFrame(columns=COLUMNS)
+        self.table = table
+        self.built = built or dt.now()
+
+    def __len__(self):
+        return len(self.table)
+
+    def age(self, now: dt = None) -> timedelta:
+        """Age of the listings of the index"""
+        return (now or dt.now()) - self.built
+
+    @classmethod
+    def build(cls, location, typs=TYPS, reso: str = '10_minutes', folder='cdc_obDE_climate'):
+        """Builds the index with one listing per folder and the station descriptions
+
+        :param location: Location object with the transport and the station lists
+        :param typs: parameter folders, e.g. ['wind', 'solar']
+        :param reso: resolution folder
+        :param folder: test / advance option
+        :return: AvailabilityIndex
+        """
+        if folder == 'cdc_obDE_climate':
+            folder = location.cdc_obDE_climate
+        built = dt.now()
+        rows = list()
+        for typ in typs:
+            path = '/' + location.search_folder(folder + reso + f'/{typ}/')['path'].strip('/') + '/'
+            for key in location.transport.listdir(path):
+                if key not in ('historical', 'recent', 'now'):
+                    continue
+                listing = location.transport.listdir(path + key)
+                description = [name for name in listing if 'Beschreibung_Stationen.txt' in name]
+                if description:
+                    file_path = path + key + '/' + description[0]
+                    stations = location.station_list(location.transport.url(file_path),
+                                                     location.transport.read_text(file_path))
+                    stations = stations.set_index('Stations_id')
+                else:
+                    stations = None
+                rows.extend(cls._folder_rows(listing, stations, typ, key))
+        table = pd.DataFrame(rows, columns=COLUMNS)
+        return cls(table.assign(von=pd.to_datetime(table['von']), bis=pd.to_datetime(table['bis'])), built)
+
+    @staticmethod
+    def _folder_rows(listing: list, stations, typ: str, key: str) -> list:
+        """Rows of one folder. recent and now archives get the date range of the station (NaT without)"""
+        rows = list()
+        for name in listing:
+            archive = archive_range(name)
+            if archive is None:
+                continue
+            station_id, von, bis = archive
+            meta = None
+            if stations is not None and station_id in stations.index:
+                meta = stations.loc[station_id]
+                if isinstance(meta, pd.DataFrame):
+                    meta = meta.iloc[0]
+            if von is None:
+                # cut to the window of the folder at the query time, see windows(...)
+                von, bis = (pd.NaT, pd.NaT) if meta is None else (meta['von_datum'], meta['bis_datum'] + timedelta(1))
+            coordinates = [np.nan, np.nan, np.nan] if meta is None else \
+                [float(meta['geoBreite']), float(meta['geoLaenge']), float(meta['Stationshoehe'])]
+            rows.append([station_id, typ, key, von, bis] + coordinates)
+        return rows
+
+    def save(self, path: str) -> bool:
+        """Saves the index as csv file
+
+        :param path: file or directory (then dwd_availability.csv)
+        :return: True if succeeds
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, FILE_NAME)
+        try:
+            self.table.to_csv(path, index=False)
+        except IOError as fail:
+            print(fail)
+            print('Saving the ' + FILE_NAME + ' was not successful')
+            return False
+        return True
+
+    @classmethod
+    def load(cls, path: str):
+        """Loads an index from save(...)
+
+        :param path: file or directory (then dwd_availability.csv)
+        :return: AvailabilityIndex
+        """
+        if os.path.isdir(path):
+            path = os.path.join(path, FILE_NAME)
+        table = pd.read_csv(path, dtype={'Stations_id': str}, parse_dates=['von', 'bis'])
+        return cls(table, dt.fromtimestamp(os.path.getmtime(path)))
+
+    def windows(self, now: dt = None) -> pd.DataFrame:
+        """Returns the table with the date ranges of the recent and now archives cut to the window of their folder
+
+        :param now: time of the windows, default now
+        :return: pd.DataFrame with the columns of COLUMNS
+        """
+        from dwdopendata import reso_folder
+        now = now or dt.now()
+        table = self.table
+        von, bis = table['von'].copy(), table['bis'].copy()
+        for key in ('recent', 'now'):
+            mask = (table['folder'] == key).to_numpy()
+            if not mask.any():
+                continue
+            before, after = [now - timedelta(days) for days in reso_folder[key]]
+            von[mask] = von[mask].fillna(before).clip(lower=before)
+            bis[mask] = bis[mask].fillna(after).clip(upper=after)
+        return table.assign(von=von, bis=bis)
+
+    def ranges(self, station_id: str, typ: str = None) -> dict:
+        """Returns the date ranges of a station
+
+        :param station_id: ID of the station
+        :param typ: only this parameter
+        :return: {typ: {folder: [(von, bis), ...]}}
+        """
+        table = self.windows()
+        table = table[table['Stations_id'] == station_id]
+        if typ is not None:
+            table = table[table['typ'] == typ]
+        out = dict()
+        for row in table.itertuples(index=False):
+            out.setdefault(row.typ, dict()).setdefault(row.folder, list()).append((row.von, row.bis))
+        return out
+
+    def folders(self, station_id: str, typ: str, start, end) -> list:
+        """Returns the folders with data of the station in the time frame"""
+        table = self.windows()
+        mask = ((table['Stations_id'] == station_id) & (table['typ'] == typ)
+                & (table['von'] < end) & (table['bis'] > start))
+        return list(pd.unique(table.loc[mask, 'folder']))
+
+    def coverage(self, typ: str, start, end) -> pd.DataFrame:
+        """Returns per station, if the union of the date ranges covers the whole time frame
+
+        :param typ: parameter folder
+        :param start: Start-time
+        :param end: end-time
+        :return: pd.DataFrame indexed by Stations_id with the columns covers, von, bis, geoBreite, geoLaenge,
+            Stationshoehe
+        """
+        table = self.windows()
+        table = table[(table['typ'] == typ) & (table['von'] < end) & (table['bis'] > start)]
+        table = table.assign(von=table['von'].clip(lower=start), bis=table['bis'].clip(upper=end))
+        table = table.sort_values(['Stations_id', 'von'])
+        # a gap is a range starting after the end of all previous ranges of the station
+        reach = table.groupby('Stations_id')['bis'].cummax()
+        previous = reach.groupby(table['Stations_id']).shift()
+        gap = (table['von'] > previous).groupby(table['Stations_id']).any()
+        grouped = table.groupby('Stations_id')
+        out = grouped.agg({'von': 'min', 'bis': 'max', 'geoBreite': 'first', 'geoLaenge': 'first',
+                           'Stationshoehe': 'first'})
+        out['covers'] = (~gap) & (out['von'] <= start) & (out['bis'] >= end)
+        return out
+
+    def covering(self, lat: float, lon: float, typ: str, start, end) -> pd.DataFrame:
+        """Returns the stations which cover the whole time frame sorted by the distance
+
+        :param lat: latitude of the location
+        :param lon: longitude of the location
+        :param typ: parameter folder
+        :param start: Start-time
+        :param end: end-time
+        :return: pd.DataFrame from coverage(...) with the column distanz
+        """
+        out = self.coverage(typ, start, end)
+        out = out[out['covers']]
+        out = out.assign(distanz=great_circle_distance(lat, lon, out['geoBreite'].to_numpy(dtype=float),
+                                                       out['geoLaenge'].to_numpy(dtype=float)))
+        return out.sort_values(by='distanz')
+
+    def nearest(self, lat: float, lon: float, typ: str, start, end):
+        """Returns the ID of the nearest station with data for the whole time frame or None"""
+        out = self.covering(lat, lon, typ, start, end)
+        return out.index[0] if len(out) else None
+
+    def station_tables(self, lat: float, lon: float, typ: str, start, end) -> list:
+        """Returns the station lists of the folders with data in the time frame without any download
+
+        :param lat: latitude of the location
+        :param lon: longitude of the location
+        :param typ: parameter folder
+        :param start: Start-time
+        :param end: end-time
+        :return: list of pd.DataFrame like Location.station_tables(...) with the columns Stations_id, von_datum,
+            bis_datum, Stationshoehe, geoBreite, geoLaenge and distanz (no names), the folder name as axis name
+        """
+        table = self.windows()
+        table = table[(table['typ'] == typ) & (table['von'] < end) & (table['bis'] > start)
+                      & table['geoBreite'].notna()]
+        stations = list()
+        for key in ('historical', 'recent', 'now'):
+            rows = table[table['folder'] == key]
+            if rows.empty:
+                continue
+            station = rows.groupby('Stations_id', sort=False).agg(
+                von_datum=('von', 'min'), bis_datum=('bis', 'max'), Stationshoehe=('Stationshoehe', 'first'),
+                geoBreite=('geoBreite', 'first'), geoLaenge=('geoLaenge', 'first')).reset_index()
+            # same types as Location.station_list: bis_datum is the last day, the height is a string
+            distance = great_circle_distance(lat, lon, station['geoBreite'], station['geoLaenge'])
+            station = station.assign(bis_datum=station['bis_datum'] - timedelta(1),
+                                     Stationshoehe=station['Stationshoehe'].round().astype(int).astype(str),
+                                     distanz=distance)
+            stations.append(station.sort_values(by='distanz').rename_axis(key, axis=1))
+        return stations
+
+    def has(self, typ: str) -> bool:
+        """True when the index holds the parameter"""
+        return bool((self.table['typ'] == typ).any())
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the timestamp parsing: date_picker.str_to_datetime per string against the batch
+date_picker.str_to_datetime64 (mixed layouts incl. the day first 'de' variant and archive name dates)
+
+python benchmarks/bench_date_picker.py [strings]
+"""
+from datetime import datetime as dt
+from datetime import timedelta
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import date_picker as dp  # noqa: E402
+
+LAYOUTS = {'iso minutes': '%Y-%m-%dT%H:%M', 'iso seconds': '%Y-%m-%d %H:%M:%S', 'archive name': '%Y%m%d',
+           'de': 'de%d.%m.%Y %H:%M'}
+
+
+def strings(n: int, layout: str, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    start = dt(1990, 1, 1)
+    return [(start + timedelta(minutes=int(minutes))).strftime(layout)
+            for minutes in rng.integers(0, 30 * 365 * 24 * 60, n)]
+
+
+def main(n: int = 100000):
+    cases = {name: strings(n, layout) for name, layout in LAYOUTS.items()}
+    cases['mixed'] = [value for values in zip(*cases.values()) for value in values][:n]
+    for name, values in cases.items():
+        started = time.perf_counter()
+        single = np.array([dp.str_to_datetime(value) for value in values], dtype='datetime64[s]')
+        per_string = time.perf_counter() - started
+        started = time.perf_counter()
+        batch = dp.str_to_datetime64(values)
+        vectorized = time.perf_counter() - started
+        same = 'same' if (single == batch).all() else 'DIFFERENT'
+        print(f'{name:14s} {n} strings  per string {per_string:7.3f} s  batch {vectorized:7.3f} s  '
+              f'x{per_string / vectorized:6.1f}  {same}')
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
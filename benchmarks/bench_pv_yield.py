@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Benchmark of pv_yield: 1,000 plants over one year of 10 minute data (synthetic irradiation)
+
+python benchmarks/bench_pv_yield.py [plants] [chunk_size]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import pv_yield as pv  # noqa: E402
+
+
+def synthetic_solar(year: int = 2018, lat: float = 48.37, lon: float = 10.94, seed: int = 0) -> dict:
+    """Clear sky like GS_10 / DS_10 in J/cm^2 with random clouds for one year of 10 minute values"""
+    index = pd.date_range(f'{year}-01-01 00:10', f'{year + 1}-01-01 00:00', freq='10min')
+    cos_zenith, _ = pv.solar_position(index - pd.Timedelta('5min'), lat, lon)
+    clearness = np.random.default_rng(seed).uniform(0.2, 0.8, len(index))
+    glob = np.clip(cos_zenith, 0, None) * 1000 * clearness * 600 / 1e4  # W/m^2 -> J/cm^2 in 10 min
+    frame = pd.DataFrame({'GS_10': glob, 'DS_10': glob * (1 - clearness)}, index=index)
+    return {'data': frame, 'meta': []}
+
+
+def main(n_plants: int = 1000, chunk_size: int = pv.CHUNK_SIZE):
+    solar = synthetic_solar()
+    rng = np.random.default_rng(1)
+    plants = pv.plant_fleet(area=rng.uniform(50, 5000, n_plants), efficiency=rng.uniform(15, 22, n_plants),
+                            tilt=rng.uniform(0, 60, n_plants), azimuth=rng.uniform(90, 270, n_plants))
+    steps = len(solar['data'])
+    print(f'{n_plants} plants x {steps} time steps, chunk size {chunk_size}')
+
+    start = time.perf_counter()
+    total = pv.total_yield(solar, plants, 48.37, 10.94, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f'total_yield:    {elapsed:8.3f} s  {n_plants * steps / elapsed / 1e6:8.1f} M values/s')
+
+    start = time.perf_counter()
+    series = pv.expected_yield(solar, plants, 48.37, 10.94, chunk_size=chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f'expected_yield: {elapsed:8.3f} s  {n_plants * steps / elapsed / 1e6:8.1f} M values/s')
+    assert np.allclose(series.sum().to_numpy(), total.to_numpy())
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
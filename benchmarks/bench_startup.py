@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the cold start: every step runs in a fresh interpreter (CLI / serverless invocation)
+
+- import: import dwdopendata
+- location: import + Location(...) without a dwd_tree.txt in the op_path (no download any more)
+- distance: + calc_distance (pandas, numpy and requests stay unloaded)
+- first_query: + the last 24 hours of one station from the synthetic tree (tree, listing, parsing)
+
+The median of the repeats is printed with the heavy modules which were loaded at the end of the step.
+
+python benchmarks/bench_startup.py [repeat]
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import synthetic_tree  # noqa: E402
+
+PACKAGE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('pandas', 'numpy', 'requests', 'scipy', 'asyncio')
+
+STEPS = {
+    'import': '',
+    'location': 'location = dwd.Location(50.5, 10.5, op_path=OP_PATH, transport=ROOT)',
+    'distance': 'location = dwd.Location(50.5, 10.5, op_path=OP_PATH, transport=ROOT)\n'
+                'location.calc_distance([48.37, 10.94])',
+    'first_query': 'location = dwd.Location(50.5, 10.5, op_path=OP_PATH, transport=ROOT)\n'
+                   'from datetime import datetime, timedelta\n'
+                   'now = datetime.now()\n'
+                   "location.get_10_min_data((now - timedelta(1)).strftime('%Y-%m-%dT%H:%M'), "
+                   "now.strftime('%Y-%m-%dT%H:%M'), 'wind')",
+}
+
+TEMPLATE = '''
+import sys, time, json
+sys.path.insert(0, {package!r})
+OP_PATH, ROOT = {op_path!r}, {root!r}
+started = time.perf_counter()
+import dwdopendata as dwd
+{step}
+seconds = time.perf_counter() - started
+print(json.dumps({{'seconds': seconds, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+
+def run_step(step: str, root: str, op_path: str) -> dict:
+    tree = os.path.join(op_path, 'dwd_tree.txt')
+    if os.path.isfile(tree):
+        os.remove(tree)
+    code = TEMPLATE.format(package=PACKAGE, op_path=op_path, root=root, step=step, heavy=HEAVY)
+    output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(repeat: int = 5):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, 'tree')
+        synthetic_tree.generate(root, n_stations=2, years=1)
+        op_path = os.path.join(tmp, 'op')
+        os.makedirs(op_path)
+        for name, step in STEPS.items():
+            results = [run_step(step, root, op_path) for _ in range(repeat)]
+            median = statistics.median(result['seconds'] for result in results)
+            print(f"{name:12s} {median * 1e3:8.1f} ms  loaded: {', '.join(results[-1]['loaded']) or '-'}")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:2]])
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite: typical queries against a synthetic CDC tree served by local stand-in servers
+
+Every case is timed end to end (median, p95 of the repeats) and per stage of instrument.recording() (login,
+listing, station descriptions, transfer, parsing, stitching of the folders), with the throughput (rows/s, MB/s)
+and the peak memory of one extra run (tracemalloc). The results can be saved as baseline and compared with it,
+a case which is slower or needs more memory than baseline * (1 + tolerance) is reported as regression (exit
+code 1).
+
+python benchmarks/bench_suite.py                         # local, http and ftp (with pyftpdlib)
+python benchmarks/bench_suite.py --transport local --save
+python benchmarks/bench_suite.py --stations 10 --years 5 --repeat 3 --baseline my_baseline.json
+"""
+import argparse
+from datetime import datetime as dt
+from datetime import timedelta
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import dwdopendata as dwd  # noqa: E402
+import instrument  # noqa: E402
+import transport  # noqa: E402
+from standin import serve_ftp, serve_http  # noqa: E402
+import synthetic_tree  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+SLACK = {'seconds': 0.005, 'peak_mb': 1.}  # absolute noise allowed on top of the tolerance
+
+
+def make_location(kind: str, root: str, op_path: str, servers: dict):
+    """Location with the transport of the kind ('local', 'http', 'ftp')"""
+    location = dwd.Location(50.5, 10.5, op_path=op_path, transport=root)
+    location.server = '127.0.0.1'
+    if kind == 'http':
+        location.transport = transport.HTTPSTransport(location, servers['http'])
+    elif kind == 'ftp':
+        location.ftp_port = servers['ftp']
+        location.transport = transport.FTPTransport(location, text_over_https=False)
+    return location
+
+
+def cases(info: dict) -> dict:
+    """name -> function(location) of the typical queries"""
+    now = dt.now()
+    year = now.year - 2  # completely in the historical folder
+    day = (now - timedelta(1)).strftime('%Y-%m-%dT%H:%M'), now.strftime('%Y-%m-%dT%H:%M')
+    typ = info['typs'][0]
+    folder = '/' + synthetic_tree.CLIMATE + synthetic_tree.RESO + '/' + typ + '/historical'
+
+    # the direct calls of the transport and the parser are recorded like in get_10_min_data(...)
+    def station_list(location):
+        with instrument.stage('listing'):
+            name = [name for name in location.transport.listdir(folder) if 'Beschreibung' in name][0]
+        with instrument.stage('description') as stage:
+            text = location.transport.read_text(folder + '/' + name)
+            station = location.station_list(name, text)
+            stage.add(bytes=len(text), rows=len(station))
+        return station
+
+    def read_data(location):
+        with instrument.stage('listing'):
+            name = sorted(name for name in location.transport.listdir(folder) if name.endswith('.zip'))[0]
+        with instrument.stage('transfer') as stage:
+            content = location.transport.read(folder + '/' + name)
+            stage.add(bytes=len(content))
+        with instrument.stage('parse') as stage:
+            frame = location.read_data(name, content)
+            stage.add(rows=len(frame))
+        return frame
+
+    return {
+        'build_tree': lambda location: location.build_tree(os.path.join(location.op_path, 'tree_bench.txt')),
+        'station_list': station_list,
+        'read_data': read_data,
+        'month': lambda location: location.get_10_min_data(f'{year}-06-01T00:00', f'{year}-07-01T00:00', typ),
+        'year': lambda location: location.get_10_min_data(f'{year}-01-01T00:00', f'{year + 1}-01-01T00:00', typ),
+        'last_24_hours': lambda location: location.get_10_min_data(*day, typ),
+    }
+
+
+def run_case(location, func, repeat: int) -> dict:
+    times = list()
+    for _ in range(repeat):
+        # the stages of the last repeat
+        with instrument.recording() as stats:
+            started = time.perf_counter()
+            func(location)
+            times.append(time.perf_counter() - started)
+    stages = {stage: stats.seconds[stage] for stage in instrument.STAGES if stage in stats.seconds}
+    rows, transferred = stats.rows.get('parse', 0), stats.bytes.get('transfer', 0)
+    tracemalloc.start()
+    func(location)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    median = statistics.median(times)
+    return {'seconds': median, 'p95': sorted(times)[min(len(times) - 1, int(round(0.95 * (len(times) - 1))))],
+            'rows_per_s': rows / median, 'mb_per_s': transferred / median / 1e6, 'peak_mb': peak / 1e6,
+            'stages': stages}
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Returns the regressions: list of (case, metric, baseline, result)"""
+    regressions = list()
+    for case, result in results.items():
+        known = baseline.get(case)
+        if known is None:
+            continue
+        for metric in ('seconds', 'peak_mb'):
+            if result[metric] > known[metric] * (1 + tolerance) + SLACK[metric]:
+                regressions.append((case, metric, known[metric], result[metric]))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmark suite of dwdopendata')
+    parser.add_argument('--transport', nargs='+', default=['local', 'http', 'ftp'], choices=['local', 'http', 'ftp'])
+    parser.add_argument('--stations', type=int, default=5)
+    parser.add_argument('--years', type=int, default=3)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--root', help='directory of the synthetic tree (reused), default a temporary directory')
+    parser.add_argument('--baseline', default=BASELINE)
+    parser.add_argument('--save', action='store_true', help='save the results as baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root or os.path.join(tmp, 'tree')
+        started = time.perf_counter()
+        info = synthetic_tree.generate(root, args.stations, args.years)
+        print(f"synthetic tree: {info['stations']} stations x {info['years']} years, {info['bytes'] / 1e6:.1f} MB "
+              f'({time.perf_counter() - started:.1f} s)')
+        servers = dict()
+        http_server, servers['http'] = serve_http(root)
+        ftp_server, servers['ftp'] = serve_ftp(root)
+        kinds = [kind for kind in args.transport if kind != 'ftp' or ftp_server is not None]
+        if len(kinds) < len(args.transport):
+            print('pyftpdlib is not installed, FTP is skipped')
+
+        results = dict()
+        for kind in kinds:
+            op_path = os.path.join(tmp, kind)
+            os.makedirs(op_path, exist_ok=True)
+            location = make_location(kind, root, op_path, servers)
+            for name, func in cases(info).items():
+                result = run_case(location, func, args.repeat)
+                results[kind + ':' + name] = result
+                stages = '  '.join(f'{stage} {seconds * 1e3:.0f}' for stage, seconds in result['stages'].items())
+                print(f"{kind + ':' + name:22s} {result['seconds'] * 1e3:9.1f} ms  p95 {result['p95'] * 1e3:9.1f} ms"
+                      f"  {result['rows_per_s']:11.0f} rows/s  {result['mb_per_s']:7.1f} MB/s"
+                      f"  peak {result['peak_mb']:7.1f} MB  | ms: {stages}")
+            location.transport.close()
+
+        http_server.shutdown()
+        if ftp_server is not None:
+            ftp_server.shutdown()
+
+    regressions = list()
+    if os.path.isfile(args.baseline):
+        with open(args.baseline, 'r') as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for case, metric, known, result in regressions:
+            print(f'REGRESSION {case} {metric}: {known:.4g} -> {result:.4g}')
+        if not regressions:
+            print('no regression against ' + args.baseline)
+    if args.save:
+        with open(args.baseline, 'w') as file:
+            json.dump(results, file, indent=1)
+        print('baseline saved to ' + args.baseline)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark of the transports side by side against local stand-in servers: one listing and the download of
+every file of a folder (synthetic archives)
+
+python benchmarks/bench_transport.py [files] [kilobytes per file]
+"""
+from io import BytesIO
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import dwdopendata as dwd  # noqa: E402
+import transport  # noqa: E402
+from standin import serve_ftp, serve_http  # noqa: E402
+
+FOLDER = '/climate_environment/CDC/observations_germany/climate/10_minutes/wind/historical'
+
+
+def synthetic_folder(root: str, n_files: int, size: int):
+    directory = os.path.join(root, *FOLDER.strip('/').split('/'))
+    os.makedirs(directory, exist_ok=True)
+    for i in range(n_files):
+        with open(os.path.join(directory, f'10minutenwerte_wind_{i:05d}_20100101_20191231_hist.zip'), 'wb') as file:
+            file.write(os.urandom(size))
+
+
+def fetch_all(listdir, read) -> int:
+    return sum(len(read(FOLDER + '/' + name)) for name in listdir(FOLDER))
+
+
+def ftp_login_per_file(location):
+    """Like ftp_get_data before the transports: one login per file"""
+    def read(path):
+        ftp = location.ftp_login()
+        buffer = BytesIO()
+        ftp.retrbinary('RETR ' + path, buffer.write)
+        ftp.quit()
+        return buffer.getvalue()
+    return read
+
+
+def main(n_files: int = 200, kilobytes: int = 256):
+    with tempfile.TemporaryDirectory() as root:
+        synthetic_folder(root, n_files, kilobytes * 1024)
+        with open(os.path.join(root, 'dwd_tree.txt'), 'w') as file:
+            file.write('[]')
+        location = dwd.Location(op_path=root, transport=root)
+        location.server = '127.0.0.1'
+        http_server, base_url = serve_http(root)
+        ftp_server, location.ftp_port = serve_ftp(root)
+
+        https = transport.HTTPSTransport(location, base_url)
+        cases = [('local', location.transport.listdir, location.transport.read),
+                 ('http session', https.listdir, https.read),
+                 ('http no session', https.listdir, lambda path: requests.get(base_url + path).content)]
+        if ftp_server is not None:
+            ftp = transport.FTPTransport(location, text_over_https=False)
+            cases += [('ftp keep-alive', ftp.listdir, ftp.read),
+                      ('ftp login per file', ftp.listdir, ftp_login_per_file(location))]
+        else:
+            print('pyftpdlib is not installed, FTP is skipped')
+
+        print(f'{n_files} files x {kilobytes} kB')
+        for name, listdir, read in cases:
+            start = time.perf_counter()
+            size = fetch_all(listdir, read)
+            elapsed = time.perf_counter() - start
+            print(f'{name:20s} {elapsed:8.3f} s  {n_files / elapsed:8.1f} files/s  {size / elapsed / 1e6:8.1f} MB/s')
+
+        https.close()
+        http_server.shutdown()
+        if ftp_server is not None:
+            ftp.close()
+            ftp_server.shutdown()
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Local stand-in servers of opendata.dwd.de for the benchmarks
+
+serve_http(root) serves a directory with the layout of the server over HTTP/1.1 (keep-alive),
+serve_ftp(root) over FTP (needs pyftpdlib). Both run in a daemon thread until shutdown() is called.
+"""
+import functools
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+import logging
+import threading
+
+
+class _KeepAliveHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True  # the headers and the body are separate writes
+
+    def log_message(self, *args):
+        pass
+
+
+def serve_http(root: str, host: str = '127.0.0.1', port: int = 0):
+    """Starts an HTTP server for the directory
+
+    :return: (server with shutdown(), base url)
+    """
+    server = ThreadingHTTPServer((host, port), functools.partial(_KeepAliveHandler, directory=root))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, 'http://' + host + ':' + str(server.server_address[1])
+
+
+def serve_ftp(root: str, host: str = '127.0.0.1', port: int = 0):
+    """Starts an anonymous FTP server for the directory
+
+    :return: (server with shutdown(), port) or (None, None) without pyftpdlib
+    """
+    try:
+        from pyftpdlib.authorizers import DummyAuthorizer
+        from pyftpdlib.handlers import FTPHandler
+        from pyftpdlib.servers import ThreadedFTPServer
+    except ImportError:
+        return None, None
+    logger = logging.getLogger('pyftpdlib')
+    logger.setLevel(logging.WARNING)
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    authorizer = DummyAuthorizer()
+    authorizer.add_anonymous(root)
+    handler = type('StandInHandler', (FTPHandler,), {'authorizer': authorizer})
+    server = ThreadedFTPServer((host, port), handler)
+    threading.Thread(target=server.serve_forever, kwargs={'handle_exit': False}, daemon=True).start()
+    server.shutdown = server.close_all
+    return server, server.address[1]
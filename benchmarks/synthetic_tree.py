@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Synthetic CDC tree in the layout and the file formats of opendata.dwd.de for the offline benchmarks
+
+weather/tree.html, the station descriptions and the historical / recent / now archives of the 10 minute
+data (wind, air_temperature, solar) with random values. The size is set by the number of stations and the
+years of historical data.
+
+python benchmarks/synthetic_tree.py <root> [stations] [years]
+"""
+from datetime import datetime as dt
+from datetime import timedelta
+import io
+import json
+import os
+import sys
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+SERVER = 'https://opendata.dwd.de/'
+CLIMATE = 'climate_environment/CDC/observations_germany/climate/'
+RESO = '10_minutes'
+# parameter folder: (file name part, description part, columns with (low, high, decimals))
+PARAMETERS = {
+    'wind': ('wind', 'ff', {'FF_10': (0., 20., 1), 'DD_10': (0., 360., 0)}),
+    'air_temperature': ('TU', 'tu', {'PP_10': (950., 1040., 1), 'TT_10': (-15., 35., 1),
+                                     'TM5_10': (-15., 35., 1), 'RF_10': (20., 100., 1), 'TD_10': (-20., 20., 1)}),
+    'solar': ('SOLAR', 'sd', {'DS_10': (0., 30., 3), 'GS_10': (0., 60., 3), 'SD_10': (0., .167, 3),
+                              'LS_10': (0., 10., 3)}),
+}
+CHUNK_YEARS = 10  # years per historical archive
+
+
+def station_table(n_stations: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({'Stations_id': [f'{i:05d}' for i in range(1, n_stations + 1)],
+                         'geoBreite': rng.uniform(47.5, 54.5, n_stations).round(4),
+                         'geoLaenge': rng.uniform(6., 15., n_stations).round(4),
+                         'Stationshoehe': rng.integers(0, 1500, n_stations)})
+
+
+def description(stations: pd.DataFrame, von: dt, bis: dt) -> bytes:
+    """Station description in the fixed width layout of the DWD (latin-1, CRLF)"""
+    lines = ['Stations_id von_datum bis_datum Stationshoehe geoBreite geoLaenge Stationsname Bundesland',
+             '----------- --------- --------- ------------- --------- --------- '
+             '----------------------------------------- ----------']
+    for row in stations.itertuples():
+        lines.append(f'{row.Stations_id} {von:%Y%m%d} {bis:%Y%m%d} {row.Stationshoehe:14d} {row.geoBreite:9.4f} '
+                     f'{row.geoLaenge:9.4f} Messfeld {row.Stations_id:<32s} Bayern')
+    return ('\r\n'.join(lines) + '\r\n').encode('latin-1')
+
+
+def product(station_id: str, columns: dict, start, end, rng) -> bytes:
+    """Text of a produkt file: ';' separated, -999 for a few missing values"""
+    index = pd.date_range(start, end, freq='10min')
+    parts = [np.asarray(part, dtype=np.int64)
+             for part in (index.year, index.month, index.day, index.hour, index.minute)]
+    stamp = parts[0] * 100000000 + parts[1] * 1000000 + parts[2] * 10000 + parts[3] * 100 + parts[4]
+    data = {'STATIONS_ID': np.full(len(index), int(station_id)), 'MESS_DATUM': stamp,
+            '  QN': np.full(len(index), 3)}
+    for column, (low, high, decimals) in columns.items():
+        values = rng.uniform(low, high, len(index)).round(decimals)
+        values[rng.random(len(index)) < 0.002] = -999
+        data[column] = values
+    data['eor'] = 'eor'
+    return pd.DataFrame(data).to_csv(sep=';', index=False, lineterminator='\n').encode('latin-1')
+
+
+def write_zip(path: str, member: str, text: bytes):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(member, text)
+    with open(path, 'wb') as file:
+        file.write(buffer.getvalue())
+
+
+def tree_html(typs) -> str:
+    """weather/tree.html with the folders of the synthetic tree (format of Location.build_tree)"""
+    folders, path = list(), ''
+    for part in (CLIMATE + RESO).split('/'):
+        path += part + '/'
+        folders.append((path, part))
+    for typ in typs:
+        folders.append((CLIMATE + RESO + '/' + typ + '/', typ))
+        for key in ('historical', 'recent', 'now'):
+            folders.append((CLIMATE + RESO + '/' + typ + '/' + key + '/', key))
+    links = '<br>'.join(f'<a href="{SERVER}{path}">{folder}</a>' for path, folder in folders)
+    return '<html><body>\n' + links + '<br>\n</body></html>'
+
+
+def generate(root: str, n_stations: int = 5, years: int = 3, typs=tuple(PARAMETERS), seed: int = 0) -> dict:
+    """Writes the synthetic tree to the root (an existing tree with the same parameters is reused)
+
+    :param root: directory which corresponds to the root of the server
+    :param n_stations: stations per parameter
+    :param years: years of historical data until the end of the last year
+    :param typs: parameter folders
+    :param seed: seed of the random values
+    :return: dict with the parameters, the stations and the size of the tree
+    """
+    now = dt.now().replace(second=0, microsecond=0)
+    now = now - timedelta(minutes=now.minute % 10)
+    today = now.replace(hour=0, minute=0)
+    info = {'stations': n_stations, 'years': years, 'typs': list(typs), 'seed': seed, 'date': f'{today:%Y-%m-%d}'}
+    info_path = os.path.join(root, 'synthetic.json')
+    if os.path.isfile(info_path):
+        with open(info_path, 'r') as file:
+            known = json.load(file)
+        if {key: known.get(key) for key in info} == info:
+            return known
+
+    rng = np.random.default_rng(seed)
+    stations = station_table(n_stations, seed)
+    hist_end = dt(today.year - 1, 12, 31, 23, 50)
+    hist_start = dt(today.year - years, 1, 1)
+    recent_start = today - timedelta(500)
+    size = 0
+    for typ in typs:
+        name, short, columns = PARAMETERS[typ]
+        base = os.path.join(root, *(CLIMATE + RESO + '/' + typ).split('/'))
+        for key in ('historical', 'recent', 'now'):
+            os.makedirs(os.path.join(base, key), exist_ok=True)
+            with open(os.path.join(base, key, f'zehn_min_{short}_Beschreibung_Stationen.txt'), 'wb') as file:
+                file.write(description(stations, hist_start, today))
+        for station_id in stations['Stations_id']:
+            chunk_start = hist_start
+            while chunk_start < hist_end:
+                chunk_end = min(hist_end, dt(chunk_start.year + CHUNK_YEARS - 1, 12, 31, 23, 50))
+                von, bis = f'{chunk_start:%Y%m%d}', f'{chunk_end:%Y%m%d}'
+                write_zip(os.path.join(base, 'historical', f'10minutenwerte_{name}_{station_id}_{von}_{bis}_hist.zip'),
+                          f'produkt_zehn_min_{short}_{von}_{bis}_{station_id}.txt',
+                          product(station_id, columns, chunk_start, chunk_end, rng))
+                chunk_start = chunk_end + timedelta(minutes=10)
+            write_zip(os.path.join(base, 'recent', f'10minutenwerte_{name}_{station_id}_akt.zip'),
+                      f'produkt_zehn_min_{short}_{recent_start:%Y%m%d}_{today - timedelta(1):%Y%m%d}_{station_id}.txt',
+                      product(station_id, columns, recent_start, today - timedelta(minutes=10), rng))
+            write_zip(os.path.join(base, 'now', f'10minutenwerte_{name}_{station_id}_now.zip'),
+                      f'produkt_zehn_min_{short}_now_{station_id}.txt',
+                      product(station_id, columns, today, now, rng))
+
+    os.makedirs(os.path.join(root, 'weather'), exist_ok=True)
+    with open(os.path.join(root, 'weather', 'tree.html'), 'w') as file:
+        file.write(tree_html(typs))
+    for directory, _, files in os.walk(root):
+        size += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+    info.update({'station_ids': list(stations['Stations_id']), 'bytes': size})
+    with open(info_path, 'w') as file:
+        json.dump(info, file)
+    return info
+
+
+if __name__ == "__main__":
+    print(generate(sys.argv[1], *[int(arg) for arg in sys.argv[2:4]]))
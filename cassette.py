@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Record / replay of the requests of a Location for reproducible performance tests
+
+RecordingTransport wraps the transport of a Location and writes every listing, file (archives, tree.html) and
+text (station descriptions) and the size / modification time of the files into a cassette directory. The
+tree.html is recorded when the transport is wrapped, so the replay can build the dwd_tree.txt.
+ReplayTransport serves the cassette without network with a simulated latency per request and bandwidth per
+transfer, so changes of the download concurrency or the caching can be compared offline.
+
+Cassette layout: files/<path on the server>, texts/<path on the server>, listings.json, stats.json and
+cassette.journal (one line per listing / stat since the last close() of the recording, merged at close())
+
+**Example**
+import dwdopendata as dwd
+import cassette
+location = dwd.Location(48.37, 10.94)
+location.transport = cassette.RecordingTransport(location.transport, 'D:/cassettes/wind_2019')
+location.wind('2019-01-01T00:00', '2019-02-01T00:00')
+location.transport.close()  # merges the journal into listings.json and stats.json
+
+replay = dwd.Location(48.37, 10.94, transport=cassette.ReplayTransport('D:/cassettes/wind_2019', latency=0.05,
+                                                                       bandwidth=5e6))
+replay.wind('2019-01-01T00:00', '2019-02-01T00:00')  # offline, 50 ms per request, 5 MB/s
+"""
+import json
+import os
+import threading
+import time
+
+from mirror import TREE
+from transport import Transport
+
+LISTINGS = 'listings.json'
+STATS = 'stats.json'
+JOURNAL = 'cassette.journal'
+
+
+def _file(root: str, kind: str, path: str) -> str:
+    return os.path.join(root, kind, *[part for part in path.strip('/').split('/') if part])
+
+
+def _load(path: str) -> dict:
+    if os.path.isfile(path):
+        with open(path, 'r') as file:
+            return json.load(file)
+    return dict()
+
+
+def _load_cassette(cassette: str) -> dict:
+    """Returns {LISTINGS: dict, STATS: dict} of the cassette with the lines of the journal"""
+    data = {name: _load(os.path.join(cassette, name)) for name in (LISTINGS, STATS)}
+    journal = os.path.join(cassette, JOURNAL)
+    if os.path.isfile(journal):
+        with open(journal, 'r') as file:
+            for line in file:
+                try:
+                    name, path, value = json.loads(line)
+                except ValueError:
+                    # last line of a crashed recording
+                    continue
+                data[name][path] = value
+    return data
+
+
+def _save(path: str, data: dict):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as file:
+        json.dump(data, file)
+    os.replace(tmp, path)
+
+
+class RecordingTransport(Transport):
+    """Passes every call to the wrapped transport and records the answer in the cassette"""
+
+    def __init__(self, transport: Transport, cassette: str):
+        """
+        :param transport: wrapped transport (the server)
+        :param cassette: directory of the cassette, an existing cassette is extended
+        """
+        self.transport = transport
+        self.cassette = cassette
+        self.name = transport.name
+        os.makedirs(cassette, exist_ok=True)
+        data = _load_cassette(cassette)
+        self.listings = data[LISTINGS]
+        self.stats = data[STATS]
+        self._lock = threading.Lock()
+        self._journal = open(os.path.join(cassette, JOURNAL), 'a')
+        try:
+            # the Location may have built its dwd_tree.txt before it was wrapped
+            self.read_text(TREE)
+        except Exception as fail:
+            print(fail)
+            print('The ' + TREE + ' is not in the cassette ' + cassette)
+
+    def _record(self, name: str, data: dict, path: str, value):
+        """Sets data[path] and appends it to the journal, the json files are written at close()"""
+        with self._lock:
+            data[path] = value
+            self._journal.write(json.dumps([name, path, value]) + '\n')
+            self._journal.flush()
+
+    def _write(self, kind: str, path: str, content: bytes):
+        target = _file(self.cassette, kind, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp = target + '.' + str(threading.get_ident()) + '.tmp'
+        with open(tmp, 'wb') as file:
+            file.write(content)
+        os.replace(tmp, target)
+
+    def listdir(self, path: str) -> list:
+        names = self.transport.listdir(path)
+        self._record(LISTINGS, self.listings, path, list(names))
+        return names
+
+    def read(self, path: str) -> bytes:
+        content = self.transport.read(path)
+        self._write('files', path, content)
+        return content
+
+    def read_text(self, path: str) -> str:
+        text = self.transport.read_text(path)
+        self._write('texts', path, text.encode('utf-8'))
+        return text
+
+    def download(self, path: str, file, offset: int = 0):
+        # the whole file is recorded, the replay serves any offset
+        content = self.read(path)
+        file.write(content[offset:])
+
+    def stat(self, path: str) -> dict:
+        remote = self.transport.stat(path)
+        self._record(STATS, self.stats, path, remote)
+        return remote
+
+    def url(self, path: str) -> str:
+        return self.transport.url(path)
+
+    def flush(self):
+        """Merges the journal into listings.json and stats.json"""
+        with self._lock:
+            _save(os.path.join(self.cassette, LISTINGS), self.listings)
+            _save(os.path.join(self.cassette, STATS), self.stats)
+            # the journal starts empty after the merge
+            self._journal.close()
+            self._journal = open(os.path.join(self.cassette, JOURNAL), 'w')
+
+    def prune(self):
+        self.transport.prune()
+
+    def close(self):
+        self.flush()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """Serves a recorded cassette with a simulated latency and bandwidth"""
+
+    name = 'replay'
+
+    def __init__(self, cassette: str, latency: float = 0., bandwidth: float = None):
+        """
+        :param cassette: directory of the cassette
+        :param latency: seconds per request (listing, stat, transfer)
+        :param bandwidth: bytes per second of every transfer (None = no limit)
+        """
+        self.cassette = cassette
+        self.latency = latency
+        self.bandwidth = bandwidth
+        data = _load_cassette(cassette)
+        self.listings = data[LISTINGS]
+        self.stats = data[STATS]
+        self.requests = 0  # replayed requests
+        self._lock = threading.Lock()
+
+    def _delay(self, size: int = 0):
+        with self._lock:
+            self.requests += 1
+        delay = self.latency + (size / self.bandwidth if self.bandwidth else 0.)
+        if delay:
+            time.sleep(delay)
+
+    def _content(self, kind: str, path: str) -> bytes:
+        target = _file(self.cassette, kind, path)
+        if not os.path.isfile(target):
+            raise FileNotFoundError(path + ' is not in the cassette ' + self.cassette)
+        with open(target, 'rb') as file:
+            return file.read()
+
+    def listdir(self, path: str) -> list:
+        if path not in self.listings:
+            raise FileNotFoundError('Listing of ' + path + ' is not in the cassette ' + self.cassette)
+        self._delay()
+        return list(self.listings[path])
+
+    def read(self, path: str) -> bytes:
+        content = self._content('files', path)
+        self._delay(len(content))
+        return content
+
+    def read_text(self, path: str) -> str:
+        if os.path.isfile(_file(self.cassette, 'texts', path)):
+            content = self._content('texts', path)
+            self._delay(len(content))
+            return content.decode('utf-8')
+        return super().read_text(path)
+
+    def download(self, path: str, file, offset: int = 0):
+        content = self._content('files', path)[offset:]
+        self._delay(len(content))
+        file.write(content)
+
+    def stat(self, path: str) -> dict:
+        if path in self.stats:
+            self._delay()
+            return dict(self.stats[path])
+        return {'size': len(self._content('files', path)), 'mtime': None}
+
+    def url(self, path: str) -> str:
+        return 'replay://' + path.lstrip('/')
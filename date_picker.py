@@ -15,6 +15,11 @@ from builtins import Exception
 from datetime import datetime as dt
 from datetime import timedelta
 from calendar import monthrange
+from functools import lru_cache
+
+import lazy
+
+np = lazy.module('numpy')
 
 month_name = (
     'Jan', 'Feb', 'Mar', 'Apr',
@@ -106,7 +111,7 @@ class Timestamp:
         if not isinstance(other, Timestamp):
             # don't attempt to compare against unrelated types
             return NotImplemented
-        return self.timestamp_start <= other.timestamp_start or self.timestamp_end <= other.timestamp_end
+        return self.timestamp_start <= other.timestamp_start and self.timestamp_end <= other.timestamp_end
 
     def __eq__(self, other):
         if not isinstance(other, Timestamp):
@@ -118,7 +123,7 @@ class Timestamp:
         if not isinstance(other, Timestamp):
             # don't attempt to compare against unrelated types
             return NotImplemented
-        return self.timestamp_start != other.timestamp_start and self.timestamp_end != other.timestamp_end
+        return self.timestamp_start != other.timestamp_start or self.timestamp_end != other.timestamp_end
 
     def __gt__(self, other):
         if not isinstance(other, Timestamp):
@@ -130,7 +135,15 @@ class Timestamp:
         if not isinstance(other, Timestamp):
             # don't attempt to compare against unrelated types
             return NotImplemented
-        return self.timestamp_start >= other.timestamp_start or self.timestamp_end >= other.timestamp_end
+        return self.timestamp_start >= other.timestamp_start and self.timestamp_end >= other.timestamp_end
+
+    def split(self, unit: str = 'archive'):
+        """Splits the time-span into chunks aligned to the calendar or to the DWD archives.
+
+        :param unit: see calendar_boundaries(...), e.g. 'month', 'week' or 'archive'
+        :return: IntervalSet of the chunks
+        """
+        return IntervalSet.from_timestamps([self]).split(unit)
 
     def start(self):
         """Returns a str of the start date in an isoformat.
@@ -493,11 +506,7 @@ def control(
 
     """
 
-    def last_week_in_the_year(p_year):
-        last_week_day = 31
-        while dt(p_year, 12, last_week_day).isocalendar()[1] == 1:
-            last_week_day -= 1
-        return dt(p_year, 12, last_week_day).isocalendar()[1]
+    last_week_in_the_year = weeks_in_year
 
     try:
         if not (1970 < year < dt.max.year):
@@ -516,7 +525,7 @@ def control(
             raise Exception('The half of the year is invalid.\nChoose between 1 or 2')
         if not (0 < quarter < 5):
             raise Exception('The quarter of the year is invalid.\nChoose between 1,2,3 or 4')
-        if not (0 < week < last_week_in_the_year(year)):
+        if not (0 < week <= last_week_in_the_year(year)):
             raise Exception(
                 'The week of the year is invalid.\nChoose between 1 and '
                 + str(last_week_in_the_year(year)))
@@ -527,6 +536,17 @@ def control(
     return False
 
 
+@lru_cache(maxsize=None)
+def weeks_in_year(year: int) -> int:
+    """Returns the number of ISO calendar weeks of the year (52 or 53), the 28th dec. is always in the last week
+
+    :param year: the year
+    :type year: int
+    :rtype: int
+    """
+    return dt(year, 12, 28).isocalendar()[1]
+
+
 def year_ts(year: int):
     """Returns the time-span of the given year from
 
@@ -1051,3 +1071,366 @@ def str_to_datetime(date_string: str, sep: str = ' '):
         print("Check your timestamps. Here an Example: '2019-01/01T00'")
         return None
     return datetime_obj
+
+
+_layouts = dict()  # (signature, sep) -> layout of str_to_datetime64, see _layout(...)
+_FIELDS = {'date': {6: ('y', 'm', 'd'), 8: ('Y', 'm', 'd')},
+           'de_date': {6: ('d', 'm', 'y'), 8: ('d', 'm', 'Y')},
+           'time': {2: ('H',), 4: ('H', 'M'), 6: ('H', 'M', 'S')}}
+_WIDTH = {'Y': 4, 'y': 2, 'm': 2, 'd': 2, 'H': 2, 'M': 2, 'S': 2}
+
+
+def _layout(signature: str, sep: str):
+    """Returns {field: positions of its digits} of the strings with the signature (digits as '9') or None
+
+    Same rules as str_to_datetime: the separator (or 'T') splits date and time, a 'de' selects day first.
+    """
+    key = (signature, sep)
+    if key in _layouts:
+        return _layouts[key]
+    chars = [('T' if char == sep else char, i) for i, char in enumerate(signature)]
+    de = 'de' in ''.join(char for char, _ in chars).lower()
+    if de:
+        text = ''.join(char for char, _ in chars).lower()
+        found = text.find('de')
+        while found != -1:
+            chars = chars[:found] + chars[found + 2:]
+            text = text[:found] + text[found + 2:]
+            found = text.find('de')
+        chars = [(char.upper(), i) for char, i in chars]
+    digits = [i for char, i in chars if char == '9']
+    splits = [n for n, (char, _) in enumerate(chars) if char == 'T']
+    layout = None
+    if len(splits) <= 1:
+        split = splits[0] if splits else len(chars)
+        date = [i for char, i in chars[:split] if char == '9']
+        time = [i for char, i in chars[split + 1:] if char == '9']
+        fields = _FIELDS['de_date' if de else 'date'].get(len(date))
+        time_fields = _FIELDS['time'].get(len(time)) if splits else ()
+        if fields is not None and time_fields is not None and (splits or len(digits) <= 8):
+            layout, position = dict(), 0
+            for field in fields:
+                layout[field] = date[position:position + _WIDTH[field]]
+                position += _WIDTH[field]
+            position = 0
+            for field in time_fields:
+                layout[field] = time[position:position + 2]
+                position += 2
+    _layouts[key] = layout
+    return layout
+
+
+def str_to_datetime64(date_strings, sep: str = ' '):
+    """Vectorized str_to_datetime for many strings, e.g. user periods or the dates of archive names
+
+    The format is detected once per layout of the strings (positions of the digits, separator, 'de' for day
+    first) and cached. The digits of all strings of a layout are converted at once with numpy. Strings in an
+    unsupported layout or with an impossible date (e.g. month 13) become NaT.
+
+    :param date_strings: list / array of str, e.g. ['2019-01-01T00:00', 'de31.12.2019 10:00', '20190101']
+    :param sep: the separator between date and time (besides 'T')
+    :type sep: str
+
+    **Example**
+    date_picker.str_to_datetime64(['2019-10-04T12', 'de04.10.2019T12:30'])
+    array(['2019-10-04T12:00:00', '2019-10-04T12:30:00'], dtype='datetime64[s]')
+
+    :return: np.ndarray of datetime64[s]
+    """
+    strings = np.asarray(date_strings, dtype=str)
+    result = np.full(strings.shape, np.datetime64('NaT'), dtype='datetime64[s]')
+    if strings.size == 0 or strings.dtype.itemsize == 0:
+        return result
+    flat = strings.ravel()
+    codes = flat.view(np.uint32).reshape(len(flat), -1)
+    digits = (codes >= 48) & (codes <= 57)
+    # one signature per layout, the digits replaced by '9'
+    signatures = np.where(digits, 57, codes).astype(np.uint32)
+    unique, inverse = np.unique(signatures.view(np.dtype((np.void, signatures.shape[1] * 4))).ravel(),
+                                return_inverse=True)
+    out = result.reshape(-1)
+    values = codes.astype(np.int64) - 48
+    for n, raw in enumerate(unique):
+        signature = ''.join(map(chr, np.frombuffer(raw.tobytes(), dtype=np.uint32))).rstrip('\0')
+        layout = _layout(signature, sep)
+        rows = np.flatnonzero(inverse.ravel() == n)
+        if layout is None:
+            print("Check your timestamps. Here an Example: '2019-01/01T00', unsupported: " + signature)
+            continue
+        part = values[rows]
+        field = {name: part[:, positions] @ 10 ** np.arange(len(positions) - 1, -1, -1)
+                 for name, positions in layout.items()}
+        if 'y' in field:
+            # like strptime: 69-99 -> 19xx, 00-68 -> 20xx
+            field['Y'] = np.where(field['y'] < 69, 2000, 1900) + field['y']
+        zero = np.zeros(len(rows), dtype=np.int64)
+        month = (field['Y'] - 1970) * 12 + field['m'] - 1
+        day = month.astype('datetime64[M]').astype('datetime64[D]') + (field['d'] - 1)
+        stamp = (day.astype('datetime64[s]') + field.get('H', zero) * 3600 + field.get('M', zero) * 60
+                 + field.get('S', zero))
+        valid = ((1 <= field['m']) & (field['m'] <= 12) & (1 <= field['d'])
+                 & (day.astype('datetime64[M]') == month.astype('datetime64[M]'))
+                 & (field.get('H', zero) < 24) & (field.get('M', zero) < 60) & (field.get('S', zero) < 60))
+        out[rows[valid]] = stamp[valid]
+    return result
+
+
+ARCHIVE_YEARS = 10  # the historical archives of the DWD start every 10 years (1990, 2000, 2010, ...)
+ARCHIVE_FOLDER_DAYS = (500, 1)  # days before now of the folder changes historical | recent | now
+CALENDAR_UNITS = ('year', 'half', 'quarter', 'month', 'week', 'day', 'hour', 'decade', 'archive')
+
+
+def _to_datetime64(value):
+    """datetime, pd.Timestamp, np.datetime64 or str (see str_to_datetime64) -> datetime64[s]"""
+    if isinstance(value, str):
+        return str_to_datetime64([value])[0]
+    return np.asarray(value).astype('datetime64[s]')
+
+
+def calendar_boundaries(start, end, unit: str = 'month', now=None):
+    """Returns the boundaries of the calendar unit in the open interval (start, end).
+
+    :param start: start of the time-span
+    :param end: end of the time-span
+    :param unit: 'year', 'half', 'quarter', 'month', 'week' (ISO, Monday), 'day', 'hour', 'decade' or
+                 'archive' (decades of the historical archives and the changes to the recent and now folder)
+    :param now: reference of the folder changes for 'archive', default datetime.now()
+    :type unit: str
+
+    **Example**
+    date_picker.calendar_boundaries(dt(2019, 11, 15), dt(2020, 2, 1), 'month')
+    array(['2019-12-01T00:00:00', '2020-01-01T00:00:00'], dtype='datetime64[s]')
+
+    :return: np.ndarray of datetime64[s]
+    """
+    start, end = _to_datetime64(start), _to_datetime64(end)
+    if unit in ('year', 'half', 'quarter', 'month', 'decade'):
+        step = {'year': 12, 'half': 6, 'quarter': 3, 'month': 1, 'decade': 12 * ARCHIVE_YEARS}[unit]
+        first = start.astype('datetime64[M]').astype(np.int64) // step * step + step
+        months = np.arange(first, end.astype('datetime64[M]').astype(np.int64) + 1, step)
+        boundaries = months.astype('datetime64[M]').astype('datetime64[s]')
+    elif unit == 'week':
+        # 1970-01-01 was a Thursday, the Mondays are the days with (day + 3) % 7 == 0
+        first = (start.astype('datetime64[D]').astype(np.int64) + 3) // 7 * 7 - 3 + 7
+        boundaries = np.arange(first, end.astype('datetime64[D]').astype(np.int64) + 1, 7)
+        boundaries = boundaries.astype('datetime64[D]').astype('datetime64[s]')
+    elif unit in ('day', 'hour'):
+        resolution = 'datetime64[D]' if unit == 'day' else 'datetime64[h]'
+        boundaries = np.arange(start.astype(resolution) + 1, end.astype(resolution) + 1).astype('datetime64[s]')
+    elif unit == 'archive':
+        today = _to_datetime64(now if now is not None else dt.now()).astype('datetime64[D]')
+        folders = np.array([today - days for days in ARCHIVE_FOLDER_DAYS]).astype('datetime64[s]')
+        boundaries = np.union1d(calendar_boundaries(start, end, 'decade'), folders)
+    else:
+        raise ValueError('unit must be one of ' + ', '.join(CALENDAR_UNITS))
+    return boundaries[(boundaries > start) & (boundaries < end)]
+
+
+class IntervalSet:
+    """Set of half-open time intervals [start, end) in two sorted datetime64 arrays.
+
+    The set operations (|, &, -) are vectorized and return merged intervals. Chunks from split(...) keep
+    their boundaries (touching intervals). Useful to compute the missing ranges of a cache or the work units
+    of parallel downloads.
+
+    **Example**
+    wanted = date_picker.year_ts(2019).split('month')
+    cached = date_picker.IntervalSet.from_timestamps([date_picker.month_ts(2019, 3)])
+    missing = wanted - cached  # [2019-01-01, 2019-03-01), [2019-04-01, 2020-01-01)
+    """
+
+    __slots__ = ['starts', 'ends']
+
+    def __init__(self, starts=(), ends=()):
+        """
+        :param starts: sorted start times, the intervals must not overlap (use from_arrays otherwise)
+        :param ends: end times
+        """
+        self.starts = np.asarray(starts).astype('datetime64[s]').ravel()
+        self.ends = np.asarray(ends).astype('datetime64[s]').ravel()
+
+    @classmethod
+    def from_arrays(cls, starts, ends):
+        """Builds a set of any intervals (unsorted, overlapping, start > end swapped), they are merged"""
+        starts = np.asarray(starts).astype('datetime64[s]').ravel()
+        ends = np.asarray(ends).astype('datetime64[s]').ravel()
+        starts, ends = np.minimum(starts, ends), np.maximum(starts, ends)
+        keep = starts < ends
+        starts, ends = starts[keep], ends[keep]
+        if not len(starts):
+            return cls()
+        order = np.argsort(starts, kind='stable')
+        starts, ends = starts[order], ends[order]
+        reach = np.maximum.accumulate(ends)
+        # a new interval begins where the start is behind all ends before it
+        first = np.concatenate([[True], starts[1:] > reach[:-1]])
+        groups = np.flatnonzero(first)
+        return cls(starts[groups], np.maximum.reduceat(ends, groups))
+
+    @classmethod
+    def from_timestamps(cls, timestamps):
+        """Builds a set of Timestamp objects"""
+        return cls.from_arrays([ts.timestamp_start for ts in timestamps], [ts.timestamp_end for ts in timestamps])
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __iter__(self):
+        for start, end in zip(self.starts.astype(dt), self.ends.astype(dt)):
+            yield Timestamp(start, end)
+
+    def __str__(self):
+        return ' '.join('[' + str(start) + ', ' + str(end) + ')' for start, end in zip(self.starts, self.ends))
+
+    def __repr__(self):
+        return 'IntervalSet(' + str(self) + ')'
+
+    def __eq__(self, other):
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        return np.array_equal(self.starts, other.starts) and np.array_equal(self.ends, other.ends)
+
+    def _combine(self, other, keep):
+        """Sweep over the boundaries of both sets, keep(in_self, in_other) selects the segments"""
+        if not isinstance(other, IntervalSet):
+            return NotImplemented
+        points = np.unique(np.concatenate([self.starts, self.ends, other.starts, other.ends]))
+        if len(points) < 2:
+            return IntervalSet()
+        starts, ends = points[:-1], points[1:]
+        selected = keep(self.covers(starts), other.covers(starts))
+        return IntervalSet.from_arrays(starts[selected], ends[selected])
+
+    def __or__(self, other):
+        return self._combine(other, np.logical_or)
+
+    def __and__(self, other):
+        return self._combine(other, np.logical_and)
+
+    def __sub__(self, other):
+        return self._combine(other, lambda mine, theirs: mine & ~theirs)
+
+    union = __or__
+    intersection = __and__
+    difference = __sub__
+
+    def covers(self, times):
+        """Returns a bool array, True where the time is in one of the intervals"""
+        times = np.asarray(times).astype('datetime64[s]')
+        index = np.searchsorted(self.starts, times, side='right') - 1
+        return (index >= 0) & (times < self.ends[np.maximum(index, 0)]) if len(self.starts) else \
+            np.zeros(times.shape, dtype=bool)
+
+    def duration(self):
+        """Returns the total length as np.timedelta64[s]"""
+        return (self.ends - self.starts).sum()
+
+    def split(self, unit: str = 'archive', now=None):
+        """Splits every interval at the boundaries of the unit, see calendar_boundaries(...)
+
+        :return: IntervalSet of the chunks (touching intervals)
+        """
+        if not len(self):
+            return IntervalSet()
+        boundaries = calendar_boundaries(self.starts[0], self.ends[-1], unit, now)
+        boundaries = boundaries[self.covers(boundaries)]
+        points = np.unique(np.concatenate([self.starts, self.ends, boundaries]))
+        starts, ends = points[:-1], points[1:]
+        inside = self.covers(starts)
+        return IntervalSet(starts[inside], ends[inside])
+
+    def locate(self, times):
+        """Returns the index of the interval of every time (-1 outside), e.g. to resample by the periods
+
+        **Example**
+        periods = date_picker.month_periods(2010, 2019)
+        frame.groupby(periods.locate(frame.index)).mean()  # -1 = outside the periods
+
+        :return: np.ndarray of int
+        """
+        times = np.asarray(times).astype('datetime64[s]')
+        index = np.searchsorted(self.starts, times, side='right') - 1
+        return np.where(self.covers(times), index, -1)
+
+
+@lru_cache(maxsize=16)
+def calendar_table(first_year: int, last_year: int) -> dict:
+    """Precomputed calendar of the years first_year to last_year (both included), shared by the period generators
+
+    :return: dict of np.ndarray: 'years', 'year_starts', 'month_starts' (datetime64[s], one more as end),
+             'week_starts' (ISO Mondays, one more as end), 'week_years' and 'week_numbers' (ISO labels of the
+             weeks), 'weeks_in_year'
+    """
+    years = np.arange(first_year, last_year + 2)
+    year_starts = (years - 1970).astype('datetime64[Y]')
+    # Monday of the ISO week 1 is the Monday on or before the 4th jan.
+    jan_4 = year_starts.astype('datetime64[D]') + 3
+    mondays = jan_4 - (jan_4.astype(np.int64) + 3) % 7
+    weeks = ((mondays[1:] - mondays[:-1]) // np.timedelta64(7, 'D')).astype(np.int64)
+    week_starts = np.arange(mondays[0], mondays[-1] + 1, 7)
+    table = {'years': years[:-1], 'year_starts': year_starts.astype('datetime64[s]'),
+             'month_starts': np.arange(year_starts[0].astype('datetime64[M]'),
+                                       year_starts[-1].astype('datetime64[M]') + 1).astype('datetime64[s]'),
+             'week_starts': week_starts.astype('datetime64[s]'), 'week_years': np.repeat(years[:-1], weeks),
+             'week_numbers': np.concatenate([np.arange(1, n + 1) for n in weeks]), 'weeks_in_year': weeks}
+    for values in table.values():
+        values.setflags(write=False)
+    return table
+
+
+def calendar_periods(unit: str, first_year: int, last_year: int) -> IntervalSet:
+    """Returns every period of the unit in the years first_year to last_year (both included) in one call.
+
+    ISO weeks belong to the year of their Thursday, so the first week can start in dec. of the year before.
+    'half' splits the year at the 1st jul. (six months each), half_year_ts(...) at the 1st jun.
+
+    :param unit: 'year', 'half', 'quarter', 'month', 'week' or 'day'
+    :param first_year: first year
+    :param last_year: last year
+    :type unit: str
+
+    **Example**
+    periods = date_picker.calendar_periods('month', 1990, 2019)  # 360 months
+    periods.starts, periods.ends  # datetime64[s] arrays
+
+    :return: IntervalSet of the periods (touching intervals)
+    """
+    table = calendar_table(first_year, last_year)
+    if unit in ('year', 'half', 'quarter', 'month'):
+        bounds = table['month_starts'][::{'year': 12, 'half': 6, 'quarter': 3, 'month': 1}[unit]]
+    elif unit == 'week':
+        bounds = table['week_starts']
+    elif unit == 'day':
+        bounds = np.arange(table['year_starts'][0].astype('datetime64[D]'),
+                           table['year_starts'][-1].astype('datetime64[D]') + 1).astype('datetime64[s]')
+    else:
+        raise ValueError("unit must be 'year', 'half', 'quarter', 'month', 'week' or 'day'")
+    return IntervalSet(bounds[:-1], bounds[1:])
+
+
+def year_periods(first_year: int, last_year: int) -> IntervalSet:
+    """Bulk version of year_ts(...) for the years first_year to last_year"""
+    return calendar_periods('year', first_year, last_year)
+
+
+def half_year_periods(first_year: int, last_year: int) -> IntervalSet:
+    """Both halves of every year (1st jan. - 1st jul. - 1st jan.)
+
+    Not the bulk version of half_year_ts(...), which splits the year at the 1st jun.
+    """
+    return calendar_periods('half', first_year, last_year)
+
+
+def quarter_periods(first_year: int, last_year: int) -> IntervalSet:
+    """Bulk version of quarter_ts(...), four quarters per year"""
+    return calendar_periods('quarter', first_year, last_year)
+
+
+def month_periods(first_year: int, last_year: int) -> IntervalSet:
+    """Bulk version of month_ts(...), twelve months per year"""
+    return calendar_periods('month', first_year, last_year)
+
+
+def calender_week_periods(first_year: int, last_year: int) -> IntervalSet:
+    """Bulk version of calender_week_ts(...), every ISO week of the years (labels in calendar_table(...))"""
+    return calendar_periods('week', first_year, last_year)
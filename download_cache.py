@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Download cache of the archives in the op_path, shared by all threads and processes of a host
+
+The files are stored under <root>/<path on the server>. Historical archives never change, recent and now
+archives are downloaded again after max_age. Every file is downloaded by one thread of one process, the
+others wait and reuse it (see single_flight).
+
+A transfer is written to <file>.part and continued at its offset (FTP REST, HTTP Range, see transport) after a
+dropped connection, in a retry or in a later call. The part is only continued while size and modification time on
+the server are unchanged (<file>.part.json) and the finished file must have the size of the server. Afterwards the
+size and modification time are kept in <file>.json for revalidate(...), a conditional refresh of recent and now
+files. Only transient errors are retried, a permanent one (missing file, see transport.permanent) is raised.
+
+**Example**
+import dwdopendata as dwd
+location = dwd.Location(48.37, 10.94, op_path='D:/shared', cache=True)
+wind = location.wind('2019-01-01T00:00', '2019-02-01T00:00')  # archives are read from D:/shared/dwd_cache
+"""
+from ftplib import all_errors
+import json
+import os
+import time
+
+import instrument
+import single_flight
+import transport
+
+MAX_AGE = {'now': 600., 'recent': 6 * 3600., 'historical': None}  # seconds
+
+
+class DownloadCache:
+    """Local copy of the files of the server"""
+
+    def __init__(self, root: str, max_age: dict = None, retries: int = 5, retry_wait: float = 2.):
+        """
+        :param root: directory of the cache
+        :param max_age: folder name -> seconds until a file is downloaded again (None = never)
+        :param retries: retries of a broken transfer, every retry continues the part
+        :param retry_wait: seconds before the first retry, doubled for every further one (max. 60 s)
+        """
+        self.root = root
+        self.max_age = dict(MAX_AGE) if max_age is None else max_age
+        self.retries = retries
+        self.retry_wait = retry_wait
+
+    def local_path(self, path: str) -> str:
+        """Returns the path of the file in the cache"""
+        return os.path.join(self.root, *path.strip('/').split('/'))
+
+    def age_limit(self, path: str):
+        """Returns max_age of the folder of the path"""
+        for key, age in self.max_age.items():
+            if '/' + key + '/' in path:
+                return age
+        return None
+
+    def fetch(self, location, path: str) -> str:
+        """Returns the local path of a file on the server and downloads it if needed
+
+        :param location: Location object with the transport
+        :param path: absolute path of the file on the server
+        :return: local path
+        """
+        target = self.local_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if instrument.enabled():
+            if single_flight.is_fresh(target, self.age_limit(path)):
+                instrument.count('cache_hits')
+            else:
+                instrument.count('cache_misses')
+                if os.path.exists(target):
+                    instrument.count('cache_evictions')  # expired file is replaced
+        return self._produce(location, path, target, self.age_limit(path))
+
+    def revalidate(self, location, path: str) -> bool:
+        """Conditional refresh: downloads the file again only when its size or modification time (ETag) on the
+        server changed, else the local copy is marked as fresh for another max_age
+
+        :param location: Location object with the transport
+        :param path: absolute path of the file on the server
+        :return: True if the file was downloaded
+        """
+        target = self.local_path(path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        remote = location.transport.stat(path)
+        try:
+            with open(target + '.json', 'r') as file:
+                known = json.load(file)
+        except (IOError, ValueError):
+            known = None
+        if known == remote and remote['size'] is not None and self._size(target) == remote['size']:
+            os.utime(target)
+            return False
+        self._produce(location, path, target, 0.)
+        return True
+
+    def _produce(self, location, path: str, target: str, max_age) -> str:
+        result = single_flight.produce_once(
+            target, lambda tmp: self.download(location, path, tmp, target + '.part', target + '.json'), max_age)
+        if result is None:
+            raise IOError('Download of ' + path + ' failed')
+        return result
+
+    def download(self, location, path: str, local: str, part: str = None, meta: str = None) -> bool:
+        """Downloads a file of the server to the local path, a broken transfer is continued
+
+        A permanent error (FTP 550, HTTP 404, missing local file) is raised right away without any retry.
+
+        :param location: Location object with the transport
+        :param path: absolute path of the file on the server
+        :param local: path of the finished file
+        :param part: path of the partial file, default <local>.part
+        :param meta: path for the size and modification time of the finished file (None = not kept)
+        :return: True if succeeds
+        """
+        part = part or local + '.part'
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(min(60., self.retry_wait * 2 ** (attempt - 1)))
+            try:
+                self._transfer(location.transport, path, part)
+                os.replace(part, local)
+                if meta:
+                    os.replace(part + '.json', meta)
+                else:
+                    os.remove(part + '.json')
+                return True
+            except all_errors as fail:
+                print('Download of ' + path + ' interrupted at ' + str(self._size(part)) + ' bytes: ' + str(fail))
+                if transport.permanent(fail):
+                    raise
+        return False
+
+    def _transfer(self, transport, path: str, part: str):
+        """Continues the part at its offset or starts it again and checks the size"""
+        remote = transport.stat(path)
+        offset = self._size(part)
+        if offset:
+            try:
+                with open(part + '.json', 'r') as file:
+                    known = json.load(file)
+            except (IOError, ValueError):
+                known = None
+            if known != remote or remote['size'] is None or offset > remote['size']:
+                # the file on the server changed or can not be checked
+                offset = 0
+        with open(part + '.json', 'w') as file:
+            json.dump(remote, file)
+        if remote['size'] is None or offset < remote['size']:
+            with open(part, 'ab' if offset else 'wb') as file, instrument.stage('transfer') as stage:
+                transport.download(path, file, offset)
+                stage.add(bytes=file.tell() - offset)
+        if remote['size'] is not None and self._size(part) != remote['size']:
+            raise IOError('Size ' + str(self._size(part)) + ' != ' + str(remote['size']) + ' on the server')
+
+    @staticmethod
+    def _size(path: str) -> int:
+        return os.path.getsize(path) if os.path.isfile(path) else 0
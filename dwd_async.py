@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+asyncio API for the data retrieval of Location
+
+The standard library has no asynchronous FTP client, therefore every FTP connection of the pool is driven
+by one thread of a small I/O executor. Any number of coroutines share the few logged-in connections of the
+pool, the folders and archives of a query are fetched concurrently and the parsing runs in a separate
+executor (default: the executor of the event loop, a ProcessPoolExecutor can be passed).
+
+**Example**
+import asyncio
+import dwdopendata as dwd
+
+async def main():
+    sites = [dwd.Location(48.37, 10.94), dwd.Location(52.52, 13.40)]
+    return await asyncio.gather(*[site.wind_async('2019-01-01T00:00', '2019-02-01T00:00') for site in sites])
+
+results = asyncio.run(main())
+"""
+import asyncio
+import contextvars
+import os
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from ftplib import all_errors
+from functools import partial
+from io import BytesIO
+
+import instrument
+import lazy
+import throttle
+from transport import FTPTransport
+
+pd = lazy.module('pandas')
+
+POOL_SIZE = 4  # FTP connections per server and event loop
+MAX_AGE = 300.  # seconds until a station list text of the pool is downloaded again, like shared.MAX_AGE
+
+_pools = weakref.WeakKeyDictionary()  # event loop -> {server: AsyncFTPPool}
+
+
+class AsyncFTPPool:
+    """Pool of logged-in FTP connections for coroutines
+
+    Every call uses absolute paths, so a connection has no state between two calls and can be used by the
+    next coroutine right away.
+    """
+
+    def __init__(self, location, size: int = POOL_SIZE):
+        """
+        :param location: Location object for the login
+        :param size: max number of connections
+        """
+        self.location = location
+        self.size = size
+        self.executor = ThreadPoolExecutor(size, thread_name_prefix='dwd-ftp')
+        self.descriptions = dict()  # path -> (asyncio.Task of the station list text, time.monotonic() of the start)
+        self._idle = asyncio.Queue()
+        self._slots = asyncio.Semaphore(size)  # connections in use, a slot comes back with every release
+        self._created = 0
+
+    async def run(self, func, *args):
+        """Runs a blocking function in a thread of the pool, in a copy of the context (instrument.recording)"""
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(context.run, func, *args))
+
+    async def acquire(self):
+        """Waits for a free slot and returns an idle connection or opens a new one
+
+        Connections are only opened without an idle one, so in use + idle never exceeds the size. A broken
+        connection or a failed login gives its slot back and wakes the next waiting coroutine.
+        """
+        await self._slots.acquire()
+        if not self._idle.empty():
+            return self._idle.get_nowait()
+        self._created += 1
+        ftp = None
+        try:
+            ftp = await self.run(self.location.ftp_login)
+        finally:
+            if ftp is None:
+                self._created -= 1
+                self._slots.release()
+        if ftp is None:
+            raise ConnectionError('Login to ' + self.location.server + ' failed')
+        return ftp
+
+    def release(self, ftp, broken: bool = False):
+        """Gives a connection back to the pool, a broken connection is closed"""
+        if broken:
+            self._created -= 1
+            try:
+                ftp.close()
+            except all_errors:
+                pass
+        else:
+            self._idle.put_nowait(ftp)
+        self._slots.release()
+
+    @asynccontextmanager
+    async def connection(self):
+        """async with pool.connection() as ftp: ..."""
+        ftp = await self.acquire()
+        try:
+            yield ftp
+        except BaseException:
+            # also cancelled or failed calls: the state of the connection is unknown
+            self.release(ftp, broken=True)
+            raise
+        else:
+            self.release(ftp)
+
+    @property
+    def is_ftp(self) -> bool:
+        """False when the location uses another transport, its calls run in the threads of the pool"""
+        return isinstance(self.location.transport, FTPTransport)
+
+    async def nlst(self, path: str) -> list:
+        """Returns the names of the directory (without the path)"""
+        if not self.is_ftp:
+            with instrument.stage('listing'):
+                return await self.run(self.location.transport.listdir, path)
+        with instrument.stage('listing'):
+            async with self.connection() as ftp:
+                names = await self.run(ftp.nlst, path)
+        return [os.path.basename(name.rstrip('/')) for name in names]
+
+    async def fetch(self, path: str) -> bytes:
+        """Downloads a file into memory"""
+        with instrument.stage('transfer') as stage:
+            if not self.is_ftp:
+                content = await self.run(self.location.transport.read, path)
+            else:
+                buffer = BytesIO()
+                async with self.connection() as ftp:
+                    await self.run(self._retrieve, ftp, path, buffer)
+                content = buffer.getvalue()
+            stage.add(bytes=len(content))
+        return content
+
+    def _retrieve(self, ftp, path: str, buffer):
+        """Blocking download in a thread of the pool, within the throttle of the location"""
+        with throttle.slot(self.location.throttle):
+            ftp.retrbinary('RETR ' + path, buffer.write)
+
+    async def get_text(self, path: str) -> str:
+        """Downloads a text file with the transport, every file is downloaded only once per pool and MAX_AGE
+
+        A failed download is not kept, the next call downloads the file again.
+        """
+        entry = self.descriptions.get(path)
+        if entry is None or time.monotonic() - entry[1] > MAX_AGE:
+            entry = (asyncio.ensure_future(self.run(self.location.transport.read_text, path)), time.monotonic())
+            self.descriptions[path] = entry
+        try:
+            # shield: a cancelled caller does not cancel the download of the other callers
+            return await asyncio.shield(entry[0])
+        except Exception:
+            if self.descriptions.get(path) is entry:
+                del self.descriptions[path]
+            raise
+
+    async def close(self):
+        """Closes all idle connections and the I/O threads"""
+        while not self._idle.empty():
+            ftp = self._idle.get_nowait()
+            self._created -= 1
+            try:
+                await self.run(ftp.quit)
+            except all_errors:
+                ftp.close()
+        self.executor.shutdown(wait=False)
+
+
+def get_pool(location, size: int = POOL_SIZE) -> AsyncFTPPool:
+    """Returns the pool of the server of the location for the running event loop (shared by all locations with
+    the same server and transport)"""
+    pools = _pools.setdefault(asyncio.get_running_loop(), dict())
+    key = location.transport.url('/')
+    if key not in pools:
+        pools[key] = AsyncFTPPool(location, size)
+    return pools[key]
+
+
+async def close_pools():
+    """Closes the pools of the running event loop"""
+    for pool in _pools.pop(asyncio.get_running_loop(), dict()).values():
+        await pool.close()
+
+
+async def _parse(executor, func, *args):
+    """Runs CPU-heavy parsing in the executor"""
+    with instrument.stage('parse') as stage:
+        frame = await asyncio.get_running_loop().run_in_executor(executor, partial(func, *args))
+        stage.add(rows=len(frame))
+    return frame
+
+
+async def station_tables(location, start, end, typ, reso='10_minutes', folder='cdc_obDE_climate',
+                         executor=None):
+    """async version of Location.station_tables(...), the folders are listed concurrently"""
+    from dwdopendata import Location
+    index = folder == 'cdc_obDE_climate' and reso == '10_minutes' and location.availability is not None
+    if folder == 'cdc_obDE_climate':
+        folder = location.cdc_obDE_climate
+    pool = get_pool(location)
+    # search_folder builds the dwd_tree.txt when it is missing (a download), not on the event loop
+    path = (await pool.run(location.search_folder, folder + reso + f'/{typ}/'))['path']
+    folder_name = '/' + path.strip('/') + '/'
+    if index and location.availability.has(typ):
+        return location.availability.station_tables(*location.coordinate, typ, start, end), folder_name
+    time_matrix = Location.timematrix(await pool.nlst(folder_name), start, end)
+    keys = [key for key in time_matrix if True in time_matrix[key]]
+
+    async def description(key):
+        for name in await pool.nlst(folder_name + key):
+            if 'Beschreibung_Stationen.txt' in name:
+                path = folder_name + key + '/' + name
+                with instrument.stage('description') as stage:
+                    text = await pool.get_text(path)
+                    # only the static parser goes to the executor, a Location can not be pickled (process pool)
+                    table = await asyncio.get_running_loop().run_in_executor(executor, Location.station_table, text)
+                    station = await pool.run(location.station_list, location.transport.url(path), text, table)
+                    stage.add(bytes=len(text), rows=len(station))
+                return station.rename_axis(key, axis=1)
+
+    stations = await asyncio.gather(*[description(key) for key in keys])
+    return [station for station in stations if station is not None], folder_name
+
+
+async def ftp_get_data(location, path: str, station_id: str, start=None, end=None, executor=None) -> list:
+    """async version of Location.ftp_get_data(...), the archives are downloaded concurrently"""
+    pool = get_pool(location)
+    file_names = [zip_file for zip_file in await pool.nlst(path) if station_id in zip_file]
+    if 'historical' in path and start is not None and end is not None:
+        file_names = location.filter_list_of_directory_by_time(file_names, start, end)
+
+    async def read(filename):
+        if location.cache is not None:
+            local = await pool.run(location.cache.fetch, location, path + '/' + filename)
+            return await _parse(executor, location.read_data, local)
+        content = await pool.fetch(path + '/' + filename)
+        return await _parse(executor, location.read_data, location.transport.url(path + '/' + filename), content)
+
+    return list(await asyncio.gather(*[read(filename) for filename in file_names]))
+
+
+async def station_data(location, path: str, station, station_id: str, start, end, executor=None):
+    """async version of Location.station_data(...)"""
+    frames = await ftp_get_data(location, path, station_id, start, end, executor)
+    if not frames:
+        return None
+    tmp_frame = pd.concat(frames)
+    tmp_frame.set_index('MESS_DATUM', inplace=True)
+    station_height = station.loc[station['Stations_id'] == station_id, 'Stationshoehe'].iloc[0]
+    tmp_frame.columns.set_names('Height [m]: ' + station_height, inplace=True)
+    return tmp_frame
+
+
+async def get_10_min_data(location, start, end, typ, station_id=None, folder='cdc_obDE_climate', executor=None):
+    """async version of Location.get_10_min_data(...)
+
+    :param executor: concurrent.futures executor for the parsing, default the executor of the event loop
+    :return: {'data': pd.DataFrame, 'meta': station lists}
+    """
+    reso = '10_minutes'
+    start, end = location.str_to_timestamp(start, end)
+    stations, folder_name = await station_tables(location, start, end, typ, reso, folder, executor)
+    jobs = location.plan_downloads(stations, station_id, typ, start, end)
+    frames = await asyncio.gather(*[station_data(location, folder_name + key, station, sid, start, end, executor)
+                                    for key, station, sid in jobs])
+    data = {key: frame for (key, _, _), frame in zip(jobs, frames)}
+    frame = location.concat_folders(data, start, end, reso)
+    return {'data': frame, 'meta': stations}
@@ -7,11 +7,27 @@ from datetime import datetime as dt
 from datetime import timedelta
 from math import pi, acos, sin, cos, log
 from ftplib import FTP, all_errors
-import requests
+from io import BytesIO
 import os
 import json
-import pandas as pd
-import numpy as np
+import threading
+import lazy
+import interpolation
+import arrow_output
+import availability
+import date_picker as dp
+import instrument
+import shared
+from download_cache import DownloadCache
+from transport import Transport, FTPTransport, HTTPSTransport, LocalTransport
+from mirror import MIRROR_DIR
+
+# imported at the first use, import dwdopendata and Location(...) do not load them
+pd = lazy.module('pandas')
+np = lazy.module('numpy')
+requests = lazy.module('requests')
+dwd_async = lazy.module('dwd_async')  # asyncio
+live = lazy.module('live')
 
 # the resolution dict should help find the resolution
 resolution = {'10 min': '10_minutes', '1 min': '1_minute', 'y': 'annual', 'd': 'daily',
@@ -21,19 +37,38 @@ reso_folder = {'recent': [500, 1], 'now': [1, 0], 'historical': [14600, 500]}  #
 
 class Location:
     """The Location object builds a list of the stations listed on the dwd server sorted by the distance
+
+    A Location can be used by many threads at the same time: the calls do not change its attributes, the FTP
+    connections are kept per thread, the dwd_tree.txt and the download cache are written atomically. Set the
+    attributes (server, throttle, parse_pool, ...) before sharing it. With shared=True the transport, the
+    listings and the station descriptions are shared by all locations of the process (see shared).
     """
-    def __init__(self, lat: float = 51.0, lon: float = 10.0, op_path: str = None):
+    def __init__(self, lat: float = 51.0, lon: float = 10.0, op_path: str = None, cache: bool = False,
+                 transport='ftp', mirror: bool = False, shared: bool = False):
         """
         :param lon: longitude (example 51.0)
         :param lat: latitude (example 10.0)
+        :param op_path: directory of the dwd_tree.txt and the cache (default: current working directory)
+        :param cache: keep the downloaded archives in <op_path>/dwd_cache, shared by all processes of the op_path
+        :param transport: 'ftp', 'https', directory with the layout of the server or a transport.Transport object
+        :param mirror: read everything from the local mirror <op_path>/dwd_mirror (see mirror.sync(...))
+        :param shared: use the transport, listings and station descriptions shared by the process (ftp, https)
         """
         self.coordinate = [lat, lon]
         self.server = 'opendata.dwd.de'
+        self.ftp_port = 21
         self.cdc_obDE_climate = 'climate_environment/CDC/observations_germany/climate/'
         self.debug_level = 0
-        self.op_path = os.getcwd() or op_path
-        if not os.path.isfile(self.op_path + '\\dwd_tree.txt'):
-            self.build_tree()
+        self.op_path = op_path or os.getcwd()
+        self.tree_path = os.path.join(self.op_path, 'dwd_tree.txt')
+        self.cache = DownloadCache(os.path.join(self.op_path, 'dwd_cache')) if cache else None
+        self.availability = None  # availability.AvailabilityIndex, see availability_index(...)
+        self.parse_pool = None  # parallel_parse.ParsePool, parses the archives in a process pool
+        self.throttle = None  # throttle.Throttle, rate limit and adaptive concurrency (can be shared)
+        self.shared = shared
+        if mirror:
+            transport = os.path.join(self.op_path, MIRROR_DIR)
+        self.transport = self.make_transport(transport)
 
     def __str__(self):
         """Returns a string in a specific format.
@@ -42,6 +77,27 @@ class Location:
         """
         return 'Latitude: ' + str(self.coordinate[0]) + ', Longitude: ' + str(self.coordinate[1])
 
+    def make_transport(self, transport):
+        """Returns the transport object for the listings and downloads
+
+        :param transport: 'ftp', 'https', directory with the layout of the server or a transport.Transport object
+        :return: transport.Transport
+        """
+        if isinstance(transport, Transport):
+            return transport
+        if self.shared and transport in ('ftp', 'https'):
+            # the shared transport must not depend on this location (its later changes, its lifetime)
+            endpoint = shared.Endpoint(self)
+            factory = FTPTransport if transport == 'ftp' else HTTPSTransport
+            return shared.transport((transport,) + endpoint.key(), lambda: factory(endpoint))
+        if transport == 'ftp':
+            return FTPTransport(self)
+        if transport == 'https':
+            return HTTPSTransport(self)
+        if os.path.isdir(transport):
+            return LocalTransport(transport)
+        raise ValueError("transport must be 'ftp', 'https', a directory or a transport.Transport")
+
     def calc_distance(self, lat_lon) -> float:
         """Calculates the distance between the given point and the station
 
@@ -54,16 +110,38 @@ class Location:
         radius = 6378.388  # * pi / 180  # = 111.324
         return radius * acos(sin(lat1) * sin(lat2) + cos(lat1) * cos(lat2) * cos(lon2 - lon1))
 
-    def station_list(self, url: str):
+    def station_list(self, url: str, text: str = None, table=None):
         """ Builds a pandas Dataframe of the stations from the given url sorted by the distance from the coordinates
 
         :param url: URL to the station list
         :type url: str
+        :param text: content of the station list, when it is already downloaded
+        :type text: str
+        :param table: station_table(text), when it is already parsed (e.g. in a process pool)
         :return: pd.DataFrame of the station sorted by the distance from the location
         :rtype: pd.DataFrame
         """
+        if text is None:
+            text = requests.get(url).text
+        parse = self.station_table if table is None else (lambda _: table)
+        if self.shared:
+            sta = shared.station_table(url, text, parse)
+        else:
+            sta = parse(text)
+        # assign returns a new frame, the shared table is not changed
+        sta = sta.assign(distanz=sta[['geoBreite', 'geoLaenge']].apply(self.calc_distance, axis=1))
+        sta = sta.sort_values(by='distanz')
+        return sta
+
+    @staticmethod
+    def station_table(text: str):
+        """Parses a station description (without the distance)
+
+        :param text: content of the station list
+        :return: pd.DataFrame of the stations
+        """
         _dt_format = '%Y%m%d'
-        stations = [text.split() for text in requests.get(url).text.split('\r\n')]
+        stations = [line.split() for line in text.split('\r\n')]
         sta = list()
         for station in stations[2:]:
             if len(station) > 7:
@@ -75,8 +153,6 @@ class Location:
         sta = pd.DataFrame(sta, columns=col_name)
         sta[col_name[1]] = pd.to_datetime(sta[col_name[1]], format=_dt_format)
         sta[col_name[2]] = pd.to_datetime(sta[col_name[2]], format=_dt_format)
-        sta['distanz'] = sta[['geoBreite', 'geoLaenge']].apply(self.calc_distance, axis=1)
-        sta = sta.sort_values(by='distanz')
         return sta
 
     def search_folder(self, key: str, unique: bool = True) -> list:
@@ -88,9 +164,7 @@ class Location:
         :type unique: bool
         :return: dictionary with path to the folder
         """
-        dwd_tree_path = self.op_path + '\\dwd_tree.txt'
-        with open(dwd_tree_path, 'r') as file:
-            paths = json.load(file)
+        paths = self.tree()
         results = list()
         if r'/' in key or r'\\' in key:
             for path in paths:
@@ -108,7 +182,16 @@ class Location:
                         results.append(path)
         return results
 
-    def wind(self, start, end, station_id=None, folder='cdc_obDE_climate'):
+    def tree(self) -> list:
+        """Returns the folders of the dwd_tree.txt, it is downloaded at the first use when it is missing
+
+        The parsed tree is shared by all locations of the process with the same op_path.
+        :return: list of dict with the path and the folder
+        """
+        return shared.tree(self.tree_path, self.build_tree)
+
+    def wind(self, start, end, station_id=None, folder='cdc_obDE_climate', fallback: int = 0,
+             output: str = 'pandas'):
         """Downloads wind-data from the nearest station
 
         :param start: Start-time
@@ -117,19 +200,23 @@ class Location:
             reso = {'10 min': '10_minutes', 'h': 'hourly', 's_d': 'subdaily'}
         :param station_id: ID of the station
         :param folder: test / advance option
+        :param fallback: number of the next stations to fill the gaps, see get_10_min_data(...)
+        :param output: 'pandas' or 'arrow', see get_10_min_data(...)
         :return:
         """
-        return self.get_10_min_data(start, end, 'wind', station_id, folder)
+        return self.get_10_min_data(start, end, 'wind', station_id, folder, fallback, output)
 
-    def temperature(self, start, end, station_id=None, folder='cdc_obDE_climate'):
-        return self.get_10_min_data(start, end, 'air_temperature', station_id, folder)
+    def temperature(self, start, end, station_id=None, folder='cdc_obDE_climate', fallback: int = 0,
+                    output: str = 'pandas'):
+        return self.get_10_min_data(start, end, 'air_temperature', station_id, folder, fallback, output)
 
     def precipitation(self, start, end, station_id=None, folder='cdc_obDE_climate'):
 
         return 'not ready jet'
         # return self.get_10_min_data(start, end, 'precipitation', station_id, folder)
 
-    def solar(self, start, end, station_id=None, folder='cdc_obDE_climate'):
+    def solar(self, start, end, station_id=None, folder='cdc_obDE_climate', fallback: int = 0,
+              output: str = 'pandas'):
         """Downloads wind-data from the nearest station
 
         :param start: Start-time
@@ -138,54 +225,376 @@ class Location:
             reso = {'10 min': '10_minutes', 'h': 'hourly', 's_d': 'subdaily'}
         :param station_id: ID of the station
         :param folder: test / advance option
+        :param fallback: number of the next stations to fill the gaps, see get_10_min_data(...)
+        :param output: 'pandas' or 'arrow', see get_10_min_data(...)
         :return:
         """
-        return self.get_10_min_data(start, end, 'solar', station_id, folder)
+        return self.get_10_min_data(start, end, 'solar', station_id, folder, fallback, output)
+
+    def get_10_min_data(self, start, end, typ, station_id=None, folder='cdc_obDE_climate', fallback: int = 0,
+                        output: str = 'pandas'):
+        """Downloads the 10 min data of a station and concat the folders historical, recent and now
+
+        With fallback > 0 the gaps (missing rows) and the uncovered part of the time frame are filled with
+        the data of the next stations of the already sorted station list, see fill_gaps(...).
+
+        :param start: Start-time
+        :param end: end-time
+        :param typ: parameter folder, e.g. 'wind'
+        :param station_id: ID of the station, default the nearest station
+        :param folder: test / advance option
+        :param fallback: max number of the next stations to fill the gaps (0 = no gap filling)
+        :param output: 'pandas' or 'arrow' (pyarrow.Table with the stations in the schema metadata, see
+            arrow_output)
+        :return: {'data': pd.DataFrame, 'meta': station lists} and 'sources' with fallback > 0
+        """
+        reso = '10_minutes'
+        if output not in ('pandas', 'arrow'):
+            raise ValueError("output must be 'pandas' or 'arrow'")
+        if output == 'arrow' and (fallback or not arrow_output.available()):
+            raise ValueError("output='arrow' needs pyarrow and does not support fallback")
+        start, end = self.str_to_timestamp(start, end)
+        stations, folder_name = self.station_tables(start, end, typ, reso, folder)
+
+        if output == 'arrow':
+            data, chosen = dict(), dict()
+            for key, station, station_id in self.plan_downloads(stations, station_id, typ, start, end):
+                data[key] = arrow_output.station_table(self, folder_name + key, station_id, start, end)
+                row = station.loc[station['Stations_id'] == station_id]
+                chosen[key] = row.iloc[0] if len(row) else None
+            table = arrow_output.concat_folders(data, start, end, reso)
+            return {'data': arrow_output.with_stations(table, chosen), 'meta': stations}
+
+        # download data from every folder
+        data = dict()
+        for key, station, station_id in self.plan_downloads(stations, station_id, typ, start, end):
+            data.update({key: self.station_data(folder_name + key, station, station_id, start, end)})
+
+        frame = self.concat_folders(data, start, end, reso)
+        if fallback:
+            frame, sources = self.fill_gaps(frame, stations, folder_name, station_id, start, end, fallback, reso)
+            return {'data': frame, 'meta': stations, 'sources': sources}
+        return {'data': frame, 'meta': stations}
+
+    async def get_10_min_data_async(self, start, end, typ, station_id=None, folder='cdc_obDE_climate',
+                                    executor=None):
+        """async version of get_10_min_data(...), see dwd_async
+
+        :param executor: concurrent.futures executor for the parsing, default the executor of the event loop
+        """
+        return await dwd_async.get_10_min_data(self, start, end, typ, station_id, folder, executor)
+
+    async def wind_async(self, start, end, station_id=None, folder='cdc_obDE_climate', executor=None):
+        """async version of wind(...)"""
+        return await self.get_10_min_data_async(start, end, 'wind', station_id, folder, executor)
+
+    async def temperature_async(self, start, end, station_id=None, folder='cdc_obDE_climate', executor=None):
+        """async version of temperature(...)"""
+        return await self.get_10_min_data_async(start, end, 'air_temperature', station_id, folder, executor)
+
+    async def solar_async(self, start, end, station_id=None, folder='cdc_obDE_climate', executor=None):
+        """async version of solar(...)"""
+        return await self.get_10_min_data_async(start, end, 'solar', station_id, folder, executor)
+
+    def follow(self, typ, station_id=None, interval: float = 60., since=None, polls: int = None,
+               folder='cdc_obDE_climate'):
+        """Generator of the newly published 10 min rows of a station (live tail of the now archive), see live
+
+        The archive is only downloaded when it changed and only the lines after the last seen MESS_DATUM are
+        parsed.
+
+        :param typ: parameter folder, e.g. 'wind'
+        :param station_id: ID of the station, default the nearest station of the now folder
+        :param interval: seconds between two polls
+        :param since: only rows after this time (default: the first frame holds the whole now archive)
+        :param polls: max number of polls (None = endless)
+        :param folder: test / advance option
+        :return: generator of pd.DataFrame indexed by MESS_DATUM
+        """
+        return live.follow(self, typ, station_id, interval, since, polls, folder)
+
+    def follow_async(self, typ, station_id=None, interval: float = 60., since=None, polls: int = None,
+                     folder='cdc_obDE_climate'):
+        """async iterator version of follow(...): async for rows in location.follow_async('wind'): ..."""
+        return live.follow_async(self, typ, station_id, interval, since, polls, folder)
+
+    def plan_downloads(self, stations: list, station_id, typ: str, start, end) -> list:
+        """Chooses the station of every folder
+
+        Without an availability index the station ID is set to the nearest station of the folder when it is not in
+        the list. With an availability index the nearest station with data for the whole time frame is taken for
+        every folder and the folders without data of the station are skipped.
+
+        :param stations: station lists from station_tables(...)
+        :param station_id: ID of the station or None
+        :param typ: parameter folder
+        :param start: Start-time
+        :param end: end-time
+        :return: list of (folder name, station list, station ID)
+        """
+        folders = None
+        if self.availability is not None:
+            # nearest station with data for the whole time frame, the same for every folder
+            station_id = station_id or self.availability.nearest(*self.coordinate, typ, start, end)
+            folders = self.availability.folders(station_id, typ, start, end) if station_id else None
+
+        jobs = list()
+        for station in stations:
+            key = station.columns.name
+            if folders and key not in folders:
+                continue
+            if station[station.isin([station_id])].empty:
+                print('Station ID is not in the list, set station ID to the nearest station')
+                station_id = None
+            station_id = station_id or station['Stations_id'].iloc[0]
+            jobs.append((key, station, station_id))
+        return jobs
+
+    def fill_gaps(self, frame, stations: list, folder_name: str, station_id: str, start, end,
+                  fallback: int = 3, reso='10_minutes'):
+        """Fills the missing rows of the frame with the data of the next stations
+
+        The next stations are taken by the distance over all station lists (merged_stations(...)). A station is only
+        used when its von_datum / bis_datum covers a gap and only the archives of the gaps are downloaded.
+
+        :param frame: pd.DataFrame from concat_folders(...)
+        :param stations: station lists from station_tables(...)
+        :param folder_name: path of the parameter folder
+        :param station_id: ID of the station of the frame
+        :param start: Start-time
+        :param end: end-time
+        :param fallback: max number of stations to try
+        :param reso: resolution folder
+        :return: (filled pd.DataFrame, pd.DataFrame with the columns start, end, Stations_id, rows of every
+            filled segment)
+        """
+        freq = '10min' if reso == '10_minutes' else frame.index.freq
+        index = pd.date_range(pd.Timestamp(start).ceil(freq), end, freq=freq)
+        index = index[index < end]
+        frame = frame.reindex(index)
+        columns = [column for column in frame.columns if column != 'STATIONS_ID' and not column.startswith('QN')]
+        gap = frame[columns].isna().all(axis=1).to_numpy().copy()
+        source = np.full(len(index), None, dtype=object)
+
+        tables = self.merged_stations(stations)
+        # only stations which cover a gap, the next fallback ones of them
+        missing = index[gap]
+        covering = (missing.searchsorted(tables['bis_datum'] + timedelta(1))
+                    > missing.searchsorted(tables['von_datum']))
+        candidates = [sid for sid in tables['Stations_id'][covering] if sid != station_id][:fallback]
+        for candidate in candidates:
+            if not gap.any():
+                break
+            data = dict()
+            for station in stations:
+                row = station[station['Stations_id'] == candidate]
+                if row.empty:
+                    continue
+                covered = (index >= row['von_datum'].iloc[0]) & (index < row['bis_datum'].iloc[0] + timedelta(1))
+                intervals = self.mask_segments(index, gap & covered, freq)
+                if intervals:
+                    key = station.columns.name
+                    data.update({key: self.station_data(folder_name + key, station, candidate,
+                                                        intervals[0][0], intervals[-1][1], intervals)})
+            data = {key: value for key, value in data.items() if value is not None}
+            if not data:
+                continue
+            filler = self.concat_folders(data, start, end, reso).reindex(index)
+            if not len(frame.columns):
+                # the station has no data at all: the columns of the first filler
+                frame = frame.reindex(columns=filler.columns)
+                columns = [column for column in frame.columns
+                           if column != 'STATIONS_ID' and not column.startswith('QN')]
+            fill = gap & ~filler[columns].isna().all(axis=1).to_numpy()
+            common = [column for column in frame.columns if column in filler.columns]
+            frame.loc[fill, common] = filler.loc[fill, common].to_numpy()
+            source[fill] = candidate
+            gap &= ~fill
+
+        sources = list()
+        for candidate in candidates:
+            for seg_start, seg_end in self.mask_segments(index, source == candidate, freq):
+                sources.append([seg_start, seg_end, candidate, int(((index >= seg_start) & (index < seg_end)).sum())])
+        sources = pd.DataFrame(sources, columns=['start', 'end', 'Stations_id', 'rows']).sort_values(by='start')
+        return frame, sources.reset_index(drop=True)
+
+    @staticmethod
+    def mask_segments(index, mask, freq='10min') -> list:
+        """Returns the contiguous True segments of the mask as list of (start, end) with an exclusive end
+
+        :param index: pd.DatetimeIndex
+        :param mask: bool array with the same length as the index
+        :param freq: step of the index
+        :return: list of (pd.Timestamp, pd.Timestamp)
+        """
+        edges = np.diff(np.concatenate([[0], np.asarray(mask, dtype=np.int8), [0]]))
+        first, last = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        return [(index[i], index[j - 1] + pd.Timedelta(freq)) for i, j in zip(first, last)]
+
+    def interpolate(self, start, end, typ, points=None, k: int = 4, power: float = 2., heights=None,
+                    height_gradient: dict = None, folder='cdc_obDE_climate'):
+        """Interpolates the 10 min data of the k nearest stations (inverse distance weighting) to the location
+        or to a grid of points
 
-    def get_10_min_data(self, start, end, typ, station_id=None, folder='cdc_obDE_climate'):
+        The weights are computed once for all points, every station is downloaded once.
+
+        :param start: Start-time
+        :param end: end-time
+        :param typ: parameter folder, e.g. 'wind', 'air_temperature', 'solar'
+        :param points: list of [LAT, LON], default the coordinate of the location
+        :param k: number of stations per point
+        :param power: exponent of the distance
+        :param heights: height of the point(s) in m for the height correction with the Stationshoehe
+        :param height_gradient: dict column -> change per meter, e.g. {'TT_10': -0.0065}
+        :param folder: test / advance option
+        :return: {'data': pd.DataFrame for the location or dict column -> pd.DataFrame (time x points),
+            'meta': station lists, 'stations': used station table, 'weights': weight matrix}
+        """
         reso = '10_minutes'
+        start, end = self.str_to_timestamp(start, end)
+        stations, folder_name = self.station_tables(start, end, typ, reso, folder)
+        candidates = self.merged_stations(stations)
+        candidates = candidates[(candidates['von_datum'] <= end) & (candidates['bis_datum'] >= start)]
+
+        single = points is None
+        points = [self.coordinate] if single else points
+        weights = interpolation.idw_weights(points, candidates[['geoBreite', 'geoLaenge']].astype(float), k, power)
+
+        frames = [None] * len(candidates)
+        for i in interpolation.used_stations(weights):
+            station_id = candidates['Stations_id'].iloc[i]
+            data = dict()
+            for station in stations:
+                if not station[station['Stations_id'] == station_id].empty:
+                    key = station.columns.name
+                    data.update({key: self.station_data(folder_name + key, station, station_id, start, end)})
+            frames[i] = self.concat_folders(data, start, end, reso)
+
+        if heights is not None:
+            heights = np.atleast_1d(np.asarray(heights, dtype=float))
+        result = interpolation.interpolate_frames(frames, weights, candidates['Stationshoehe'].astype(float),
+                                                  heights, height_gradient)
+        if single:
+            result = pd.DataFrame({column: frame[0] for column, frame in result.items()})
+        return {'data': result, 'meta': stations, 'stations': candidates, 'weights': weights}
+
+    def availability_index(self, typs=availability.TYPS, rebuild: bool = False):
+        """Loads the availability index from the op_path or builds and saves it
+
+        Afterwards get_10_min_data(...) takes the station lists from the index (no listing and no station
+        description is downloaded), the nearest station with data for the whole time frame and downloads only the
+        folders with data of the station. A file older than availability.MAX_AGE is built again.
+
+        :param typs: parameter folders of the index
+        :param rebuild: build the index also when the file exists
+        :return: availability.AvailabilityIndex
+        """
+        path = os.path.join(self.op_path, availability.FILE_NAME)
+        if os.path.isfile(path) and not rebuild:
+            self.availability = availability.AvailabilityIndex.load(path)
+        if rebuild or self.availability is None or self.availability.age() > availability.MAX_AGE:
+            self.availability = availability.AvailabilityIndex.build(self, typs)
+            self.availability.save(path)
+        return self.availability
+
+    def station_tables(self, start, end, typ, reso='10_minutes', folder='cdc_obDE_climate'):
+        """Lists the folders (historical, recent, now) with data in the time frame and downloads their station list
+
+        With an availability index (see availability_index(...)) the station lists come from the index.
+
+        :param start: Start-time (datetime)
+        :param end: end-time (datetime)
+        :param typ: parameter folder, e.g. 'wind'
+        :param reso: resolution folder
+        :param folder: test / advance option
+        :return: (list of pd.DataFrame from station_list(...) with the folder name as axis name, path of the folder)
+        """
+        index = folder == 'cdc_obDE_climate' and reso == '10_minutes' and self.availability is not None
         if folder == 'cdc_obDE_climate':
             folder = self.cdc_obDE_climate
-        start, end = self.str_to_timestamp(start, end)
         path = folder + reso + f'/{typ}/'
-        path = self.search_folder(path)['path']
-        ftp = self.ftp_login()
-        ftp.cwd(path)
+        folder_name = '/' + self.search_folder(path)['path'].strip('/') + '/'
+        if index and self.availability.has(typ):
+            # in-memory lookup, see availability_index(...)
+            return self.availability.station_tables(*self.coordinate, typ, start, end), folder_name
 
-        time_matrix = self.timematrix(ftp.nlst(), start, end)
+        with instrument.stage('listing'):
+            time_matrix = self.timematrix(self.transport.listdir(folder_name), start, end)
 
         stations = list()
         for key in time_matrix:
             if True in time_matrix[key]:
-                ftp.cwd(key)
-                for description in ftp.nlst():
+                with instrument.stage('listing'):
+                    listing = self.transport.listdir(folder_name + key)
+                for description in listing:
                     if 'Beschreibung_Stationen.txt' in description:
-                        url = 'https://' + self.server + ftp.pwd() + '/' + description
-                        stations.append(self.station_list(url).rename_axis(key, axis=1))
+                        path = folder_name + key + '/' + description
+                        with instrument.stage('description') as stage:
+                            text = self.transport.read_text(path)
+                            station = self.station_list(self.transport.url(path), text)
+                            stage.add(bytes=len(text), rows=len(station))
+                        stations.append(station.rename_axis(key, axis=1))
                         break
-                ftp.cwd('..')
-        folder_name = ftp.pwd() + '/'
-        ftp.close()
+        return stations, folder_name
 
-        # download data from every folder
+    @staticmethod
+    def merged_stations(stations: list):
+        """One row per station of all station lists, sorted by the distance
+
+        von_datum / bis_datum span all folders of the station (the earliest von_datum, the latest bis_datum).
+
+        :param stations: station lists from station_tables(...)
+        :return: pd.DataFrame
+        """
+        tables = pd.concat(stations)
+        span = tables.groupby('Stations_id').agg(von_datum=('von_datum', 'min'), bis_datum=('bis_datum', 'max'))
+        merged = tables.drop_duplicates('Stations_id')
+        merged = merged.assign(von_datum=merged['Stations_id'].map(span['von_datum']),
+                               bis_datum=merged['Stations_id'].map(span['bis_datum']))
+        return merged.sort_values(by='distanz', kind='stable')
+
+    def station_data(self, path: str, station, station_id: str, start, end, intervals: list = None):
+        """Downloads the data of one station from one folder and returns it indexed by MESS_DATUM
+
+        :param path: path to the folder (historical, recent, now)
+        :param station: station list of the folder from station_list(...)
+        :param station_id: ID of the station
+        :param start: Start-time
+        :param end: end-time
+        :param intervals: list of (start, end), only the historical archives of these intervals are downloaded
+        :return: pd.DataFrame, the column axis name holds the height of the station (None without any file)
+        """
         time_column = 'MESS_DATUM'
-        data = dict()
+        frames = self.ftp_get_data(path, station_id, start, end, intervals)
+        if not frames:
+            return None
+        tmp_frame = pd.concat(frames)
+        tmp_frame.set_index(time_column, inplace=True)
+        stiation_height = station.loc[station['Stations_id'] == station_id, 'Stationshoehe'].iloc[0]
+        tmp_frame.columns.set_names('Height [m]: ' + stiation_height, inplace=True)
+        return tmp_frame
 
-        for station in stations:
-            # print(station.head().to_string())
-            key = station.columns.name
-            current_folder = folder_name + key
-            if station[station.isin([station_id])].empty:
-                print('Station ID is not in the list, set station ID to the nearest station')
-                station_id = None
-            station_id = station_id or station['Stations_id'].iloc[0]
-            tmp_frame = pd.concat(self.ftp_get_data(current_folder, station_id, start, end))
-            tmp_frame.set_index(time_column, inplace=True)
-            stiation_height = station.loc[station['Stations_id'] == station_id, 'Stationshoehe'].iloc[0]
-            tmp_frame.columns.set_names('Height [m]: ' + stiation_height, inplace=True)
-            data.update({key: tmp_frame})
+    @staticmethod
+    def concat_folders(data: dict, start, end, reso='10_minutes'):
+        """Concat the frames of the folders in the order 1.) historical 2.) recent 3.) now
 
-        # Concat frames in the order 1.) historical 2.) recent 3.) now
+        :param data: dict with the folder name as key and the pd.DataFrame from station_data(...) as value
+        :param start: Start-time
+        :param end: end-time
+        :param reso: resolution folder
+        :return: pd.DataFrame of the time frame without duplicates
+        """
+        with instrument.stage('stitch') as stage:
+            frame = Location._concat_folders(data, start, end, reso)
+            stage.add(rows=len(frame))
+        return frame
+
+    @staticmethod
+    def _concat_folders(data: dict, start, end, reso='10_minutes'):
+        data = {key: value for key, value in data.items() if value is not None}
+        if not data:
+            # no archive of the station in the time frame
+            return pd.DataFrame(index=pd.DatetimeIndex([], name='MESS_DATUM'))
         frame = None
         if len(data) == 1:
             frame = data[list(data.keys())[0]]
@@ -193,7 +602,7 @@ class Location:
             if 'historical' in data.keys():
                 frame = data.pop('historical')
             elif 'recent' in data.keys():
-                frame = frame.pop('recent')
+                frame = data.pop('recent')
             elif 'now' in data.keys():
                 frame = data.pop('now')
 
@@ -209,52 +618,94 @@ class Location:
 
         frame = frame[(frame.index >= start) & (frame.index < end)]
         frame = frame.loc[~frame.index.duplicated(keep='first')].sort_index()
-        frame = frame.drop('eor', axis=1)
+        frame = frame.drop('eor', axis=1, errors='ignore')
         if reso == '10_minutes':
-            frame = frame.asfreq('10T')
-
-        return {'data': frame, 'meta': stations}
+            frame = frame.asfreq('10min')
+        return frame
 
     def ftp_login(self, debug_level=None):
         """Handles the login to the server.
+
+        With a throttle the login waits for the rate limit and a throttled login (421, timeout) is retried
+        after a backoff.
         :param debug_level: debug level of the ftp logging
-        :return: FTP object
+        :return: FTP object, None when the login failed
         """
-        if debug_level:
-            self.debug_level = debug_level
-        try:
-            ftp = FTP(self.server)
-            ftp.set_debuglevel(self.debug_level)
-            ftp.login()
-            return ftp
-        except all_errors as e:
-            error_code_string = str(e).split(None, 1)[0]
-            print(error_code_string)
-
-    def ftp_get_data(self, path: str, station_id: str, start: str = None, end: str = None):
-        """Gets the data from the dwd server and returns it as pd.DataFrame
+        debug_level = debug_level or self.debug_level
+        attempts = 1 if self.throttle is None else self.throttle.retries + 1
+        for attempt in range(attempts):
+            try:
+                with instrument.stage('login'):
+                    if self.throttle is not None:
+                        self.throttle.wait()
+                    ftp = FTP()
+                    ftp.connect(self.server, self.ftp_port)
+                    ftp.set_debuglevel(debug_level)
+                    ftp.login()
+                if self.throttle is not None:
+                    self.throttle.success()
+                instrument.count('logins')
+                return ftp
+            except all_errors as e:
+                error_code_string = str(e).split(None, 1)[0]
+                print(error_code_string)
+                instrument.count('login_failures')
+                # no backoff after the last attempt
+                if self.throttle is None or attempt + 1 == attempts or not self.throttle.failure(e):
+                    break
+        return None
+
+    def ftp_get_data(self, path: str, station_id: str, start: str = None, end: str = None, intervals: list = None,
+                     reader=None):
+        """Gets the data from the dwd server (through the transport) and returns it as pd.DataFrame
 
         :param path: path to the directory were the data is stored
         :param station_id: ID of the station
         :param start: Starttime (only for historical data)
         :param end: Endtime ( only for historical data)
+        :param intervals: list of (start, end), only the files of these intervals (only for historical data)
+        :param reader: function(url or local path, content) which parses an archive, default read_data
+            (e.g. arrow_output.read_table)
         :return: pd.DataFrame
         """
-
-        ftp = self.ftp_login()
-        ftp.cwd(path)
-        file_names = [zip_file for zip_file in ftp.nlst() if station_id in zip_file]
-        ftp.quit()
+        reader = reader or self.read_data
+        with instrument.stage('listing'):
+            file_names = [zip_file for zip_file in self.transport.listdir(path) if station_id in zip_file]
         if 'historical' in path:
-            if start is not None and end is not None:
+            if intervals is not None:
+                selected = set()
+                for interval_start, interval_end in intervals:
+                    selected.update(self.filter_list_of_directory_by_time(file_names, interval_start,
+                                                                          interval_end, strict=True))
+                file_names = [filename for filename in file_names if filename in selected]
+            elif start is not None and end is not None:
                 file_names = self.filter_list_of_directory_by_time(file_names, start, end)
 
-        frames = list()
-        for filename in file_names:
-            frames.append(self.read_data('ftp://' + self.server + path + '/' + filename))
-        return frames
-
-    def build_tree(self):
+        def load(file_path):
+            if self.cache is not None:
+                # read_data reads the local file of the cache
+                return self.cache.fetch(self, file_path), None
+            with instrument.stage('transfer') as stage:
+                content = self.transport.read(file_path)
+                stage.add(bytes=len(content))
+            return self.transport.url(file_path), content
+
+        def parse(url, content):
+            with instrument.stage('parse') as stage:
+                frame = reader(url, content)
+                stage.add(rows=len(frame))
+            return frame
+
+        paths = [path + '/' + filename for filename in file_names]
+        if self.parse_pool is not None and reader == self.read_data:
+            loaded = [load(file_path) for file_path in paths]
+            with instrument.stage('parse') as stage:
+                frames = self.parse_pool.read_many([url for url, _ in loaded], [content for _, content in loaded])
+                stage.add(rows=sum(len(frame) for frame in frames))
+            return frames
+        return [parse(*load(file_path)) for file_path in paths]
+
+    def build_tree(self, path: str = None):
         """ Builds a list of dict with the path and a the name of the folder and saves it as a .txt file
 
         **Example of the .txt**
@@ -265,13 +716,14 @@ class Location:
         {"path": "https://opendata.dwd.de/climate/", "folder": "climate"}
         ]
 
+        :param path: path of the .txt file, default the dwd_tree.txt in the op_path
         :return: True if succeeds
         """
+        target = path or self.tree_path
         try:
-            url = 'https://' + self.server + '/weather/tree.html'
-            tree = requests.get(url).text
+            tree = self.transport.read_text('/weather/tree.html')
             tree = tree[tree.find('<body>') + 6:tree.find('/body') - 7].split('<br>')
-        except requests.RequestException as fail:
+        except all_errors as fail:
             print(fail)
             print('Check your internet connection')
             return False
@@ -295,22 +747,27 @@ class Location:
             i -= 1
         paths.reverse()
         try:
-            # save to txt file
-            with open(self.op_path + '\\dwd_tree.txt', 'w') as f:
+            # save to txt file, replaced at once so concurrent readers never see a half written file
+            tmp = target + '.' + str(os.getpid()) + '.' + str(threading.get_ident()) + '.tmp'
+            with open(tmp, 'w') as f:
                 json.dump(paths, f)
+            os.replace(tmp, target)
         except IOError as fail:
             print(fail)
             print('Saving the dwd_tree.txt was not successful')
             return False
+        shared.forget_tree(target)
         return True
 
-    def filter_list_of_directory_by_time(self, metadata: list, start: str, end: str, sep: str = '_'):
+    def filter_list_of_directory_by_time(self, metadata: list, start: str, end: str, sep: str = '_',
+                                         strict: bool = False):
         """Filters the given list of strings by time. The 5th and 6th element must be a date string.
 
         :param metadata: List of zip file names
         :param start: start time of the time frame
         :param end: end time of the time frame
         :param sep: separator between the words
+        :param strict: return an empty list instead of the whole list when no file fits the time frame
         :return: list with the zip file and the right time frame
         """
         if type(start) == type(end) and start is None:
@@ -318,14 +775,17 @@ class Location:
         if isinstance(start, str) or isinstance(end, str):
             start, end = self.str_to_timestamp(start, end)
 
-        output = list()
-        for i in range(len(metadata)):
-            meta = metadata[i].split(sep)
-            meta_start, meta_end = self.str_to_timestamp(meta[3], meta[4])
-            if start <= meta_start <= end or start <= meta_end <= end or meta_start <= end <= meta_end:
-                output.append(metadata[i])
+        # the dates of all names are parsed at once
+        names = [name.split(sep) for name in metadata]
+        first = dp.str_to_datetime64([meta[3] for meta in names])
+        last = dp.str_to_datetime64([meta[4] for meta in names])
+        meta_start, meta_end = np.minimum(first, last), np.maximum(first, last)
+        start, end = np.datetime64(start, 's'), np.datetime64(end, 's')
+        fits = (((start <= meta_start) & (meta_start <= end)) | ((start <= meta_end) & (meta_end <= end))
+                | ((meta_start <= end) & (end <= meta_end)))
+        output = [name for name, fit in zip(metadata, fits) if fit]
 
-        return output if output.__len__() > 0 else metadata
+        return output if output.__len__() > 0 or strict else metadata
 
     def recalc_height(self, frame, h2: float, h1: float = None, factor: float = 0.14,
                       method: str = 'hellmann', column: str = 'FF_10', inplace=False):
@@ -364,10 +824,11 @@ class Location:
         return time_matrix
 
     @staticmethod
-    def read_data(path: str):
+    def read_data(path: str, buffer=None):
         """Read data from a txt file in the process directory or from the given path.
 
         :param path: path where the data is stored
+        :param buffer: file-like object or bytes with the already downloaded content of the path
         :return: frames of the data
         """
         filename = path.replace('\\', '/').replace('.', '/')
@@ -375,7 +836,12 @@ class Location:
 
         time_format = '%Y%m%d%H%M'
         time_column = 'MESS_DATUM'
-        frame = pd.read_table(path, sep=';')
+        if buffer is None:
+            frame = pd.read_table(path, sep=';')
+        else:
+            if isinstance(buffer, bytes):
+                buffer = BytesIO(buffer)
+            frame = pd.read_table(buffer, sep=';', compression='zip' if path.endswith('.zip') else None)
         frame = frame.replace(-999., np.nan)
         frame[time_column] = pd.to_datetime(frame[time_column], format=time_format)
         frame.rename_axis(filename, axis=1)
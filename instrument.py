@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Per-stage instrumentation of the data retrieval: wall time, calls, bytes and rows per stage and counters
+
+Stages: login, listing, description (station lists), transfer, parse, stitch (concat of the folders)
+Counters: cache_hits, cache_misses, cache_evictions, logins, login_failures (see metrics for dashboards)
+
+A sink is a Stats object or a callback which gets one dict per event ({'stage', 'seconds', 'bytes', 'rows'} or
+{'counter', 'value'}). Sinks are attached globally (every thread) or for the calls within a with block (the
+current thread and its asyncio tasks). Without any sink a stage costs one function call and an empty check.
+
+**Example**
+import dwdopendata as dwd
+import instrument
+location = dwd.Location(48.37, 10.94)
+with instrument.recording() as stats:
+    location.wind('2019-01-01T00:00', '2019-02-01T00:00')
+print(stats)  # e.g. transfer 12.1 s  3 calls  4.2 MB | parse 1.3 s  ...
+
+instrument.attach(print)  # every event of every thread
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+STAGES = ('login', 'listing', 'description', 'transfer', 'parse', 'stitch')
+
+_global = ()  # sinks of every thread
+_scoped = ContextVar('dwd_instrument_sinks', default=())  # sinks of the with blocks of recording(...)
+_lock = threading.Lock()
+
+
+class Stats:
+    """Sums the events per stage, thread safe"""
+
+    def __init__(self):
+        self.seconds = dict()
+        self.calls = dict()
+        self.bytes = dict()
+        self.rows = dict()
+        self.counters = dict()
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        with self._lock:
+            if 'counter' in event:
+                self.counters[event['counter']] = self.counters.get(event['counter'], 0) + event['value']
+                return
+            stage = event['stage']
+            self.seconds[stage] = self.seconds.get(stage, 0.) + event['seconds']
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+            self.bytes[stage] = self.bytes.get(stage, 0) + event['bytes']
+            self.rows[stage] = self.rows.get(stage, 0) + event['rows']
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            stages = {stage: {'seconds': self.seconds[stage], 'calls': self.calls[stage], 'bytes': self.bytes[stage],
+                              'rows': self.rows[stage]} for stage in self.seconds}
+            return {'stages': stages, 'counters': dict(self.counters)}
+
+    def __str__(self):
+        data = self.as_dict()
+        parts = list()
+        for stage, values in sorted(data['stages'].items(), key=lambda item: STAGES.index(item[0])
+                                    if item[0] in STAGES else len(STAGES)):
+            text = f"{stage} {values['seconds']:.3f} s  {values['calls']} calls"
+            if values['bytes']:
+                text += f"  {values['bytes'] / 1e6:.2f} MB"
+            if values['rows']:
+                text += f"  {values['rows']} rows"
+            parts.append(text)
+        parts.extend(f'{name} {value}' for name, value in data['counters'].items())
+        return ' | '.join(parts)
+
+
+def attach(sink):
+    """Attaches a sink (Stats or callback) for every thread"""
+    global _global
+    with _lock:
+        _global = _global + (sink,)
+
+
+def detach(sink):
+    global _global
+    with _lock:
+        _global = tuple(known for known in _global if known is not sink)
+
+
+@contextmanager
+def recording(sink=None):
+    """with instrument.recording() as stats: ... records the calls of the block (current thread / task)
+
+    :param sink: Stats or callback, default a new Stats object
+    """
+    sink = Stats() if sink is None else sink
+    token = _scoped.set(_scoped.get() + (sink,))
+    try:
+        yield sink
+    finally:
+        _scoped.reset(token)
+
+
+def _sinks() -> tuple:
+    scoped = _scoped.get()
+    return _global + scoped if scoped else _global
+
+
+def enabled() -> bool:
+    return bool(_global or _scoped.get())
+
+
+def emit(event: dict):
+    for sink in _sinks():
+        sink(event)
+
+
+def count(counter: str, value: int = 1):
+    """Adds to a counter (e.g. cache_hits)"""
+    if _global or _scoped.get():
+        emit({'counter': counter, 'value': value})
+
+
+class _Stage:
+    __slots__ = ['name', 'sinks', 'bytes', 'rows', 'started']
+
+    def __init__(self, name: str, sinks: tuple):
+        self.name = name
+        self.sinks = sinks
+        self.bytes = 0
+        self.rows = 0
+
+    def add(self, bytes: int = 0, rows: int = 0):
+        self.bytes += bytes
+        self.rows += rows
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        event = {'stage': self.name, 'seconds': time.perf_counter() - self.started, 'bytes': self.bytes,
+                 'rows': self.rows}
+        for sink in self.sinks:
+            sink(event)
+
+
+class _NoStage:
+    __slots__ = []
+
+    def add(self, bytes: int = 0, rows: int = 0):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        pass
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name: str):
+    """with instrument.stage('transfer') as st: ...; st.add(bytes=len(content))
+
+    Records the wall time of the block and the added bytes / rows, a no-op without sinks.
+    """
+    sinks = _sinks()
+    if not sinks:
+        return _NO_STAGE
+    return _Stage(name, sinks)
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Inverse distance weighting (IDW) over the k nearest stations for single points or whole grids.
+
+The weights of all points are built once as a sparse matrix (points x stations). The values of all
+stations for all timestamps are then interpolated with one matrix multiply.
+
+**Example**
+import dwdopendata as dwd
+location = dwd.Location(48.37, 10.94)
+wind = location.interpolate('2019-01-01T00:00', '2019-02-01T00:00', 'wind', k=4)
+grid = location.interpolate('2019-01-01T00:00', '2019-02-01T00:00', 'air_temperature',
+                            points=[[48.0, 10.0], [48.5, 10.5]], heights=[500, 450],
+                            height_gradient={'TT_10': -0.0065})
+"""
+from __future__ import annotations
+
+from importlib.util import find_spec
+
+import lazy
+
+np = lazy.module('numpy')
+pd = lazy.module('pandas')
+# optional, the weights are a dense np.ndarray without scipy
+sparse = lazy.module('scipy.sparse') if find_spec('scipy') else None
+
+EARTH_RADIUS = 6378.388  # km, same as Location.calc_distance
+CIRCULAR_COLUMNS = ('DD_10', 'DX_10')  # wind directions in degree
+
+
+def great_circle_distance(lat1, lon1, lat2, lon2):
+    """Vectorized version of Location.calc_distance, the arrays are broadcasted
+
+    :param lat1: latitude(s) of the first point(s) in degree
+    :param lon1: longitude(s) of the first point(s) in degree
+    :param lat2: latitude(s) of the second point(s) in degree
+    :param lon2: longitude(s) of the second point(s) in degree
+    :return: distance in km
+    """
+    lat1, lon1, lat2, lon2 = [np.radians(np.asarray(co, dtype=float)) for co in (lat1, lon1, lat2, lon2)]
+    cos_angle = np.sin(lat1) * np.sin(lat2) + np.cos(lat1) * np.cos(lat2) * np.cos(lon2 - lon1)
+    return EARTH_RADIUS * np.arccos(np.clip(cos_angle, -1., 1.))
+
+
+def idw_weights(points, station_coordinates, k: int = 4, power: float = 2.):
+    """Builds the inverse distance weights of the k nearest stations for every point
+
+    :param points: array (n, 2) of [LAT, LON]
+    :param station_coordinates: array (m, 2) of [LAT, LON]
+    :param k: number of stations per point
+    :param power: exponent of the distance
+    :return: scipy.sparse.csr_matrix (n, m) with rows summing up to 1 (np.ndarray without scipy)
+    """
+    points = np.atleast_2d(np.asarray(points, dtype=float))
+    station_coordinates = np.atleast_2d(np.asarray(station_coordinates, dtype=float))
+    n_points, n_stations = len(points), len(station_coordinates)
+    k = min(k, n_stations)
+
+    distance = great_circle_distance(points[:, :1], points[:, 1:], station_coordinates[:, 0],
+                                     station_coordinates[:, 1])
+    nearest = np.argpartition(distance, k - 1, axis=1)[:, :k]
+    nearest_distance = np.take_along_axis(distance, nearest, axis=1)
+    # a station at the point gets (nearly) all the weight
+    weights = 1. / np.maximum(nearest_distance, 1e-6) ** power
+    weights /= weights.sum(axis=1, keepdims=True)
+
+    rows = np.repeat(np.arange(n_points), k)
+    if sparse is None:
+        matrix = np.zeros((n_points, n_stations))
+        matrix[rows, nearest.ravel()] = weights.ravel()
+        return matrix
+    return sparse.csr_matrix((weights.ravel(), (rows, nearest.ravel())), shape=(n_points, n_stations))
+
+
+def used_stations(weights) -> np.ndarray:
+    """Returns the column indices of the stations with a weight for at least one point"""
+    if sparse is not None and sparse.issparse(weights):
+        return np.unique(weights.indices)
+    return np.flatnonzero(np.asarray(weights).any(axis=0))
+
+
+def apply_weights(weights, values, station_heights=None, point_heights=None, gradient: float = 0.):
+    """Interpolates the values of all stations for all timestamps with one matrix multiply
+
+    Missing values (NaN) of a station are skipped and the weights of the other stations are normalized.
+
+    :param weights: matrix (n, m) from idw_weights(...)
+    :param values: array (m, t) of the stations
+    :param station_heights: height of the stations (m,) for the height correction
+    :param point_heights: height of the points (n,) for the height correction
+    :param gradient: change of the value per meter (e.g. -0.0065 K/m for the temperature)
+    :return: np.ndarray (n, t)
+    """
+    values = np.asarray(values, dtype=float)
+    valid = ~np.isnan(values)
+    if gradient and station_heights is not None and point_heights is not None:
+        # reduce the stations to the height 0 m and back to the height of the points
+        values = values - gradient * np.asarray(station_heights, dtype=float)[:, None]
+    total = weights @ np.where(valid, values, 0.)
+    norm = weights @ valid.astype(float)
+    out = np.divide(total, norm, out=np.full(np.shape(total), np.nan), where=norm > 0)
+    if gradient and station_heights is not None and point_heights is not None:
+        out += gradient * np.asarray(point_heights, dtype=float)[:, None]
+    return out
+
+
+def interpolate_frames(frames: list, weights, station_heights=None, point_heights=None,
+                       height_gradient: dict = None, columns=None) -> dict:
+    """Interpolates the columns of the station frames to the points
+
+    :param frames: list of pd.DataFrame (one per column of weights, None for stations without weight)
+    :param weights: matrix (n, m) from idw_weights(...)
+    :param station_heights: height of the stations (m,)
+    :param point_heights: height of the points (n,)
+    :param height_gradient: dict column -> gradient per meter for the height correction
+    :param columns: columns to interpolate, default all numeric columns without STATIONS_ID and QN_*
+    :return: dict column -> pd.DataFrame (time x points)
+    """
+    height_gradient = height_gradient or dict()
+    available = [frame for frame in frames if frame is not None]
+    index = available[0].index
+    for frame in available[1:]:
+        index = index.union(frame.index)
+    if columns is None:
+        # the columns of the first station with data (a station without archives has no columns)
+        first = next((frame for frame in available if len(frame.columns)), available[0])
+        columns = [column for column in first.columns
+                   if column != 'STATIONS_ID' and not column.startswith('QN')
+                   and pd.api.types.is_numeric_dtype(first[column])]
+
+    out = dict()
+    for column in columns:
+        stack = np.full((len(frames), len(index)), np.nan)
+        for i, frame in enumerate(frames):
+            if frame is not None and column in frame:
+                stack[i] = frame[column].reindex(index).to_numpy(dtype=float)
+        if column in CIRCULAR_COLUMNS:
+            # interpolate the direction as unit vector
+            angle = np.radians(stack)
+            north = apply_weights(weights, np.cos(angle))
+            east = apply_weights(weights, np.sin(angle))
+            values = np.degrees(np.arctan2(east, north)) % 360
+        else:
+            values = apply_weights(weights, stack, station_heights, point_heights,
+                                   height_gradient.get(column, 0.))
+        out[column] = pd.DataFrame(values.T, index=index)
+    return out
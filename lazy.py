@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Lazy imports of the heavy dependencies (pandas, numpy, requests, scipy)
+
+lazy.module(name) returns a placeholder which imports the module at the first attribute access, so
+`import dwdopendata` and Location(...) stay fast for callers which only need e.g. calc_distance. The import
+itself runs in importlib.import_module and is thread safe. An already imported module is returned as it is.
+
+**Example**
+import lazy
+pd = lazy.module('pandas')  # nothing imported yet
+frame = pd.DataFrame()  # pandas is imported here
+"""
+import importlib
+import sys
+import types
+
+
+class LazyModule(types.ModuleType):
+    """Placeholder of a module, imported at the first attribute access"""
+
+    def __getattr__(self, attr: str):
+        module = importlib.import_module(self.__name__)
+        # later accesses find the attributes directly, without __getattr__
+        self.__dict__.update(module.__dict__)
+        return getattr(module, attr)
+
+
+def module(name: str):
+    """Returns the module if it is already imported, otherwise a LazyModule"""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def loaded(name: str) -> bool:
+    """True when the module is really imported (not only the placeholder)"""
+    return name in sys.modules
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Live tail of the 10 minute observations of a station (the now archive)
+
+A Follower keeps the state between two polls: the last seen MESS_DATUM and the size / modification time of
+the now archive. A poll downloads the archive only when it changed on the server and parses only the lines
+after the last seen MESS_DATUM (the rows of the archive are sorted by time). Location.follow(...) and
+Location.follow_async(...) wrap it as generator / async iterator.
+
+**Example**
+import dwdopendata as dwd
+location = dwd.Location(48.37, 10.94)
+for rows in location.follow('wind', interval=120):
+    print(rows)  # only the new rows
+"""
+from __future__ import annotations
+
+import asyncio
+from io import BytesIO
+import time
+import zipfile
+
+import lazy
+
+pd = lazy.module('pandas')
+
+TIME_COLUMN = 'MESS_DATUM'
+TIME_FORMAT = '%Y%m%d%H%M'
+
+
+class Follower:
+    """State of the live tail of one station and parameter"""
+
+    def __init__(self, location, typ: str, station_id: str = None, since=None, reso: str = '10_minutes',
+                 folder='cdc_obDE_climate'):
+        """
+        :param location: Location object with the transport
+        :param typ: parameter folder, e.g. 'wind'
+        :param station_id: ID of the station, default the nearest station of the now folder
+        :param since: only rows after this time (default: the first poll returns the whole now archive)
+        :param reso: resolution folder
+        :param folder: test / advance option
+        """
+        self.location = location
+        folder = location.cdc_obDE_climate if folder == 'cdc_obDE_climate' else folder
+        self.folder_name = '/' + location.search_folder(folder + reso + f'/{typ}/')['path'].strip('/') + '/now'
+        if station_id is None:
+            for name in location.transport.listdir(self.folder_name):
+                if 'Beschreibung_Stationen.txt' in name:
+                    path = self.folder_name + '/' + name
+                    stations = location.station_list(location.transport.url(path), location.transport.read_text(path))
+                    station_id = stations['Stations_id'].iloc[0]
+                    break
+        self.station_id = str(station_id).zfill(5)
+        self.last = pd.Timestamp(since) if since is not None else None  # last seen MESS_DATUM
+        self.path = None  # path of the now archive
+        self.remote = None  # size and modification time of the last download
+        self.parsed_bytes = 0  # bytes of the text parsed by the last poll
+
+    def archive_path(self) -> str:
+        """Path of the now archive of the station (listed once)"""
+        if self.path is None:
+            names = [name for name in self.location.transport.listdir(self.folder_name)
+                     if self.station_id in name and name.endswith('.zip')]
+            if not names:
+                raise FileNotFoundError('No now archive of the station ' + self.station_id + ' in ' + self.folder_name)
+            self.path = self.folder_name + '/' + names[0]
+        return self.path
+
+    def poll(self) -> pd.DataFrame:
+        """Returns the rows after the last seen MESS_DATUM (empty when the archive did not change)
+
+        :return: pd.DataFrame indexed by MESS_DATUM
+        """
+        transport = self.location.transport
+        path = self.archive_path()
+        remote = transport.stat(path)
+        if remote == self.remote and remote['size'] is not None:
+            self.parsed_bytes = 0
+            return pd.DataFrame(index=pd.DatetimeIndex([], name=TIME_COLUMN))
+        with zipfile.ZipFile(BytesIO(transport.read(path))) as archive:
+            member = next((name for name in archive.namelist() if name.startswith('produkt')), archive.namelist()[0])
+            text = archive.read(member)
+
+        frame = self.location.read_data(member, self.tail(text))
+        frame = frame.set_index(TIME_COLUMN).drop('eor', axis=1, errors='ignore')
+        if self.last is not None:
+            frame = frame[frame.index > self.last]
+        if len(frame):
+            self.last = frame.index[-1]
+        self.remote = remote
+        return frame
+
+    def tail(self, text: bytes) -> bytes:
+        """Returns the header and the lines after the last seen MESS_DATUM
+
+        The line of the last seen time is searched from the end, so only the appended part is scanned. When it
+        is not in the text (new archive of the next day) the whole text is returned.
+        """
+        header_end = text.find(b'\n') + 1
+        start = header_end
+        if self.last is not None:
+            found = text.rfind(b';' + self.last.strftime(TIME_FORMAT).encode() + b';', header_end)
+            if found != -1:
+                line_end = text.find(b'\n', found)
+                start = len(text) if line_end == -1 else line_end + 1
+        self.parsed_bytes = len(text) - start
+        return text[:header_end] + text[start:]
+
+
+def follow(location, typ: str, station_id: str = None, interval: float = 60., since=None, polls: int = None,
+           folder='cdc_obDE_climate'):
+    """Generator of the new rows, see Location.follow(...)"""
+    follower = Follower(location, typ, station_id, since, folder=folder)
+    count = 0
+    while polls is None or count < polls:
+        if count:
+            time.sleep(interval)
+        count += 1
+        rows = follower.poll()
+        if len(rows):
+            yield rows
+
+
+async def follow_async(location, typ: str, station_id: str = None, interval: float = 60., since=None,
+                       polls: int = None, folder='cdc_obDE_climate'):
+    """Async iterator of the new rows, the polls run in the default executor of the event loop (in a copy of the
+    context, see asyncio.to_thread)"""
+    follower = await asyncio.to_thread(Follower, location, typ, station_id, since, folder=folder)
+    count = 0
+    while polls is None or count < polls:
+        if count:
+            await asyncio.sleep(interval)
+        count += 1
+        rows = await asyncio.to_thread(follower.poll)
+        if len(rows):
+            yield rows
@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Metrics registry for dashboards: counters, gauges and histograms fed by the instrument events
+
+enable() attaches a MetricsSink to instrument (every thread) and registers the gauges of the FTP connections:
+- dwd_cache_hits_total, dwd_cache_misses_total, dwd_cache_evictions_total, dwd_cache_hit_ratio
+- dwd_ftp_connections{kind="thread"|"async"}, dwd_ftp_connections_idle, dwd_ftp_logins_total,
+  dwd_ftp_login_failures_total
+- dwd_transfer_bytes_total, dwd_transfer_bytes_per_second (histogram per transfer)
+- dwd_parse_rows_total, dwd_parse_rows_per_second (histogram per parsed file)
+- dwd_stage_seconds{stage=...} (histogram per stage)
+
+An exporter gets the collected metric families (export(families)). PrometheusExporter writes the text format
+(file for the textfile collector), serve(...) answers the scrapes of http://<addr>:<port>/metrics.
+
+**Example**
+import dwdopendata as dwd
+import metrics
+registry = metrics.enable()
+server = metrics.serve(9464)  # curl http://127.0.0.1:9464/metrics
+location = dwd.Location(48.37, 10.94)
+location.wind('2019-01-01T00:00', '2019-02-01T00:00')
+print(metrics.PrometheusExporter.text(registry.collect()))
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import os
+import threading
+
+import instrument
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1., 2.5, 5., 10., 30., 60.)
+BYTES_PER_SECOND_BUCKETS = (1e4, 1e5, 5e5, 1e6, 5e6, 1e7, 5e7, 1e8)
+ROWS_PER_SECOND_BUCKETS = (1e3, 1e4, 5e4, 1e5, 5e5, 1e6, 5e6)
+
+
+def _key(labels: dict) -> tuple:
+    return tuple(sorted(labels.items())) if labels else ()
+
+
+class Counter:
+    """Monotonic counter, optional labels"""
+
+    typ = 'counter'
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self.values = dict()  # label key -> value
+        self._lock = threading.Lock()
+
+    def inc(self, value: float = 1., **labels):
+        key = _key(labels)
+        with self._lock:
+            self.values[key] = self.values.get(key, 0.) + value
+
+    def get(self, **labels) -> float:
+        return self.values.get(_key(labels), 0.)
+
+    def samples(self) -> list:
+        """Returns [(name, labels, value)]"""
+        with self._lock:
+            return [(self.name, dict(key), value) for key, value in self.values.items()] or [(self.name, dict(), 0.)]
+
+
+class Gauge(Counter):
+    """Value which can go up and down, or a function which is called at every collection"""
+
+    typ = 'gauge'
+
+    def __init__(self, name: str, documentation: str, func=None):
+        """
+        :param func: function without arguments which returns the value or a dict {label key: value}
+        """
+        super().__init__(name, documentation)
+        self.func = func
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self.values[_key(labels)] = value
+
+    def samples(self) -> list:
+        if self.func is None:
+            return super().samples()
+        value = self.func()
+        if isinstance(value, dict):
+            return [(self.name, dict(key), item) for key, item in value.items()]
+        return [(self.name, dict(), value)]
+
+
+class Histogram:
+    """Cumulative buckets, sum and count of the observed values"""
+
+    typ = 'histogram'
+
+    def __init__(self, name: str, documentation: str, buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self.values = dict()  # label key -> [counts per bucket, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _key(labels)
+        with self._lock:
+            counts, total, count = self.values.get(key) or ([0] * len(self.buckets), 0., 0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self.values[key] = [counts, total + value, count + 1]
+
+    def samples(self) -> list:
+        samples = list()
+        with self._lock:
+            for key, (counts, total, count) in self.values.items():
+                cumulative = 0
+                for bound, bucket in zip(self.buckets, counts):
+                    cumulative += bucket
+                    le = '+Inf' if bound == math.inf else repr(float(bound))
+                    samples.append((self.name + '_bucket', dict(key + (('le', le),)), cumulative))
+                samples.append((self.name + '_sum', dict(key), total))
+                samples.append((self.name + '_count', dict(key), count))
+        return samples
+
+
+class Registry:
+    """Named metrics of the process"""
+
+    def __init__(self):
+        self.metrics = dict()
+        self._lock = threading.Lock()
+
+    def _get(self, cls, name: str, *args):
+        with self._lock:
+            if name not in self.metrics:
+                self.metrics[name] = cls(name, *args)
+            return self.metrics[name]
+
+    def counter(self, name: str, documentation: str = '') -> Counter:
+        return self._get(Counter, name, documentation)
+
+    def gauge(self, name: str, documentation: str = '', func=None) -> Gauge:
+        return self._get(Gauge, name, documentation, func)
+
+    def histogram(self, name: str, documentation: str = '', buckets=SECONDS_BUCKETS) -> Histogram:
+        return self._get(Histogram, name, documentation, buckets)
+
+    def collect(self) -> list:
+        """Returns the metric families: [(name, type, documentation, [(sample name, labels, value)])]"""
+        with self._lock:
+            metrics = list(self.metrics.values())
+        return [(metric.name, metric.typ, metric.documentation, metric.samples()) for metric in metrics]
+
+
+REGISTRY = Registry()
+
+
+class MetricsSink:
+    """instrument sink which updates the metrics of a registry"""
+
+    COUNTERS = {'cache_hits': ('dwd_cache_hits_total', 'Files served from the download cache'),
+                'cache_misses': ('dwd_cache_misses_total', 'Files downloaded into the download cache'),
+                'cache_evictions': ('dwd_cache_evictions_total', 'Expired files of the download cache replaced'),
+                'logins': ('dwd_ftp_logins_total', 'Successful FTP logins'),
+                'login_failures': ('dwd_ftp_login_failures_total', 'Failed FTP logins')}
+
+    def __init__(self, registry: Registry = REGISTRY):
+        self.registry = registry
+        self.counters = {counter: registry.counter(*args) for counter, args in self.COUNTERS.items()}
+        self.stage_seconds = registry.histogram('dwd_stage_seconds', 'Wall time per stage')
+        self.transfer_bytes = registry.counter('dwd_transfer_bytes_total', 'Bytes transferred from the server')
+        self.transfer_rate = registry.histogram('dwd_transfer_bytes_per_second', 'Bytes per second per transfer',
+                                                BYTES_PER_SECOND_BUCKETS)
+        self.parse_rows = registry.counter('dwd_parse_rows_total', 'Rows parsed')
+        self.parse_rate = registry.histogram('dwd_parse_rows_per_second', 'Rows per second per parsed file',
+                                             ROWS_PER_SECOND_BUCKETS)
+        hits, misses = self.counters['cache_hits'], self.counters['cache_misses']
+        registry.gauge('dwd_cache_hit_ratio', 'Hits / (hits + misses) of the download cache',
+                       lambda: hits.get() / (hits.get() + misses.get()) if hits.get() + misses.get() else 0.)
+
+    def __call__(self, event: dict):
+        if 'counter' in event:
+            counter = self.counters.get(event['counter'])
+            if counter is None:
+                counter = self.registry.counter('dwd_' + event['counter'] + '_total')
+            counter.inc(event['value'])
+            return
+        seconds = event['seconds']
+        self.stage_seconds.observe(seconds, stage=event['stage'])
+        if event['stage'] == 'transfer' and event['bytes']:
+            self.transfer_bytes.inc(event['bytes'])
+            if seconds > 0:
+                self.transfer_rate.observe(event['bytes'] / seconds)
+        elif event['stage'] == 'parse' and event['rows']:
+            self.parse_rows.inc(event['rows'])
+            if seconds > 0:
+                self.parse_rate.observe(event['rows'] / seconds)
+
+
+def ftp_connections() -> dict:
+    """Open FTP connections of the transports (per thread) and of the async pools of the process"""
+    import dwd_async
+    from transport import FTPTransport
+    thread = sum(len(transport._connections) for transport in list(FTPTransport.instances))
+    pools = [pool for pools in list(dwd_async._pools.values()) for pool in list(pools.values())]
+    return {(('kind', 'thread'),): thread, (('kind', 'async'),): sum(pool._created for pool in pools)}
+
+
+def idle_ftp_connections() -> int:
+    """Idle connections of the async pools (ready for the next coroutine)"""
+    import dwd_async
+    return sum(pool._idle.qsize() for pools in list(dwd_async._pools.values()) for pool in list(pools.values()))
+
+
+_sinks = dict()  # registry -> attached MetricsSink
+
+
+def enable(registry: Registry = REGISTRY) -> Registry:
+    """Feeds the registry with the events of every thread (once per registry)"""
+    if id(registry) not in _sinks:
+        registry.gauge('dwd_ftp_connections', 'Open FTP connections', ftp_connections)
+        registry.gauge('dwd_ftp_connections_idle', 'Idle FTP connections of the async pools', idle_ftp_connections)
+        _sinks[id(registry)] = MetricsSink(registry)
+        instrument.attach(_sinks[id(registry)])
+    return registry
+
+
+def disable(registry: Registry = REGISTRY):
+    sink = _sinks.pop(id(registry), None)
+    if sink is not None:
+        instrument.detach(sink)
+
+
+class Exporter:
+    """Interface of the exporters"""
+
+    def export(self, families: list):
+        """:param families: Registry.collect()"""
+        raise NotImplementedError
+
+
+class PrometheusExporter(Exporter):
+    """Prometheus text format, written to a file (textfile collector of the node exporter)"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def text(families: list) -> str:
+        lines = list()
+        for name, typ, documentation, samples in families:
+            if documentation:
+                lines.append(f'# HELP {name} {documentation}')
+            lines.append(f'# TYPE {name} {typ}')
+            for sample, labels, value in samples:
+                label_text = ','.join(f'{key}="{item}"' for key, item in labels.items())
+                lines.append(f'{sample}{{{label_text}}} {float(value)!r}' if label_text else
+                             f'{sample} {float(value)!r}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, families: list):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as file:
+            file.write(self.text(families))
+        os.replace(tmp, self.path)
+
+
+def export_every(exporter: Exporter, interval: float = 15., registry: Registry = REGISTRY) -> threading.Event:
+    """Exports the registry every interval seconds in a daemon thread, set the returned event to stop"""
+    stop = threading.Event()
+
+    def run():
+        while not stop.wait(interval):
+            exporter.export(registry.collect())
+    threading.Thread(target=run, name='dwd-metrics', daemon=True).start()
+    return stop
+
+
+def serve(port: int = 9464, addr: str = '127.0.0.1', registry: Registry = REGISTRY) -> ThreadingHTTPServer:
+    """Serves /metrics in the Prometheus text format in a daemon thread, server.shutdown() stops it"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = PrometheusExporter.text(registry.collect()).encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((addr, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name='dwd-metrics-http', daemon=True).start()
+    return server
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Local mirror of selected subtrees of the CDC tree (e.g. '10_minutes/wind/historical')
+
+sync(...) downloads only new or changed files: size and modification time on the server are compared with
+the manifest <mirror>/_mirror.json. The tree of the server (weather/tree.html) is mirrored as well, so a
+Location with mirror=True reads every listing and archive from the local disk.
+
+**Example**
+import dwdopendata as dwd
+import mirror
+mirror.sync(dwd.Location(op_path='D:/dwd'), ['10_minutes/wind/historical', '10_minutes/wind/recent'])
+location = dwd.Location(48.37, 10.94, op_path='D:/dwd', mirror=True)  # offline
+
+**Command line**
+python mirror.py D:/dwd 10_minutes/wind/historical 10_minutes/wind/recent --workers 4
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import json
+import os
+import threading
+import time
+
+MIRROR_DIR = 'dwd_mirror'  # in the op_path
+MANIFEST = '_mirror.json'
+TREE = '/weather/tree.html'
+
+
+def mirror_root(location) -> str:
+    return os.path.join(location.op_path, MIRROR_DIR)
+
+
+def subtree_path(location, subtree: str) -> str:
+    """Absolute path on the server, a relative subtree is below the CDC climate folder"""
+    if not subtree.startswith('/'):
+        subtree = '/' + location.cdc_obDE_climate + subtree
+    return subtree.rstrip('/')
+
+
+def walk(transport, path: str) -> list:
+    """Lists all files below the path, names without a file extension are taken as directories"""
+    files = list()
+    for name in transport.listdir(path):
+        if '.' in name:
+            files.append(path + '/' + name)
+        else:
+            files.extend(walk(transport, path + '/' + name))
+    return files
+
+
+def _load_manifest(path: str) -> dict:
+    if os.path.isfile(path):
+        with open(path, 'r') as file:
+            return json.load(file)
+    return dict()
+
+
+def _save_manifest(path: str, manifest: dict):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as file:
+        json.dump(manifest, file)
+    os.replace(tmp, path)
+
+
+def sync(location, subtrees: list, root: str = None, workers: int = 4, delete: bool = False,
+         report_every: int = 100) -> dict:
+    """Downloads the new and changed files of the subtrees into the mirror
+
+    :param location: Location object with the transport of the server
+    :param subtrees: paths below the CDC climate folder (e.g. '10_minutes/wind') or absolute paths
+    :param root: directory of the mirror, default <op_path>/dwd_mirror
+    :param workers: number of download threads
+    :param delete: remove the files of the subtrees which are not on the server any more
+    :param report_every: print the progress every n files (0 = never)
+    :return: dict with the counters (files, downloaded, unchanged, deleted, failed, bytes, seconds)
+    """
+    root = root or mirror_root(location)
+    source = location.transport
+    manifest_path = os.path.join(root, MANIFEST)
+    os.makedirs(root, exist_ok=True)
+    manifest = _load_manifest(manifest_path)
+    lock = threading.Lock()
+    stats = {'files': 0, 'downloaded': 0, 'unchanged': 0, 'deleted': 0, 'failed': list(), 'bytes': 0}
+    started = time.perf_counter()
+
+    def local_path(path):
+        return os.path.join(root, *path.strip('/').split('/'))
+
+    def job(path):
+        remote = source.stat(path)
+        local = local_path(path)
+        if manifest.get(path) == remote and os.path.isfile(local) \
+                and (remote['size'] is None or os.path.getsize(local) == remote['size']):
+            return 0
+        os.makedirs(os.path.dirname(local), exist_ok=True)
+        tmp = local + '.tmp'
+        try:
+            with open(tmp, 'wb') as file:
+                source.download(path, file)
+            if remote['size'] is not None and os.path.getsize(tmp) != remote['size']:
+                raise IOError('Size ' + str(os.path.getsize(tmp)) + ' != ' + str(remote['size']) + ' on the server')
+            os.replace(tmp, local)
+        finally:
+            if os.path.isfile(tmp):
+                os.remove(tmp)
+        with lock:
+            manifest[path] = remote
+        return os.path.getsize(local)
+
+    tree = local_path(TREE)
+    if not os.path.isfile(tree):
+        os.makedirs(os.path.dirname(tree), exist_ok=True)
+        with open(tree, 'w', encoding='latin-1', errors='replace') as file:
+            file.write(source.read_text(TREE))
+
+    for subtree in subtrees:
+        path = subtree_path(location, subtree)
+        files = walk(source, path)
+        stats['files'] += len(files)
+        with ThreadPoolExecutor(workers, thread_name_prefix='dwd-mirror') as executor:
+            futures = {executor.submit(job, file_path): file_path for file_path in files}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    size = future.result()
+                    stats['downloaded' if size else 'unchanged'] += 1
+                    stats['bytes'] += size
+                except Exception as fail:
+                    print(futures[future], fail)
+                    stats['failed'].append(futures[future])
+                if report_every and done % report_every == 0:
+                    print(str(done) + '/' + str(len(files)) + ' files of ' + path)
+                    with lock:
+                        _save_manifest(manifest_path, manifest)
+
+        if delete:
+            remote = set(files)
+            for known in [known for known in manifest if known.startswith(path + '/') and known not in remote]:
+                if os.path.isfile(local_path(known)):
+                    os.remove(local_path(known))
+                del manifest[known]
+                stats['deleted'] += 1
+        _save_manifest(manifest_path, manifest)
+
+    # the connections of the finished threads
+    source.close()
+    stats['seconds'] = time.perf_counter() - started
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Syncs subtrees of the CDC tree into <op_path>/dwd_mirror')
+    parser.add_argument('op_path')
+    parser.add_argument('subtrees', nargs='+', help="e.g. 10_minutes/wind/historical")
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--transport', default='ftp', choices=['ftp', 'https'])
+    parser.add_argument('--delete', action='store_true', help='remove files which are not on the server any more')
+    args = parser.parse_args()
+
+    from dwdopendata import Location
+    location = Location(op_path=args.op_path, transport=args.transport)
+    print(sync(location, args.subtrees, workers=args.workers, delete=args.delete))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Process pool for the parsing of large archives (e.g. decades of historical 10 minute data)
+
+The workers read the archive with Location.read_data(...) and write the columns into a block of shared
+memory. Only a small descriptor (name of the block, rows, columns, dtypes) goes back to the parent, which
+copies the columns out of the block with one memcpy per column instead of unpickling a whole DataFrame. This
+is not zero-copy: the frame owns its columns, so the block is freed right away and never outlives a worker
+crash or a forgotten frame.
+
+**Example**
+import dwdopendata as dwd
+import parallel_parse
+location = dwd.Location(48.37, 10.94)
+with parallel_parse.ParsePool(workers=8) as pool:
+    location.parse_pool = pool  # ftp_get_data(...) parses all archives in the pool
+    wind = location.wind('1995-01-01T00:00', '2019-01-01T00:00')
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pandas as pd
+
+TIME_COLUMN = 'MESS_DATUM'
+ITEM_SIZE = 8  # every column is stored as int64 or float64
+
+
+def parse_to_shared_memory(path: str, content: bytes = None) -> dict:
+    """Worker: parses an archive and writes the columns into a new shared memory block
+
+    Text columns (e.g. 'eor') are not transferred.
+
+    :param path: url or path of the archive
+    :param content: already downloaded content of the archive
+    :return: descriptor for from_shared_memory(...)
+    """
+    from dwdopendata import Location
+    frame = Location.read_data(path, content)
+    columns, arrays = list(), list()
+    for column in frame.columns:
+        values = frame[column]
+        if column == TIME_COLUMN:
+            values = values.to_numpy(dtype='datetime64[ns]').view(np.int64)
+        elif pd.api.types.is_integer_dtype(values):
+            values = values.to_numpy(dtype=np.int64)
+        elif pd.api.types.is_numeric_dtype(values):
+            values = values.to_numpy(dtype=np.float64)
+        else:
+            continue
+        columns.append(column)
+        arrays.append(values)
+
+    rows = len(frame)
+    shm = SharedMemory(create=True, size=max(1, rows * len(arrays) * ITEM_SIZE))
+    # the parent frees the block, the resource tracker of the worker must not remove it when the worker ends
+    resource_tracker.unregister(shm._name, 'shared_memory')
+    for i, values in enumerate(arrays):
+        np.ndarray(rows, dtype=values.dtype, buffer=shm.buf, offset=i * rows * ITEM_SIZE)[:] = values
+    descriptor = {'name': shm.name, 'rows': rows, 'columns': columns,
+                  'dtypes': [values.dtype.str for values in arrays], 'path': path}
+    shm.close()
+    return descriptor
+
+
+def from_shared_memory(descriptor: dict) -> pd.DataFrame:
+    """Parent: builds the pd.DataFrame from a descriptor of parse_to_shared_memory(...) and frees the block
+
+    The columns are copied out of the block (one memcpy per column).
+
+    :param descriptor: descriptor of parse_to_shared_memory(...)
+    :return: pd.DataFrame like Location.read_data(...)
+    """
+    shm = SharedMemory(name=descriptor['name'])
+    try:
+        rows = descriptor['rows']
+        data = dict()
+        for i, (column, dtype) in enumerate(zip(descriptor['columns'], descriptor['dtypes'])):
+            view = np.ndarray(rows, dtype=np.dtype(dtype), buffer=shm.buf, offset=i * rows * ITEM_SIZE)
+            # copy, the block is unlinked below
+            data[column] = view.copy()
+            del view
+        if TIME_COLUMN in data:
+            data[TIME_COLUMN] = data[TIME_COLUMN].view('datetime64[ns]')
+    finally:
+        shm.close()
+        shm.unlink()
+    return pd.DataFrame(data)
+
+
+class ParsePool:
+    """Process pool which parses archives in parallel and returns the frames over shared memory"""
+
+    def __init__(self, workers: int = None):
+        """
+        :param workers: number of processes, default os.cpu_count()
+        """
+        self.workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def submit(self, path: str, content: bytes = None):
+        """Starts the parsing of one archive
+
+        :return: concurrent.futures.Future of the descriptor, see result(...)
+        """
+        return self.executor.submit(parse_to_shared_memory, path, content)
+
+    @staticmethod
+    def result(future) -> pd.DataFrame:
+        """Waits for a future of submit(...) and returns the pd.DataFrame"""
+        return from_shared_memory(future.result())
+
+    def read_many(self, paths: list, contents: list = None) -> list:
+        """Parses the archives in parallel
+
+        :param paths: urls or paths of the archives
+        :param contents: already downloaded contents of the archives (same order) or None
+        :return: list of pd.DataFrame in the order of the paths
+        """
+        contents = contents or [None] * len(paths)
+        futures = [self.submit(path, content) for path, content in zip(paths, contents)]
+        frames, error = list(), None
+        for future in futures:
+            # collect every future, so no shared memory block is left behind after an error
+            try:
+                frames.append(self.result(future))
+            except Exception as fail:
+                error = error or fail
+        if error is not None:
+            raise error
+        return frames
+
+    def close(self):
+        self.executor.shutdown()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Yield and performance ratio engine for many PV plants on top of Location.solar(...)
+
+The 10 minute solar data of the DWD (GS_10 global, DS_10 diffuse radiation in J/cm^2) is in UTC and the
+timestamp marks the end of the interval. The solar position is calculated for the middle of the interval.
+
+**Example**
+import dwdopendata as dwd
+import pv_yield as pv
+location = dwd.Location(48.37, 10.94)
+solar = location.solar('2018-01-01T00:00', '2019-01-01T00:00')
+plants = pv.plant_fleet(area=[3731, 120], efficiency=[20.15, 18.], tilt=[30, 15], azimuth=[180, 90])
+energy = pv.expected_yield(solar, plants, *location.coordinate)  # kWh per plant and time step
+pr = pv.performance_ratio(measured_kwh, energy.sum())
+"""
+import numpy as np
+import pandas as pd
+
+J_CM2_TO_WH_M2 = 1 / .36  # same factor as dwdopendata.j_cm2_to_wh_m2
+MIN_COS_ZENITH = 0.0872  # sun below 85 deg elevation: no beam transposition
+CHUNK_SIZE = 8760  # time steps per chunk
+
+
+def plant_fleet(area, efficiency, tilt=30., azimuth=180., albedo=0.2, names=None) -> pd.DataFrame:
+    """Builds the plant table used by expected_yield(...)
+
+    Every parameter can be a single value for all plants or one value per plant.
+
+    :param area: module area in m^2
+    :param efficiency: module efficiency in %
+    :param tilt: tilt of the modules in degree (0 = horizontal)
+    :param azimuth: orientation of the modules in degree (90 = east, 180 = south, 270 = west)
+    :param albedo: ground reflectance
+    :param names: name of the plants, default 0...n-1
+    :return: pd.DataFrame with the columns area, efficiency, tilt, azimuth, albedo
+    """
+    columns = np.broadcast_arrays(*[np.asarray(value, dtype=float)
+                                    for value in (area, efficiency, tilt, azimuth, albedo)])
+    fleet = pd.DataFrame(dict(zip(['area', 'efficiency', 'tilt', 'azimuth', 'albedo'],
+                                  [np.atleast_1d(column) for column in columns])))
+    if names is not None:
+        fleet.index = pd.Index(names, name='plant')
+    else:
+        fleet.index.name = 'plant'
+    return fleet
+
+
+def solar_position(times, lat: float, lon: float):
+    """Vectorized solar position (NOAA approximation, accuracy ~0.5 deg)
+
+    :param times: pd.DatetimeIndex or array of datetime64 in UTC
+    :param lat: latitude in degree
+    :param lon: longitude in degree (east positive)
+    :return: (cos_zenith, azimuth) as np.ndarray, azimuth in rad from north clockwise
+    """
+    times = pd.DatetimeIndex(times)
+    hours = times.hour + times.minute / 60 + times.second / 3600
+    gamma = 2 * np.pi / 365 * (times.dayofyear.to_numpy() - 1 + (hours.to_numpy() - 12) / 24)
+    eq_time = 229.18 * (0.000075 + 0.001868 * np.cos(gamma) - 0.032077 * np.sin(gamma)
+                        - 0.014615 * np.cos(2 * gamma) - 0.040849 * np.sin(2 * gamma))
+    decl = (0.006918 - 0.399912 * np.cos(gamma) + 0.070257 * np.sin(gamma)
+            - 0.006758 * np.cos(2 * gamma) + 0.000907 * np.sin(2 * gamma)
+            - 0.002697 * np.cos(3 * gamma) + 0.00148 * np.sin(3 * gamma))
+    true_solar_time = hours.to_numpy() * 60 + eq_time + 4 * lon  # minutes
+    hour_angle = np.radians(true_solar_time / 4 - 180)
+    phi = np.radians(lat)
+    cos_zenith = np.sin(phi) * np.sin(decl) + np.cos(phi) * np.cos(decl) * np.cos(hour_angle)
+    azimuth = np.arctan2(np.sin(hour_angle),
+                         np.cos(hour_angle) * np.sin(phi) - np.tan(decl) * np.cos(phi)) + np.pi
+    return np.clip(cos_zenith, -1., 1.), azimuth
+
+
+def _irradiation(solar):
+    """Returns the frame and GS_10, DS_10 in Wh/m^2 per time step without changing the given data"""
+    frame = solar['data'] if isinstance(solar, dict) else solar
+    glob = frame['GS_10'].to_numpy(dtype=float) * J_CM2_TO_WH_M2
+    diffuse = frame['DS_10'].to_numpy(dtype=float) * J_CM2_TO_WH_M2
+    return frame, glob, np.minimum(diffuse, glob)
+
+
+def iter_plane_of_array(solar, plants: pd.DataFrame, lat: float, lon: float,
+                        interval: str = '10min', chunk_size: int = CHUNK_SIZE):
+    """Generator over the plane of array irradiation of every plant in time chunks (isotropic sky model)
+
+    The angle of incidence of all plants is one matrix product of the sun vector (time x 3) with the
+    normal vectors of the plants (3 x plants).
+
+    :param solar: Feedback from Location.solar(...) or a pd.DataFrame with GS_10 and DS_10
+    :param plants: pd.DataFrame from plant_fleet(...)
+    :param lat: latitude of the plants
+    :param lon: longitude of the plants
+    :param interval: length of the measuring interval, the timestamp marks the end
+    :param chunk_size: number of time steps per chunk
+    :return: yields (pd.DatetimeIndex, np.ndarray of shape (chunk, plants)) in Wh/m^2
+    """
+    frame, glob, diffuse = _irradiation(solar)
+    beam = glob - diffuse
+    cos_zenith, sun_azimuth = solar_position(frame.index - pd.Timedelta(interval) / 2, lat, lon)
+    sin_zenith = np.sqrt(1 - cos_zenith ** 2)
+    sun = np.column_stack([cos_zenith, sin_zenith * np.cos(sun_azimuth), sin_zenith * np.sin(sun_azimuth)])
+
+    tilt = np.radians(plants['tilt'].to_numpy(dtype=float))
+    azimuth = np.radians(plants['azimuth'].to_numpy(dtype=float))
+    normal = np.vstack([np.cos(tilt), np.sin(tilt) * np.cos(azimuth), np.sin(tilt) * np.sin(azimuth)])
+    sky_view = (1 + np.cos(tilt)) / 2
+    ground_view = plants['albedo'].to_numpy(dtype=float) * (1 - np.cos(tilt)) / 2
+
+    # beam on the horizontal plane -> beam normal to the sun, zero for a sun near or below the horizon
+    beam_normal = np.divide(beam, cos_zenith, out=np.zeros_like(beam), where=cos_zenith > MIN_COS_ZENITH)
+
+    for first in range(0, len(frame.index), chunk_size):
+        last = min(first + chunk_size, len(frame.index))
+        cos_aoi = sun[first:last] @ normal
+        np.maximum(cos_aoi, 0., out=cos_aoi)
+        poa = cos_aoi * beam_normal[first:last, None]
+        poa += diffuse[first:last, None] * sky_view
+        poa += glob[first:last, None] * ground_view
+        yield frame.index[first:last], poa
+
+
+def plane_of_array(solar, plants: pd.DataFrame, lat: float, lon: float,
+                   interval: str = '10min', chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """Returns the plane of array irradiation in Wh/m^2 of every plant (columns) for every time step
+
+    For the parameters see iter_plane_of_array(...)
+    :return: pd.DataFrame
+    """
+    return _collect(iter_plane_of_array(solar, plants, lat, lon, interval, chunk_size), solar, plants)
+
+
+def expected_yield(solar, plants: pd.DataFrame, lat: float, lon: float,
+                   interval: str = '10min', chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """Returns the nominal energy yield in kWh of every plant (columns) for every time step (index)
+
+    yield = plane of array irradiation * module area * module efficiency
+    For the parameters see iter_plane_of_array(...)
+
+    :return: pd.DataFrame
+    """
+    factor = plants['area'].to_numpy(dtype=float) * plants['efficiency'].to_numpy(dtype=float) / 1e5
+    chunks = ((index, poa * factor) for index, poa
+              in iter_plane_of_array(solar, plants, lat, lon, interval, chunk_size))
+    return _collect(chunks, solar, plants)
+
+
+def total_yield(solar, plants: pd.DataFrame, lat: float, lon: float,
+                interval: str = '10min', chunk_size: int = CHUNK_SIZE) -> pd.Series:
+    """Returns the nominal energy yield in kWh of every plant summed over the whole period
+
+    Holds only one chunk of the plane of array irradiation in memory.
+    For the parameters see iter_plane_of_array(...)
+
+    :return: pd.Series
+    """
+    total = np.zeros(len(plants))
+    for _, poa in iter_plane_of_array(solar, plants, lat, lon, interval, chunk_size):
+        total += np.nansum(poa, axis=0)
+    factor = plants['area'].to_numpy(dtype=float) * plants['efficiency'].to_numpy(dtype=float) / 1e5
+    return pd.Series(total * factor, index=plants.index, name='yield_kwh')
+
+
+def performance_ratio(measured, expected):
+    """Performance ratio = measured yield / nominal yield
+
+    :param measured: measured yield in kWh (pd.Series / pd.DataFrame aligned to expected)
+    :param expected: nominal yield from expected_yield(...) or total_yield(...)
+    :return: same type as expected
+    """
+    return measured / expected.where(expected > 0)
+
+
+def _collect(chunks, solar, plants):
+    """Writes the chunks into one pd.DataFrame"""
+    frame = solar['data'] if isinstance(solar, dict) else solar
+    out = np.empty((len(frame.index), len(plants)), dtype=float)
+    row = 0
+    for index, values in chunks:
+        out[row:row + len(index)] = values
+        row += len(index)
+    return pd.DataFrame(out, index=frame.index, columns=plants.index)
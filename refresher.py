@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Background refresher of the now and recent archives of a watched set of stations
+
+A daemon thread polls the listings every interval and checks the size and modification time (ETag over
+HTTPS) of the watched archives. Only changed archives are downloaded into the download cache of the location,
+the unchanged ones are marked as fresh. Listings and station descriptions are kept in a
+transport.CachingTransport. So a query of the location for the last hours (date_picker.last_24_hours_ts) is
+served from the local disk and memory. With a store the changed archives are also written to the partitioned
+store of sweep. The cache and the caching transport are only set on the location while the refresher runs,
+stop() restores the original attributes. A cache of the location is copied with longer max_age, the original
+(maybe shared by other locations) stays as it is.
+
+**Example**
+import dwdopendata as dwd
+import date_picker as dp
+import refresher
+location = dwd.Location(48.37, 10.94, cache=True)
+with refresher.Refresher(location, {'wind': ['03379'], 'air_temperature': ['03379']}, interval=300):
+    ts = dp.last_24_hours_ts()
+    wind = location.wind(ts.start(), ts.end(), station_id='03379')  # local
+"""
+import copy
+import os
+import threading
+import time
+
+from availability import archive_range
+from download_cache import DownloadCache
+import sweep
+from transport import CachingTransport
+
+
+class Refresher:
+    """Keeps the now and recent archives of the watched stations up to date in the cache of the location"""
+
+    def __init__(self, location, watch: dict, folders=('now', 'recent'), interval: float = 300., store: str = None,
+                 reso: str = '10_minutes', folder='cdc_obDE_climate'):
+        """
+        :param location: Location object, gets a download cache and a caching transport if it has none (until
+            stop())
+        :param watch: parameter folder -> list of station IDs, e.g. {'wind': ['03379']}
+        :param folders: watched folders
+        :param interval: seconds between two polls
+        :param store: root directory of a sweep store to update (optional)
+        :param reso: resolution folder
+        :param folder: test / advance option
+        """
+        self.location = location
+        self.watch = {typ: {str(station_id).zfill(5) for station_id in ids} for typ, ids in watch.items()}
+        self.folders = folders
+        self.interval = interval
+        self.store = store
+        self.reso = reso
+        self.folder = location.cdc_obDE_climate if folder == 'cdc_obDE_climate' else folder
+        self.last = None  # counters of the last refresh
+        self._stop = threading.Event()
+        self._thread = None
+        self._original = None  # (cache, transport) of the location while attached
+        self._lock = threading.Lock()
+
+    def _attach(self):
+        """Sets the download cache and the caching transport of the location, keeps the original attributes"""
+        location = self.location
+        with self._lock:
+            if self._original is not None:
+                return
+            self._original = (location.cache, location.transport)
+            if location.cache is None:
+                location.cache = DownloadCache(os.path.join(location.op_path, 'dwd_cache'))
+            else:
+                # a copy with its own max_age, other locations may share the cache
+                location.cache = copy.copy(location.cache)
+                location.cache.max_age = dict(location.cache.max_age)
+            for key in self.folders:
+                # the refreshed files must not expire between two polls
+                age = location.cache.max_age.get(key)
+                if age is not None:
+                    location.cache.max_age[key] = max(age, 2 * self.interval)
+            if not isinstance(location.transport, CachingTransport):
+                location.transport = CachingTransport(location.transport, 2 * self.interval)
+
+    def _detach(self):
+        """Restores the cache and the transport of the location"""
+        with self._lock:
+            original, self._original = self._original, None
+        if original is None:
+            return
+        cache, transport = original
+        self.location.cache = cache
+        self.location.transport = transport
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def refresh(self) -> dict:
+        """Polls the listings once and downloads the changed archives
+
+        :return: dict with the counters (checked, downloaded, stored, failed, seconds)
+        """
+        self._attach()
+        transport = self.location.transport
+        stats = {'checked': 0, 'downloaded': 0, 'stored': 0, 'failed': list()}
+        started = time.perf_counter()
+        for typ, stations in self.watch.items():
+            base = '/' + self.location.search_folder(self.folder + self.reso + f'/{typ}/')['path'].strip('/') + '/'
+            transport.listdir(base, refresh=True)
+            for key in self.folders:
+                for name in transport.listdir(base + key, refresh=True):
+                    path = base + key + '/' + name
+                    if 'Beschreibung_Stationen.txt' in name:
+                        transport.read_text(path, refresh=True)
+                        continue
+                    archive = archive_range(name)
+                    if archive is None or archive[0] not in stations:
+                        continue
+                    stats['checked'] += 1
+                    try:
+                        if not self.location.cache.revalidate(self.location, path):
+                            continue
+                        stats['downloaded'] += 1
+                        if self.store is not None:
+                            frame = self.location.read_data(self.location.cache.local_path(path))
+                            sweep.write_archive(frame, self.store, typ, key, archive[0], path)
+                            stats['stored'] += 1
+                    except Exception as fail:
+                        print(path, fail)
+                        stats['failed'].append(path)
+        stats['seconds'] = time.perf_counter() - started
+        self.last = stats
+        return stats
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as fail:
+                print('Refresh failed: ' + str(fail))
+            self._stop.wait(self.interval)
+        # after a stop(timeout) which returned before the running refresh
+        self._detach()
+
+    def start(self):
+        """Starts the refresher thread, the first refresh runs right away"""
+        if self._thread is not None and self._thread.is_alive():
+            if not self._stop.is_set():
+                return
+            # stopped, but the last refresh is still running
+            self._thread.join()
+        self._attach()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='dwd-refresher', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        """Stops the refresher thread after the running refresh and restores the attributes of the location
+
+        :param timeout: max seconds to wait for the running refresh, afterwards it restores the attributes itself
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return
+            self._thread = None
+        self._detach()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Process-wide caches which are shared by all Location objects (and threads) of the process
+
+- tree: the parsed dwd_tree.txt per path, loaded again when the file changed (build_tree, another process)
+- transports: with Location(..., shared=True) all locations with the same settings (server, port, throttle,
+  debug level: Endpoint) use one transport, i.e. one kept-alive FTP connection per thread or one HTTPS
+  session, and one CachingTransport of the listings and station descriptions (MAX_AGE seconds). The transport
+  only holds the Endpoint, no Location. The settings are taken when the transport is made, after a change
+  call location.transport = location.make_transport('ftp')
+- station tables: the parsed station descriptions without the distance (shared=True)
+
+The async pools of dwd_async are already shared per server and event loop.
+
+**Example**
+import dwdopendata as dwd
+from concurrent.futures import ThreadPoolExecutor
+def handle(query):  # one Location per API request, the warm state is shared
+    location = dwd.Location(query['lat'], query['lon'], shared=True)
+    return location.wind(query['start'], query['end'])
+with ThreadPoolExecutor(8) as pool:
+    results = list(pool.map(handle, queries))
+"""
+from collections import OrderedDict
+import json
+import os
+import threading
+
+import single_flight
+
+MAX_AGE = 300.  # seconds of the shared listings and station descriptions
+MAX_STATION_TABLES = 256
+
+_lock = threading.Lock()
+_trees = dict()  # tree path -> (modification time, folders)
+_transports = dict()  # (kind, server, port) -> CachingTransport
+_station_tables = OrderedDict()  # (url, text) -> pd.DataFrame, least recently used first
+
+
+class Endpoint:
+    """Connection settings of a shared transport, a copy of the attributes of a Location"""
+
+    def __init__(self, location):
+        """
+        :param location: Location object with the server, ftp_port, throttle and debug_level
+        """
+        self.server = location.server
+        self.ftp_port = location.ftp_port
+        self.throttle = location.throttle
+        self.debug_level = location.debug_level
+
+    def key(self) -> tuple:
+        """Every setting which changes the behavior of the transport (the throttle by identity)"""
+        return self.server, self.ftp_port, self.throttle, self.debug_level
+
+    def ftp_login(self, debug_level=None):
+        """Login like Location.ftp_login(...) with these settings"""
+        from dwdopendata import Location
+        return Location.ftp_login(self, debug_level)
+
+
+def tree(path: str, build) -> list:
+    """Returns the folders of the dwd_tree.txt at the path, it is built once per host when it is missing
+
+    :param path: path of the dwd_tree.txt
+    :param build: function(tmp_path) which writes the tree (Location.build_tree)
+    :return: list of dict with the path and the folder, must not be changed
+    """
+    if not os.path.isfile(path):
+        # only one thread / process of the op_path downloads the tree, the others wait for it
+        single_flight.produce_once(path, build)
+    mtime = os.path.getmtime(path)
+    entry = _trees.get(path)
+    if entry is None or entry[0] != mtime:
+        with open(path, 'r') as file:
+            entry = (mtime, json.load(file))
+        with _lock:
+            _trees[path] = entry
+    return entry[1]
+
+
+def forget_tree(path: str):
+    with _lock:
+        _trees.pop(path, None)
+
+
+def transport(key: tuple, factory, max_age: float = MAX_AGE):
+    """Returns the shared transport of the key, it is created once with factory() and cached with max_age
+
+        :param key: e.g. ('ftp',) + Endpoint(location).key()
+    :param factory: function which returns the transport
+    :param max_age: seconds of the cached listings and texts
+    :return: transport.CachingTransport
+    """
+    from transport import CachingTransport
+    with _lock:
+        if key not in _transports:
+            _transports[key] = CachingTransport(factory(), max_age)
+        return _transports[key]
+
+
+def station_table(url: str, text: str, parse):
+    """Returns the parsed station description, parse(text) runs once per url and text
+
+    :return: pd.DataFrame, must not be changed (Location.station_list adds the distance to a copy)
+    """
+    key = (url, text)
+    with _lock:
+        if key in _station_tables:
+            _station_tables.move_to_end(key)
+            return _station_tables[key]
+    table = parse(text)
+    with _lock:
+        _station_tables[key] = table
+        while len(_station_tables) > MAX_STATION_TABLES:
+            _station_tables.popitem(last=False)
+    return table
+
+
+def clear():
+    """Closes the shared transports and empties all caches"""
+    with _lock:
+        transports = list(_transports.values())
+        _transports.clear()
+        _trees.clear()
+        _station_tables.clear()
+    for shared_transport in transports:
+        shared_transport.close()
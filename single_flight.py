@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Single-flight coordination of artifacts (downloads, dwd_tree.txt, ...) in the op_path
+
+Only one thread of a process and only one process of a host builds a given file. The others wait for it
+and reuse the result:
+- in-process: SingleFlight, concurrent calls with the same key share one call
+- cross-process: FileLock on <file>.lock, after the lock the file is checked again
+
+**Example**
+import single_flight
+def download(tmp_path):
+    ...  # write the file to tmp_path, return False on failure
+path = single_flight.produce_once('D:/op_path/dwd_cache/file.zip', download)
+"""
+import os
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """Exclusive lock of a lock file, works across processes (fcntl.flock / msvcrt.locking)"""
+
+    def __init__(self, path: str, timeout: float = None, poll: float = 0.05):
+        """
+        :param path: path of the lock file, it is created if it does not exist
+        :param timeout: max seconds to wait for the lock, None = no limit
+        :param poll: seconds between two tries
+        """
+        self.path = path
+        self.timeout = timeout
+        self.poll = poll
+        self._fd = None
+
+    def acquire(self):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        started = time.monotonic()
+        while True:
+            try:
+                if fcntl is not None:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                self._fd = fd
+                return self
+            except OSError:
+                if self.timeout is not None and time.monotonic() - started > self.timeout:
+                    os.close(fd)
+                    raise TimeoutError('Lock ' + self.path + ' was not released in ' + str(self.timeout) + ' s')
+                time.sleep(self.poll)
+
+    def release(self):
+        if self._fd is None:
+            return
+        try:
+            if fcntl is not None:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        return self.acquire()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+
+class _Call:
+    __slots__ = ['event', 'result', 'error']
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Concurrent calls with the same key in one process share the result of the first call"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = dict()
+
+    def do(self, key, func, *args):
+        """Calls func(*args), or waits for the running call with the same key and returns its result
+
+        An exception of the call is raised in every waiting thread.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func(*args)
+        except BaseException as fail:
+            call.error = fail
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+flights = SingleFlight()  # process-wide
+
+
+def is_fresh(path: str, max_age: float = None) -> bool:
+    """True if the file exists and is younger than max_age seconds (None = no limit)"""
+    if not os.path.isfile(path):
+        return False
+    return max_age is None or time.time() - os.path.getmtime(path) < max_age
+
+
+def produce_once(target: str, produce, max_age: float = None, timeout: float = None):
+    """Builds the target file once per host, concurrent callers wait and reuse it
+
+    produce(tmp_path) writes the file to tmp_path, it is renamed to the target afterwards. So the target never
+    exists half written. When produce returns False the target is not changed.
+
+    :param target: path of the artifact
+    :param produce: function which writes the artifact to the given path
+    :param max_age: an older target is built again (seconds, None = never)
+    :param timeout: max seconds to wait for another process
+    :return: target or None when produce failed
+    """
+    def run():
+        if is_fresh(target, max_age):
+            return target
+        with FileLock(target + '.lock', timeout):
+            if is_fresh(target, max_age):
+                # built by another process while waiting for the lock
+                return target
+            tmp = target + '.' + str(os.getpid()) + '.tmp'
+            try:
+                if produce(tmp) is False or not os.path.isfile(tmp):
+                    return None
+                os.replace(tmp, target)
+            finally:
+                if os.path.isfile(tmp):
+                    os.remove(tmp)
+        return target
+
+    return flights.do(os.path.abspath(target), run)
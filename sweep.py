@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Nationwide sweep: downloads the archives of all stations of a parameter into a partitioned store
+
+Every folder (historical, recent, now) is listed once. A bounded pool of threads downloads the archives
+through location.transport, every thread keeps its connection alive (with location.cache the archives go
+through the resumable download cache instead). The archives are parsed in the threads or in a
+parallel_parse.ParsePool and written directly to
+
+    <store>/<typ>/<folder>/station_id=<id>/<archive name>.parquet  (.csv.gz without pyarrow)
+
+The progress of every archive is appended to <store>/<typ>/_progress.journal and merged into
+<store>/<typ>/_progress.json at the end of the sweep, an interrupted sweep continues with the missing archives.
+recent and now archives change daily and are only skipped on the same day.
+
+**Example**
+import dwdopendata as dwd
+import sweep
+location = dwd.Location()
+stats = sweep.sweep(location, 'wind', 'D:/dwd_store', folders=['historical'], workers=4)
+"""
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from importlib.util import find_spec
+import json
+import os
+import threading
+import time
+
+from availability import archive_range
+
+PROGRESS_FILE = '_progress.json'
+JOURNAL_FILE = '_progress.journal'  # one line per archive since the last PROGRESS_FILE
+FOLDERS = ('historical', 'recent', 'now')
+
+
+class SweepStats:
+    """Counters of a sweep, thread safe"""
+
+    def __init__(self, total: int = 0):
+        self.total = total
+        self.files = 0
+        self.skipped = 0
+        self.failed = list()
+        self.bytes = 0
+        self.rows = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def add(self, size: int, rows: int):
+        with self._lock:
+            self.files += 1
+            self.bytes += size
+            self.rows += rows
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def __str__(self):
+        elapsed = max(self.elapsed(), 1e-9)
+        return (f'files {self.files + self.skipped}/{self.total} ({self.skipped} resumed, {len(self.failed)} failed)'
+                f'  {self.files / elapsed:.2f} files/s  {self.bytes / elapsed / 1e6:.2f} MB/s'
+                f'  {self.rows / elapsed:.0f} rows/s')
+
+    def as_dict(self) -> dict:
+        elapsed = max(self.elapsed(), 1e-9)
+        return {'total': self.total, 'files': self.files, 'skipped': self.skipped, 'failed': self.failed,
+                'bytes': self.bytes, 'rows': self.rows, 'seconds': elapsed,
+                'files_per_s': self.files / elapsed, 'mb_per_s': self.bytes / elapsed / 1e6}
+
+
+def _load_progress(path: str, journal: str) -> dict:
+    progress = dict()
+    if os.path.isfile(path):
+        with open(path, 'r') as file:
+            progress = json.load(file)
+    if os.path.isfile(journal):
+        with open(journal, 'r') as file:
+            for line in file:
+                try:
+                    archive, entry = json.loads(line)
+                except ValueError:
+                    # last line of a crashed sweep
+                    continue
+                progress[archive] = entry
+    return progress
+
+
+def _save_progress(path: str, progress: dict):
+    tmp = path + '.tmp'
+    with open(tmp, 'w') as file:
+        json.dump(progress, file)
+    os.replace(tmp, path)
+
+
+def _write(frame, target: str, file_format: str):
+    """Writes the frame to a temporary file and renames it, a crash never leaves a half written file"""
+    tmp = target + '.tmp'
+    if file_format == 'parquet':
+        frame.to_parquet(tmp, index=False)
+    else:
+        frame.to_csv(tmp, index=False, compression='gzip')
+    os.replace(tmp, target)
+
+
+def store_format() -> tuple:
+    """Returns (format, suffix) of the store files: parquet with pyarrow, else gzipped csv"""
+    return ('parquet', '.parquet') if find_spec('pyarrow') else ('csv', '.csv.gz')
+
+
+def write_archive(frame, store: str, typ: str, key: str, station_id: str, path: str) -> str:
+    """Writes the frame of an archive into its partition of the store
+
+    :param frame: pd.DataFrame of the archive
+    :param store: root directory of the store
+    :param typ: parameter folder
+    :param key: folder (historical, recent, now)
+    :param station_id: ID of the station
+    :param path: path of the archive on the server
+    :return: path of the written file
+    """
+    file_format, suffix = store_format()
+    directory = os.path.join(store, typ, key, 'station_id=' + station_id)
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, os.path.basename(path)[:-len('.zip')] + suffix)
+    _write(frame, target, file_format)
+    return target
+
+
+def list_archives(location, typ: str, folders=FOLDERS, reso: str = '10_minutes', start=None, end=None,
+                  folder='cdc_obDE_climate') -> list:
+    """Lists every folder of the parameter once
+
+    :param location: Location object with the transport
+    :param typ: parameter folder, e.g. 'wind'
+    :param folders: subfolders to sweep
+    :param reso: resolution folder
+    :param start: only historical archives from this time (optional)
+    :param end: only historical archives until this time (optional)
+    :param folder: test / advance option
+    :return: list of (folder, station_id, absolute path of the archive)
+    """
+    if folder == 'cdc_obDE_climate':
+        folder = location.cdc_obDE_climate
+    path = '/' + location.search_folder(folder + reso + f'/{typ}/')['path'].strip('/') + '/'
+    if start is not None and end is not None:
+        start, end = location.str_to_timestamp(start, end) if isinstance(start, str) else (start, end)
+    archives = list()
+    for key in folders:
+        for name in location.transport.listdir(path + key):
+            archive = archive_range(name)
+            if archive is None:
+                continue
+            station_id, von, bis = archive
+            if von is not None and start is not None and end is not None and not (von < end and bis > start):
+                continue
+            archives.append((key, station_id, path + key + '/' + name))
+    return archives
+
+
+def sweep(location, typ: str, store: str, folders=FOLDERS, workers: int = 4, parse_pool=None,
+          reso: str = '10_minutes', start=None, end=None, resume: bool = True, report_every: int = 50,
+          folder='cdc_obDE_climate') -> dict:
+    """Downloads and parses the archives of all stations of a parameter into a partitioned store
+
+    :param location: Location object with the transport
+    :param typ: parameter folder, e.g. 'wind'
+    :param store: root directory of the store
+    :param folders: subfolders to sweep
+    :param workers: number of download threads (= connections)
+    :param parse_pool: parallel_parse.ParsePool or None to parse in the download threads
+    :param reso: resolution folder
+    :param start: only historical archives from this time (optional)
+    :param end: only historical archives until this time (optional)
+    :param resume: skip the archives of the progress file
+    :param report_every: print the throughput every n archives (0 = never)
+    :param folder: test / advance option
+    :return: dict with the counters and the throughput (files/s, MB/s)
+    """
+    root = os.path.join(store, typ)
+    os.makedirs(root, exist_ok=True)
+    progress_path = os.path.join(root, PROGRESS_FILE)
+    journal_path = os.path.join(root, JOURNAL_FILE)
+    progress = _load_progress(progress_path, journal_path) if resume else dict()
+    progress_lock = threading.Lock()
+
+    archives = list_archives(location, typ, folders, reso, start, end, folder)
+    stats = SweepStats(len(archives))
+    today = time.strftime('%Y-%m-%d')
+    todo = [archive for archive in archives if archive[2] not in progress
+            or (archive[0] != 'historical' and progress[archive[2]].get('date') != today)]
+    stats.skipped = len(archives) - len(todo)
+
+    def download(path):
+        if location.cache is not None:
+            # resumable transfer, shared with the other processes of the op_path
+            with open(location.cache.fetch(location, path), 'rb') as file:
+                return file.read()
+        return location.transport.read(path)
+
+    def job(key, station_id, path):
+        content = download(path)
+        url = location.transport.url(path)
+        if parse_pool is not None:
+            frame = parse_pool.result(parse_pool.submit(url, content))
+        else:
+            frame = location.read_data(url, content)
+        write_archive(frame, store, typ, key, station_id, path)
+        stats.add(len(content), len(frame))
+        entry = {'bytes': len(content), 'rows': len(frame), 'date': today}
+        with progress_lock:
+            progress[path] = entry
+            journal.write(json.dumps([path, entry]) + '\n')
+            journal.flush()
+
+    # the journal starts empty after the merge, later the progress costs one line per archive
+    _save_progress(progress_path, progress)
+    journal = open(journal_path, 'w')
+    try:
+        with ThreadPoolExecutor(workers, thread_name_prefix='dwd-sweep') as executor:
+            futures = {executor.submit(job, *archive): archive for archive in todo}
+            for done, future in enumerate(as_completed(futures), 1):
+                try:
+                    future.result()
+                except Exception as fail:
+                    print(futures[future][2], fail)
+                    stats.failed.append(futures[future][2])
+                if report_every and done % report_every == 0:
+                    print(stats)
+    finally:
+        journal.close()
+    _save_progress(progress_path, progress)
+    os.remove(journal_path)
+
+    # only the connections of the finished threads, the transport may belong to the caller or be shared
+    location.transport.prune()
+    if report_every:
+        print(stats)
+    return stats.as_dict()
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests of the Arrow stitching of the folders against Location.concat_folders (optional dependency pyarrow)
+
+python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pa = pytest.importorskip('pyarrow')
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import arrow_output  # noqa: E402
+import dwdopendata as dwd  # noqa: E402
+
+START, END = pd.Timestamp('2019-01-01'), pd.Timestamp('2019-01-03')
+
+
+def frame(start: str, end: str, value: float, drop: int = None) -> pd.DataFrame:
+    """10 minute frame like Location.read_data(...), optionally with a missing row"""
+    index = pd.date_range(start, end, freq='10min', inclusive='left', name='MESS_DATUM')
+    data = pd.DataFrame({'STATIONS_ID': 3379, 'FF_10': value + np.arange(len(index)) / 10.}, index=index)
+    return data.drop(index[drop]) if drop is not None else data
+
+
+def to_arrow(data: pd.DataFrame):
+    table = pa.Table.from_pandas(data.reset_index(), preserve_index=False)
+    return table.set_column(0, 'MESS_DATUM', table.column('MESS_DATUM').cast(pa.timestamp('s')))
+
+
+def folders() -> dict:
+    # overlapping folders with a gap in the historical data
+    return {'historical': frame('2018-12-31', '2019-01-02', 1., drop=200),
+            'recent': frame('2019-01-01T12:00', '2019-01-02T12:00', 100.),
+            'now': frame('2019-01-02T06:00', '2019-01-04', 1000.)}
+
+
+@pytest.mark.parametrize('keys', [('historical', 'recent', 'now'), ('recent', 'now'), ('now',)])
+def test_concat_folders_like_pandas(keys):
+    data = {key: value for key, value in folders().items() if key in keys}
+    expected = dwd.Location.concat_folders(dict(data), START, END)
+    table = arrow_output.concat_folders({key: to_arrow(value) for key, value in data.items()}, START, END)
+
+    result = table.to_pandas().set_index('MESS_DATUM')
+    assert list(result.index) == list(expected.index)
+    np.testing.assert_array_equal(result['FF_10'].to_numpy(), expected['FF_10'].to_numpy())
+
+
+def test_concat_folders_without_data():
+    table = arrow_output.concat_folders({'historical': None, 'recent': None}, START, END)
+    assert table.num_rows == 0 and table.column_names == ['MESS_DATUM']
+    empty = dwd.Location.concat_folders({'historical': None, 'recent': None}, START, END)
+    assert empty.empty and empty.index.name == 'MESS_DATUM'
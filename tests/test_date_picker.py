@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Tests of the vectorized functions of date_picker against their scalar versions
+
+python -m pytest tests
+"""
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import date_picker as dp  # noqa: E402
+
+STRINGS = ['2019-10-04T12', '2019-10-04 12:30', 'de04.10.2019T12:30', '20190101', '2019-02-28T23:59',
+           '2020-02-29', 'de31.12.2019 10:00']
+
+
+def interval_set(*pairs) -> dp.IntervalSet:
+    return dp.IntervalSet.from_arrays([np.datetime64(start) for start, _ in pairs],
+                                      [np.datetime64(end) for _, end in pairs])
+
+
+def test_str_to_datetime64_matches_str_to_datetime():
+    expected = [np.datetime64(dp.str_to_datetime(string), 's') for string in STRINGS]
+    assert list(dp.str_to_datetime64(STRINGS)) == expected
+
+
+def test_str_to_datetime64_invalid_is_nat():
+    result = dp.str_to_datetime64(['2019-13-01', '2019-02-30', '2019-01-01'])
+    assert np.isnat(result[:2]).all()
+    assert result[2] == np.datetime64('2019-01-01')
+
+
+def test_interval_set_merges_and_operates():
+    merged = interval_set(('2019-03-01', '2019-05-01'), ('2019-01-01', '2019-02-01'), ('2019-04-01', '2019-06-01'))
+    assert merged == interval_set(('2019-01-01', '2019-02-01'), ('2019-03-01', '2019-06-01'))
+
+    wanted = dp.year_ts(2019).split('month')
+    assert len(wanted) == 12
+    cached = dp.IntervalSet.from_timestamps([dp.month_ts(2019, 3)])
+    assert wanted - cached == interval_set(('2019-01-01', '2019-03-01'), ('2019-04-01', '2020-01-01'))
+    assert wanted & cached == cached
+    assert (wanted - cached) | cached == interval_set(('2019-01-01', '2020-01-01'))
+    assert (wanted - cached).duration() == np.timedelta64(365 - 31, 'D')
+
+
+def test_interval_set_covers_and_locate():
+    periods = interval_set(('2019-01-01', '2019-02-01'), ('2019-03-01', '2019-04-01'))
+    times = np.array(['2018-12-31', '2019-01-15', '2019-02-01', '2019-03-31T23:59', '2019-04-01'],
+                     dtype='datetime64[s]')
+    assert list(periods.covers(times)) == [False, True, False, True, False]
+    assert list(periods.locate(times)) == [-1, 0, -1, 1, -1]
+    assert not dp.IntervalSet().covers(times).any()
+
+
+@pytest.mark.parametrize('unit, scalar, parts', [
+    ('year', lambda year, part: dp.year_ts(year), 1),
+    ('quarter', dp.quarter_ts, 4),
+    ('month', dp.month_ts, 12),
+])
+def test_calendar_periods_match_the_timestamps(unit, scalar, parts):
+    periods = dp.calendar_periods(unit, 2015, 2020)
+    expected = [scalar(year, part) for year in range(2015, 2021) for part in range(1, parts + 1)]
+    assert list(periods.starts) == [np.datetime64(ts.timestamp_start, 's') for ts in expected]
+    assert list(periods.ends) == [np.datetime64(ts.timestamp_end, 's') for ts in expected]
+
+
+def test_calendar_periods_weeks_and_halves():
+    weeks = dp.calendar_periods('week', 2020, 2021)
+    # 2020 has 53 ISO weeks, its first week starts in dec. 2019, the last one of 2021 ends in jan. 2022
+    assert len(weeks) == 53 + 52
+    assert weeks.starts[0] == np.datetime64('2019-12-30')
+    assert weeks.ends[-1] == np.datetime64('2022-01-03')
+    week_53 = dp.calender_week_ts(2020, 53)
+    assert weeks.starts[52] == np.datetime64(week_53.timestamp_start, 's')
+
+    # six months per half, unlike half_year_ts(...) (1st jun.)
+    halves = dp.half_year_periods(2019, 2019)
+    assert list(halves.starts) == [np.datetime64('2019-01-01'), np.datetime64('2019-07-01')]
+    assert halves.ends[-1] == np.datetime64('2020-01-01')
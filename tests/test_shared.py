@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Concurrency tests of Location and the shared caches against a LocalTransport on the synthetic CDC tree and of the
+shared FTP / HTTP transports against the stand-in servers (pyftpdlib for FTP)
+
+python -m pytest tests
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import gc
+import os
+import sys
+import weakref
+
+import pytest
+
+PACKAGE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PACKAGE)
+sys.path.insert(0, os.path.join(PACKAGE, 'benchmarks'))
+import dwdopendata as dwd  # noqa: E402
+import shared  # noqa: E402
+import standin  # noqa: E402
+import synthetic_tree  # noqa: E402
+import throttle  # noqa: E402
+import transport  # noqa: E402
+
+THREADS = 8
+TYPS = ('wind', 'air_temperature', 'solar')
+
+
+@pytest.fixture(scope='module')
+def tree(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp('tree'))
+    synthetic_tree.generate(root, n_stations=3, years=1, typs=TYPS)
+    return root
+
+
+@pytest.fixture(autouse=True)
+def clear_shared():
+    yield
+    shared.clear()
+
+
+@pytest.fixture(scope='module')
+def ftp_port(tree):
+    pytest.importorskip('pyftpdlib')
+    server, port = standin.serve_ftp(tree)
+    yield port
+    server.shutdown()
+
+
+@pytest.fixture(scope='module')
+def http_url(tree):
+    server, url = standin.serve_http(tree)
+    yield url
+    server.shutdown()
+
+
+def queries() -> list:
+    now = datetime.now()
+    frames = [(now - timedelta(days)).strftime('%Y-%m-%dT%H:%M') for days in (2, 40, 400)]
+    return [(start, now.strftime('%Y-%m-%dT%H:%M'), typ) for start in frames for typ in TYPS]
+
+
+def test_one_location_many_threads(tree, tmp_path):
+    location = dwd.Location(50.5, 10.5, op_path=str(tmp_path), transport=tree)
+    expected = [location.get_10_min_data(*query)['data'] for query in queries()]
+    attributes = dict(vars(location))
+
+    # the same location from many threads, every query several times and in parallel
+    jobs = queries() * 3
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(lambda query: location.get_10_min_data(*query)['data'], jobs))
+
+    for i, frame in enumerate(results):
+        assert frame.equals(expected[i % len(expected)])
+    assert vars(location) == attributes
+
+
+def test_locations_build_one_tree(tree, tmp_path):
+    # no dwd_tree.txt yet: every thread builds its location at the same time
+    def query(i):
+        location = dwd.Location(50.5 + i / 100, 10.5, op_path=str(tmp_path), transport=tree, shared=True)
+        return len(location.get_10_min_data(*queries()[1])['data'])
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        lengths = list(pool.map(query, range(2 * THREADS)))
+    assert len(set(lengths)) == 1 and lengths[0] > 0
+    assert os.path.isfile(os.path.join(str(tmp_path), 'dwd_tree.txt'))
+
+
+def test_shared_transport_keyed_by_settings(tmp_path):
+    first = dwd.Location(op_path=str(tmp_path), shared=True)
+    same = dwd.Location(op_path=str(tmp_path), shared=True)
+    assert first.transport is same.transport
+
+    other = dwd.Location(op_path=str(tmp_path))
+    other.throttle = throttle.Throttle()
+    other.shared = True
+    assert other.make_transport('ftp') is not first.transport
+    other.server = '127.0.0.1'
+    assert other.make_transport('ftp').transport.location.server == '127.0.0.1'
+
+
+def test_shared_transport_keeps_no_location(tmp_path):
+    location = dwd.Location(op_path=str(tmp_path), shared=True)
+    transport = location.transport
+    reference = weakref.ref(location)
+    del location
+    gc.collect()
+    assert reference() is None
+    assert transport.transport.location.server == 'opendata.dwd.de'
+
+
+def folder() -> str:
+    return '/' + synthetic_tree.CLIMATE + synthetic_tree.RESO + '/wind/recent'
+
+
+def ftp_location(op_path: str, port: int):
+    location = dwd.Location(op_path=op_path)
+    location.server = '127.0.0.1'
+    location.ftp_port = port
+    location.shared = True
+    return location
+
+
+def count_listings(inner) -> list:
+    """Counts the listings which reach the server"""
+    calls = list()
+    listdir = inner.listdir
+
+    def counted(path):
+        calls.append(path)
+        return listdir(path)
+    inner.listdir = counted
+    return calls
+
+
+def test_shared_ftp_transport(tree, tmp_path, ftp_port):
+    first = ftp_location(str(tmp_path), ftp_port)
+    first.transport = first.make_transport('ftp')
+    second = ftp_location(str(tmp_path), ftp_port)
+    assert second.make_transport('ftp') is first.transport
+    calls = count_listings(first.transport.transport)
+
+    names = first.transport.listdir(folder())
+    assert names == sorted(os.listdir(tree + folder()))
+    archives = [folder() + '/' + name for name in names if name.endswith('.zip')]
+
+    # many threads, one connection each, the listing comes from the cache of the shared transport
+    def job(path):
+        assert first.transport.listdir(folder()) == names
+        return first.transport.read(path), first.transport.stat(path)
+    with ThreadPoolExecutor(THREADS) as pool:
+        results = list(pool.map(job, archives * 4))
+    assert calls == [folder()]
+    for path, (content, stat) in zip(archives * 4, results):
+        with open(tree + path, 'rb') as file:
+            assert content == file.read()
+        assert stat['size'] == len(content)
+
+    first.transport.invalidate()
+    assert first.transport.listdir(folder()) == names and len(calls) == 2
+
+
+def test_shared_http_transport(tree, tmp_path, http_url):
+    location = dwd.Location(op_path=str(tmp_path))
+    endpoint = shared.Endpoint(location)
+    key = ('https',) + endpoint.key()
+    shared_transport = shared.transport(key, lambda: transport.HTTPSTransport(endpoint, http_url))
+    assert shared.transport(key, lambda: None) is shared_transport
+    calls = count_listings(shared_transport.transport)
+
+    names = shared_transport.listdir(folder())
+    assert names == sorted(os.listdir(tree + folder()))
+    path = folder() + '/' + [name for name in names if name.endswith('.zip')][0]
+    with ThreadPoolExecutor(THREADS) as pool:
+        contents = list(pool.map(lambda _: (shared_transport.listdir(folder()), shared_transport.read(path)),
+                                 range(2 * THREADS)))
+    with open(tree + path, 'rb') as file:
+        expected = file.read()
+    assert all(listing == names and content == expected for listing, content in contents)
+    assert calls == [folder()]
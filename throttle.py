@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Rate limiter and adaptive concurrency for the requests to the DWD server
+
+- TokenBucket: max rate of logins / transfers, FileTokenBucket shares the bucket across processes
+- AdaptiveLimiter: max number of transfers at the same time, +1/limit on success (additive increase),
+  halved on a 421 reply, a timeout or a dropped connection (multiplicative decrease)
+- Throttle: both together, shared by all connections of one or more Location objects, call(...) retries a
+  throttled request (retries) after the backoff
+
+**Example**
+import dwdopendata as dwd
+import throttle
+shared = throttle.Throttle(rate=5, burst=10, path='D:/op_path/dwd_throttle')  # path: across processes
+location = dwd.Location(48.37, 10.94, cache=True)
+location.throttle = shared
+"""
+from contextlib import contextmanager, nullcontext
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+from single_flight import FileLock
+
+THROTTLE_CODES = ('421', '425', '426')  # too many connections, can't open / lost data connection
+THROTTLE_STATUS = (429, 503)  # HTTP: too many requests, service unavailable
+
+
+def is_throttled(error) -> bool:
+    """True for errors which mean the server is overloaded or limits us (the request can be retried)"""
+    if isinstance(error, (socket.timeout, TimeoutError, ConnectionError, EOFError)):
+        return True
+    requests = sys.modules.get('requests')  # HTTPS transport, only if requests is already loaded
+    if requests is not None and isinstance(error, (requests.ConnectionError, requests.Timeout)):
+        return True
+    if getattr(getattr(error, 'response', None), 'status_code', None) in THROTTLE_STATUS:
+        return True
+    return str(error).split(None, 1)[0][:3] in THROTTLE_CODES if str(error) else False
+
+
+class TokenBucket:
+    """Thread safe token bucket, every request takes one token"""
+
+    def __init__(self, rate: float, burst: float = None):
+        """
+        :param rate: tokens per second
+        :param burst: size of the bucket, default one second of tokens
+        """
+        self.rate = float(rate)
+        self.burst = float(burst or max(rate, 1.))
+        self._tokens = self.burst
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _take(self, tokens: float) -> float:
+        """Takes the tokens if possible and returns 0, else returns the seconds to wait"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0.
+            return (tokens - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.):
+        """Blocks until the tokens are available"""
+        while True:
+            wait = self._take(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class FileTokenBucket(TokenBucket):
+    """Token bucket with the state in a file, shared by all processes which use the same path"""
+
+    def __init__(self, path: str, rate: float, burst: float = None):
+        """
+        :param path: path of the state file (a .lock file is created next to it)
+        :param rate: tokens per second of all processes together
+        :param burst: size of the bucket
+        """
+        super().__init__(rate, burst)
+        self.path = path
+
+    def _take(self, tokens: float) -> float:
+        with self._lock, FileLock(self.path + '.lock'):
+            now = time.time()
+            state = {'tokens': self.burst, 'stamp': now}
+            if os.path.isfile(self.path):
+                try:
+                    with open(self.path, 'r') as file:
+                        state = json.load(file)
+                except ValueError:
+                    pass
+            available = min(self.burst, state['tokens'] + max(0., now - state['stamp']) * self.rate)
+            wait = 0.
+            if available >= tokens:
+                available -= tokens
+            else:
+                wait = (tokens - available) / self.rate
+            with open(self.path, 'w') as file:
+                json.dump({'tokens': available, 'stamp': now}, file)
+            return wait
+
+
+class AdaptiveLimiter:
+    """Limit of the transfers at the same time with additive increase / multiplicative decrease"""
+
+    def __init__(self, initial: float = 2., minimum: float = 1., maximum: float = 16.):
+        self.limit = float(initial)
+        self.minimum = float(minimum)
+        self.maximum = float(maximum)
+        self.in_flight = 0
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        with self._condition:
+            while self.in_flight >= int(self.limit):
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self):
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def success(self):
+        with self._condition:
+            self.limit = min(self.maximum, self.limit + 1. / self.limit)
+            self._condition.notify_all()
+
+    def failure(self):
+        with self._condition:
+            self.limit = max(self.minimum, self.limit / 2.)
+
+
+class Throttle:
+    """Rate limit, adaptive concurrency and retries with exponential backoff
+
+    One object can be shared by several Location objects (attribute throttle). With a path the rate limit
+    applies to all processes, the concurrency limit is per process.
+    """
+
+    def __init__(self, rate: float = 5., burst: float = None, path: str = None, initial: float = 2.,
+                 minimum: float = 1., maximum: float = 16., retries: int = 3, backoff: float = 1.,
+                 max_backoff: float = 60.):
+        """
+        :param rate: logins / transfers per second
+        :param burst: size of the token bucket
+        :param path: state file of the token bucket to share it across processes (None = this process)
+        :param initial: initial number of transfers at the same time
+        :param minimum: min number of transfers at the same time
+        :param maximum: max number of transfers at the same time
+        :param retries: retries of a throttled request
+        :param backoff: seconds to wait after the first throttled request, doubled for every further one
+        :param max_backoff: max seconds to wait
+        """
+        self.bucket = FileTokenBucket(path, rate, burst) if path else TokenBucket(rate, burst)
+        self.limiter = AdaptiveLimiter(initial, minimum, maximum)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.throttled = 0  # throttled requests in a row
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Waits for a token of the rate limit"""
+        self.bucket.acquire()
+
+    def success(self):
+        with self._lock:
+            self.throttled = 0
+        self.limiter.success()
+
+    def failure(self, error) -> bool:
+        """Records a failed request, waits the backoff time if the server throttles us
+
+        :return: True if the request should be retried
+        """
+        if not is_throttled(error):
+            return False
+        with self._lock:
+            self.throttled += 1
+            delay = min(self.max_backoff, self.backoff * 2 ** (self.throttled - 1))
+        self.limiter.failure()
+        time.sleep(delay)
+        return True
+
+    @contextmanager
+    def slot(self):
+        """with throttle.slot(): transfer ... (rate limit + concurrency limit + success / failure)"""
+        self.wait()
+        self.limiter.acquire()
+        try:
+            yield
+        except Exception as fail:
+            # the backoff runs outside of the slot, the other transfers go on
+            self.limiter.release()
+            self.failure(fail)
+            raise
+        except BaseException:
+            self.limiter.release()
+            raise
+        self.limiter.release()
+        self.success()
+
+    def call(self, func, *args):
+        """Calls func(*args) in a slot and retries throttled requests"""
+        for attempt in range(self.retries + 1):
+            try:
+                with self.slot():
+                    return func(*args)
+            except Exception as fail:
+                if attempt == self.retries or not is_throttled(fail):
+                    raise
+
+
+def slot(throttle):
+    """Context manager of throttle.slot() or a no-op without a throttle"""
+    return nullcontext() if throttle is None else throttle.slot()
+
+
+def call(throttle, func, *args):
+    """throttle.call(func, *args) or func(*args) without a throttle"""
+    return func(*args) if throttle is None else throttle.call(func, *args)
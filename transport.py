@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Transport layer between Location and the CDC tree of opendata.dwd.de
+
+Every transport lists directories and reads files with absolute paths of the server
+('/climate_environment/CDC/...'):
+- FTPTransport: ftplib, one kept-alive connection per thread (default), the text files (station descriptions,
+  tree.html) are read over HTTPS like before
+- HTTPSTransport: requests.Session with pooled keep-alive connections, resume with HTTP Range
+- LocalTransport: a local directory with the same layout (mirror, test data)
+- CachingTransport: keeps the listings and text files of another transport in memory (see refresher)
+
+**Example**
+import dwdopendata as dwd
+import transport
+location = dwd.Location(48.37, 10.94)
+location.transport = transport.HTTPSTransport(location)
+wind = location.wind('2019-01-01T00:00', '2019-02-01T00:00')
+"""
+from ftplib import all_errors, error_perm
+from html.parser import HTMLParser
+from io import BytesIO
+import os
+import threading
+import time
+from urllib.parse import unquote, urljoin
+import weakref
+
+import lazy
+import throttle
+
+requests = lazy.module('requests')
+
+TEXT_ENCODING = 'latin-1'  # station descriptions of the DWD
+TRANSIENT_HTTP = (408, 429)  # 4xx status codes which a retry can fix
+
+
+def permanent(fail: BaseException) -> bool:
+    """Returns True for an error which a retry can not fix: FTP 5xx (e.g. 550 missing file), HTTP 4xx (e.g. 404)
+    or a missing local file"""
+    if isinstance(fail, (error_perm, FileNotFoundError)):
+        return True
+    status = getattr(getattr(fail, 'response', None), 'status_code', None)
+    return status is not None and 400 <= status < 500 and status not in TRANSIENT_HTTP
+
+
+class Transport:
+    """Interface of the transports"""
+
+    name = 'base'
+
+    def listdir(self, path: str) -> list:
+        """Returns the names in the directory (without the path)"""
+        raise NotImplementedError
+
+    def read(self, path: str) -> bytes:
+        """Returns the content of a file"""
+        buffer = BytesIO()
+        self.download(path, buffer)
+        return buffer.getvalue()
+
+    def read_text(self, path: str) -> str:
+        """Returns the content of a text file"""
+        return self.read(path).decode(TEXT_ENCODING)
+
+    def download(self, path: str, file, offset: int = 0):
+        """Writes the file (from the offset on) into the open binary file object
+
+        A transport which can not start at the offset truncates the file object and writes the whole file.
+        """
+        raise NotImplementedError
+
+    def stat(self, path: str) -> dict:
+        """Returns {'size': int or None, 'mtime': str or None} of a file"""
+        raise NotImplementedError
+
+    def url(self, path: str) -> str:
+        """Returns the url of a file (names the frames of read_data)"""
+        raise NotImplementedError
+
+    def prune(self):
+        """Closes the connections of finished threads, the transport stays usable"""
+        pass
+
+    def close(self):
+        pass
+
+
+class FTPTransport(Transport):
+    """FTP with one connection per thread which is kept alive between the calls"""
+
+    name = 'ftp'
+    instances = weakref.WeakSet()  # open connections for the metrics
+
+    def __init__(self, location, text_over_https: bool = True):
+        """
+        :param location: Location object for the login (server, throttle)
+        :param text_over_https: read the text files with a kept-alive HTTPS session instead of FTP
+        """
+        self.location = location
+        self.text_over_https = text_over_https
+        self.session = None  # requests.Session of the text files, opened at the first read_text
+        self._local = threading.local()
+        self._connections = list()
+        self._owners = dict()  # connection -> its thread
+        self._generation = 0  # close() invalidates the connections of every thread
+        self._lock = threading.Lock()
+        FTPTransport.instances.add(self)
+
+    def _connection(self):
+        ftp = getattr(self._local, 'ftp', None)
+        if ftp is None or self._local.generation != self._generation:
+            ftp = self.location.ftp_login()
+            if ftp is None:
+                raise ConnectionError('Login to ' + self.location.server + ' failed')
+            ftp.voidcmd('TYPE I')
+            self._local.ftp = ftp
+            self._local.generation = self._generation
+            with self._lock:
+                self._connections.append(ftp)
+                self._owners[ftp] = threading.current_thread()
+        return ftp
+
+    def _call(self, func, *args):
+        """Calls func(ftp, *args), a broken connection is dropped and the call is retried once on a new one
+
+        A kept connection can be closed by the server in the meantime (idle timeout), the first call afterwards
+        must not fail. Permanent errors (5xx, e.g. a missing file) are raised right away.
+        """
+        for attempt in range(2):
+            ftp = self._connection()
+            try:
+                return func(ftp, *args)
+            except all_errors as fail:
+                self._drop(ftp)
+                if attempt or isinstance(fail, error_perm):
+                    raise
+
+    def _drop(self, ftp):
+        self._local.ftp = None
+        with self._lock:
+            if ftp in self._connections:
+                self._connections.remove(ftp)
+            self._owners.pop(ftp, None)
+        ftp.close()
+
+    def listdir(self, path: str) -> list:
+        names = throttle.call(self.location.throttle, self._call, lambda ftp: ftp.nlst(path))
+        return [os.path.basename(name.rstrip('/')) for name in names]
+
+    def read_text(self, path: str) -> str:
+        if not self.text_over_https:
+            return super().read_text(path)
+        if self.session is None:
+            with self._lock:
+                if self.session is None:
+                    self.session = requests.Session()
+        response = self.session.get('https://' + self.location.server + path)
+        response.raise_for_status()
+        return response.text
+
+    def download(self, path: str, file, offset: int = 0):
+        start = file.tell()
+
+        def retrieve(ftp):
+            # a retry starts again at the offset
+            file.seek(start)
+            file.truncate()
+            ftp.retrbinary('RETR ' + path, file.write, rest=offset or None)
+        throttle.call(self.location.throttle, self._call, retrieve)
+
+    def stat(self, path: str) -> dict:
+        def answer(ftp, command):
+            try:
+                # SIZE is refused in ASCII mode, which a listing (NLST) leaves behind
+                ftp.voidcmd('TYPE I')
+                return ftp.sendcmd(command + ' ' + path).split(None, 1)[1].strip()
+            except all_errors:
+                return None
+
+        def query():
+            size = self._call(answer, 'SIZE')
+            return {'size': int(size) if size is not None else None, 'mtime': self._call(answer, 'MDTM')}
+        return throttle.call(self.location.throttle, query)
+
+    def url(self, path: str) -> str:
+        return 'ftp://' + self.location.server + path
+
+    @staticmethod
+    def _quit(connections: list):
+        for ftp in connections:
+            try:
+                ftp.quit()
+            except all_errors:
+                ftp.close()
+
+    def prune(self):
+        with self._lock:
+            finished = [ftp for ftp in self._connections if not self._owners[ftp].is_alive()]
+            for ftp in finished:
+                self._connections.remove(ftp)
+                del self._owners[ftp]
+        self._quit(finished)
+
+    def close(self):
+        with self._lock:
+            connections, self._connections = self._connections, list()
+            self._owners = dict()
+            self._generation += 1
+        self._quit(connections)
+        session, self.session = self.session, None
+        if session is not None:
+            session.close()
+
+
+class _LinkParser(HTMLParser):
+    """Collects the href of the links of a directory listing"""
+
+    def __init__(self):
+        super().__init__()
+        self.links = list()
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'a':
+            self.links.extend(value for key, value in attrs if key == 'href' and value)
+
+
+class HTTPSTransport(Transport):
+    """HTTPS with a requests.Session, the connections are pooled and kept alive"""
+
+    name = 'https'
+
+    def __init__(self, location, base_url: str = None, pool_size: int = 10, timeout: float = 60.):
+        """
+        :param location: Location object (server, throttle)
+        :param base_url: default 'https://' + location.server
+        :param pool_size: kept-alive connections of the session
+        :param timeout: seconds for connect and read
+        """
+        self.location = location
+        self.base_url = (base_url or 'https://' + location.server).rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+    def url(self, path: str) -> str:
+        return self.base_url + path
+
+    def _checked(self, method, url: str):
+        """Request with the status check inside the throttle (429, 503 are throttled)"""
+        response = method(url, timeout=self.timeout, allow_redirects=True)
+        response.raise_for_status()
+        return response
+
+    def listdir(self, path: str) -> list:
+        url = self.url(path.rstrip('/') + '/')
+        response = throttle.call(self.location.throttle, self._checked, self.session.get, url)
+        parser = _LinkParser()
+        parser.feed(response.text)
+        names = list()
+        for link in parser.links:
+            target = urljoin(url, link)
+            # only the direct children of the directory
+            if target.startswith(url) and target != url and '?' not in link:
+                names.append(unquote(target[len(url):].rstrip('/')))
+        return [name for name in dict.fromkeys(names) if name and '/' not in name]
+
+    def download(self, path: str, file, offset: int = 0):
+        headers = {'Range': 'bytes=' + str(offset) + '-'} if offset else None
+        start = file.tell()
+
+        def retrieve():
+            # a retry starts again at the offset
+            file.seek(start)
+            file.truncate()
+            with self.session.get(self.url(path), headers=headers, stream=True, timeout=self.timeout) as response:
+                response.raise_for_status()
+                if offset and response.status_code != 206:
+                    # the server ignored the range
+                    file.seek(0)
+                    file.truncate()
+                for chunk in response.iter_content(1 << 16):
+                    file.write(chunk)
+        throttle.call(self.location.throttle, retrieve)
+
+    def stat(self, path: str) -> dict:
+        response = throttle.call(self.location.throttle, self._checked, self.session.head, self.url(path))
+        size = response.headers.get('Content-Length')
+        mtime = response.headers.get('ETag') or response.headers.get('Last-Modified')
+        return {'size': int(size) if size is not None else None, 'mtime': mtime}
+
+    def close(self):
+        self.session.close()
+
+
+class LocalTransport(Transport):
+    """Local directory with the layout of the server"""
+
+    name = 'local'
+
+    def __init__(self, root: str):
+        """
+        :param root: directory which corresponds to the root of the server
+        """
+        self.root = root
+
+    def local_path(self, path: str) -> str:
+        return os.path.join(self.root, *[part for part in path.strip('/').split('/') if part])
+
+    def url(self, path: str) -> str:
+        return self.local_path(path)
+
+    def listdir(self, path: str) -> list:
+        return sorted(os.listdir(self.local_path(path)))
+
+    def read(self, path: str) -> bytes:
+        with open(self.local_path(path), 'rb') as file:
+            return file.read()
+
+    def download(self, path: str, file, offset: int = 0):
+        with open(self.local_path(path), 'rb') as source:
+            source.seek(offset)
+            while True:
+                chunk = source.read(1 << 20)
+                if not chunk:
+                    break
+                file.write(chunk)
+
+    def stat(self, path: str) -> dict:
+        info = os.stat(self.local_path(path))
+        return {'size': info.st_size, 'mtime': str(int(info.st_mtime))}
+
+
+class CachingTransport(Transport):
+    """Keeps the listings and text files (station descriptions) of another transport in memory for max_age
+    seconds, the archives are passed through"""
+
+    def __init__(self, transport: Transport, max_age: float = 600.):
+        """
+        :param transport: wrapped transport
+        :param max_age: seconds until a listing or text is requested again (None = never)
+        """
+        self.transport = transport
+        self.max_age = max_age
+        self.name = transport.name
+        self._entries = dict()  # (kind, path) -> (time, value)
+        self._lock = threading.Lock()
+
+    def _cached(self, kind: str, func, path: str, refresh: bool):
+        key = (kind, path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and not refresh and (self.max_age is None or time.time() - entry[0] < self.max_age):
+            return entry[1]
+        value = func(path)
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+        return value
+
+    def listdir(self, path: str, refresh: bool = False) -> list:
+        """
+        :param refresh: list the directory again also when the cached listing is fresh
+        """
+        return list(self._cached('listdir', self.transport.listdir, path, refresh))
+
+    def read_text(self, path: str, refresh: bool = False) -> str:
+        """
+        :param refresh: read the file again also when the cached text is fresh
+        """
+        return self._cached('text', self.transport.read_text, path, refresh)
+
+    def invalidate(self, path: str = None):
+        """Removes the cached listings and texts of the path (None = all)"""
+        with self._lock:
+            for key in [key for key in self._entries if path is None or key[1] == path]:
+                del self._entries[key]
+
+    def read(self, path: str) -> bytes:
+        return self.transport.read(path)
+
+    def download(self, path: str, file, offset: int = 0):
+        self.transport.download(path, file, offset)
+
+    def stat(self, path: str) -> dict:
+        return self.transport.stat(path)
+
+    def url(self, path: str) -> str:
+        return self.transport.url(path)
+
+    def prune(self):
+        self.transport.prune()
+
+    def close(self):
+        self.transport.close()
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Date created: 2026-10-18
+Version: 0.0.1
+
+Power curve engine for wind turbine portfolios on top of Location.wind(...)
+
+**Example**
+import dwdopendata as dwd
+import wind_power as wp
+location = dwd.Location(48.37, 10.94)
+wind = location.wind('2018-01-01T00:00', '2019-01-01T00:00')
+temperature = location.temperature('2018-01-01T00:00', '2019-01-01T00:00')
+curves = {'E-82': wp.PowerCurve([3, 5, 8, 12, 13, 25], [25, 230, 1000, 2300, 2300, 2300])}
+turbines = wp.turbine_fleet(hub_heights=[78, 98, 108], power_curves=['E-82'] * 3)
+power = wp.power_timeseries(wind, turbines, curves, temperature)  # kW per turbine
+energy = wp.annual_energy(wind, turbines, curves, temperature)  # kWh per turbine
+"""
+import numpy as np
+import pandas as pd
+
+from dwdopendata import Location
+
+R_AIR = 287.05  # specific gas constant of dry air J/(kg*K)
+GRAVITY = 9.80665  # m/s^2
+RHO_0 = 1.225  # kg/m^3, standard air density of the power curves (IEC 61400-12)
+LAPSE_RATE = 0.0065  # K/m
+SENSOR_HEIGHT_T = 2.  # m, height of the DWD temperature sensor
+CHUNK_SIZE = 52560  # time steps per chunk, one year of 10 minute data
+
+
+class PowerCurve:
+    """Tabulated power curve of a wind turbine.
+
+    Between the points the power is linear interpolated, below the first and above the last wind speed
+    (cut-out) the power is zero.
+    """
+
+    __slots__ = ['wind_speed', 'power', 'name']
+
+    def __init__(self, wind_speed, power, name: str = None):
+        """
+        :param wind_speed: wind speeds of the table in m/s
+        :param power: power in kW for every wind speed
+        :param name: name of the turbine type
+        """
+        wind_speed = np.asarray(wind_speed, dtype=float)
+        power = np.asarray(power, dtype=float)
+        if wind_speed.shape != power.shape or wind_speed.ndim != 1:
+            raise ValueError('wind_speed and power must be 1-d and of the same length')
+        order = np.argsort(wind_speed, kind='stable')
+        self.wind_speed = wind_speed[order]
+        self.power = power[order]
+        self.name = name
+
+    def __call__(self, wind_speed):
+        """Returns the power in kW for an array of any shape of wind speeds"""
+        wind_speed = np.asarray(wind_speed, dtype=float)
+        return np.interp(wind_speed, self.wind_speed, self.power, left=0., right=0.)
+
+    def rated_power(self) -> float:
+        """Returns the maximum power of the curve in kW"""
+        return float(self.power.max())
+
+
+def turbine_fleet(hub_heights, power_curves, names=None, shear: float = 0.14) -> pd.DataFrame:
+    """Builds the turbine table used by power_timeseries(...) and annual_energy(...)
+
+    :param hub_heights: hub height of every turbine in m
+    :param power_curves: key of the power curve for every turbine, or a single key for all turbines
+    :param names: name of the turbines, default 0...n-1
+    :param shear: Hellmann exponent (or roughness length for method='log') for every turbine or for all
+    :return: pd.DataFrame with the columns hub_height, power_curve, shear
+    """
+    hub_heights = np.asarray(hub_heights, dtype=float)
+    if isinstance(power_curves, str):
+        power_curves = [power_curves] * len(hub_heights)
+    fleet = pd.DataFrame({'hub_height': hub_heights,
+                          'power_curve': list(power_curves),
+                          'shear': np.broadcast_to(np.asarray(shear, dtype=float), hub_heights.shape)})
+    if names is not None:
+        fleet.index = pd.Index(names, name='turbine')
+    else:
+        fleet.index.name = 'turbine'
+    return fleet
+
+
+def _frame(data):
+    """Returns the pd.DataFrame of a Location.wind(...) / .temperature(...) feedback or the given frame"""
+    return data['data'] if isinstance(data, dict) else data
+
+
+def _time_step_hours(index) -> float:
+    """Returns the median time step of a DatetimeIndex in hours (default 10 min)"""
+    if len(index) < 2:
+        return 1 / 6
+    return float(np.median(np.diff(index.values)) / np.timedelta64(1, 'h'))
+
+
+def _density_inputs(temperature, index):
+    """Returns temperature [K] and pressure [Pa] at sensor height aligned to the index of the wind data"""
+    if temperature is None:
+        return None, None
+    frame = _frame(temperature).reindex(index)
+    temp_k = frame['TT_10'].to_numpy(dtype=float) + 273.15
+    if 'PP_10' in frame:
+        pressure = frame['PP_10'].to_numpy(dtype=float) * 100.
+    else:
+        pressure = np.full(len(frame), 101325.)
+    return temp_k, pressure
+
+
+def _hub_wind(wind, hub_heights, shear, measurement_height, method):
+    """Extrapolates the wind speed vector (n,) to every hub height (m,) and returns a (n, m) array"""
+    if method.lower() == 'hellmann':
+        factor = Location.elevation_profil_hellmann(1., measurement_height, hub_heights, shear)
+    else:
+        factor = np.log(hub_heights / shear) / np.log(measurement_height / shear)
+    return wind[:, None] * factor[None, :]
+
+
+def _hub_density(temp_k, pressure, hub_heights):
+    """Air density (n, m) at every hub height with the barometric formula and a standard lapse rate"""
+    dh = hub_heights[None, :] - SENSOR_HEIGHT_T
+    temp_hub = temp_k[:, None] - LAPSE_RATE * dh
+    pressure_hub = pressure[:, None] * np.exp(-GRAVITY * dh / (R_AIR * temp_k[:, None]))
+    return pressure_hub / (R_AIR * temp_hub)
+
+
+def iter_power(wind, turbines: pd.DataFrame, power_curves: dict, temperature=None,
+               measurement_height: float = 10., method: str = 'hellmann', column: str = 'FF_10',
+               chunk_size: int = CHUNK_SIZE):
+    """Generator over the power of every turbine in time chunks.
+
+    Every chunk holds at most chunk_size * len(turbines) values, so the memory is bounded independent of
+    the length of the time series.
+
+    :param wind: Feedback from Location.wind(...) or a pd.DataFrame with the wind speed column
+    :param turbines: pd.DataFrame from turbine_fleet(...)
+    :param power_curves: dict with the keys of turbines.power_curve and PowerCurve objects as values
+    :param temperature: Feedback from Location.temperature(...) for the air density correction or None
+    :param measurement_height: height of the anemometer in m (DWD standard 10 m)
+    :param method: 'hellmann' or 'log' for the extrapolation to the hub height
+    :param column: column of the wind speed
+    :param chunk_size: number of time steps per chunk
+    :return: yields (pd.DatetimeIndex, np.ndarray of shape (chunk, turbines)) with the power in kW
+    """
+    frame = _frame(wind)
+    index = frame.index
+    speed = frame[column].to_numpy(dtype=float)
+    temp_k, pressure = _density_inputs(temperature, index)
+    hub_heights = turbines['hub_height'].to_numpy(dtype=float)
+    shear = turbines['shear'].to_numpy(dtype=float)
+    # group the turbines once by power curve, the interpolation runs for all turbines of a type at once
+    groups = [(power_curves[key], np.flatnonzero(turbines['power_curve'].to_numpy() == key))
+              for key in pd.unique(turbines['power_curve'])]
+
+    for first in range(0, len(index), chunk_size):
+        last = min(first + chunk_size, len(index))
+        v_hub = _hub_wind(speed[first:last], hub_heights, shear, measurement_height, method)
+        if temp_k is not None:
+            rho = _hub_density(temp_k[first:last], pressure[first:last], hub_heights)
+            # missing temperature values: no correction instead of a missing power value
+            rho = np.where(np.isnan(rho), RHO_0, rho)
+            v_hub *= np.cbrt(rho / RHO_0)
+        power = np.empty_like(v_hub)
+        for curve, columns in groups:
+            power[:, columns] = curve(v_hub[:, columns])
+        power[np.isnan(v_hub)] = np.nan
+        yield index[first:last], power
+
+
+def power_timeseries(wind, turbines: pd.DataFrame, power_curves: dict, temperature=None,
+                     measurement_height: float = 10., method: str = 'hellmann', column: str = 'FF_10',
+                     chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """Returns the power in kW of every turbine (columns) for every time step (index)
+
+    For the parameters see iter_power(...)
+    :return: pd.DataFrame
+    """
+    frame = _frame(wind)
+    out = np.empty((len(frame.index), len(turbines)), dtype=float)
+    row = 0
+    for index, power in iter_power(wind, turbines, power_curves, temperature, measurement_height,
+                                   method, column, chunk_size):
+        out[row:row + len(index)] = power
+        row += len(index)
+    return pd.DataFrame(out, index=frame.index, columns=turbines.index)
+
+
+def annual_energy(wind, turbines: pd.DataFrame, power_curves: dict, temperature=None,
+                  measurement_height: float = 10., method: str = 'hellmann', column: str = 'FF_10',
+                  chunk_size: int = CHUNK_SIZE) -> pd.DataFrame:
+    """Returns the energy yield of every turbine without holding the whole power time series in memory
+
+    Missing time steps are not counted, annual_energy_kwh is the energy scaled to 8760 valid hours.
+    For the parameters see iter_power(...)
+
+    :return: pd.DataFrame with the columns energy_kwh, valid_hours, annual_energy_kwh, full_load_hours,
+        capacity_factor
+    """
+    step = _time_step_hours(_frame(wind).index)
+    energy = np.zeros(len(turbines))
+    valid = np.zeros(len(turbines))
+    for _, power in iter_power(wind, turbines, power_curves, temperature, measurement_height,
+                               method, column, chunk_size):
+        energy += np.nansum(power, axis=0) * step
+        valid += np.count_nonzero(~np.isnan(power), axis=0) * step
+    rated = turbines['power_curve'].map(lambda key: power_curves[key].rated_power()).to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annual = energy * 8760. / valid
+    return pd.DataFrame({'energy_kwh': energy,
+                         'valid_hours': valid,
+                         'annual_energy_kwh': annual,
+                         'full_load_hours': annual / rated,
+                         'capacity_factor': annual / rated / 8760.},
+                        index=turbines.index)